@@ -0,0 +1,550 @@
+"""
+Append-only columnar store for learner progression analytics.
+
+Every skill assessment is recorded as one row: time, task, anonymous learner
+id, level, feedback mode, whether the code worked, and the strengths and
+growth areas reduced to short tags. Rows are buffered in memory and flushed
+as immutable segments:
+
+    analytics/
+        seg-<time>-<pid>-<n>/
+            meta.json            row count, dtypes and the segment's dictionaries
+            ts.bin  task.bin  learner.bin  level.bin  mode.bin  works.bin
+            growth_offsets.bin  growth_tags.bin
+            strength_offsets.bin  strength_tags.bin
+
+Strings (task ids, learner ids, tags) are dictionary-encoded to integer
+codes per segment, so writers in different processes never coordinate;
+levels and modes use fixed codes. Multi-valued tags are stored CSR-style:
+row i's tags are `tags[offsets[i]:offsets[i + 1]]`. A segment is written
+under a temporary name and renamed into place, so readers only ever see
+complete segments.
+
+`load()` memory-maps every segment, remaps local codes to global ones and
+returns a `Snapshot` whose aggregations are numpy bincounts over the
+columns. The first segment's codes are already global, so a compacted
+store is read straight from the memory maps; further segments are copied
+into RAM as they are remapped and concatenated.
+
+Rows are flushed every `flush_rows` rows or `flush_interval` seconds, and
+once a flush leaves more than COMPACT_SEGMENTS segments the small ones
+(under COMPACT_MAX_ROWS rows) are merged into one. A merged segment lists
+the segments it replaces, so a reader that lists the directory before they
+are deleted doesn't count their rows twice. Configuration:
+
+    CODEMENTOR_ANALYTICS=off                   don't record anything
+    CODEMENTOR_ANALYTICS_DIR=./analytics       store location
+
+    python analytics.py synth --rows 2000000   synthetic data for trying the dashboard
+    python analytics.py compact                merge segments into one
+    python analytics.py bench                  time loading and the dashboard aggregations
+"""
+
+import argparse
+import atexit
+import json
+import os
+import re
+import shutil
+import sys
+import threading
+import time
+from array import array
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+DEFAULT_DIR = os.environ.get(
+    "CODEMENTOR_ANALYTICS_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "analytics"),
+)
+SEGMENT_VERSION = 1
+COMPACT_SEGMENTS = 16
+COMPACT_MAX_ROWS = 1_000_000
+COMPACT_LOCK_TIMEOUT = 600
+
+LEVELS = ("beginner", "intermediate", "advanced")
+MODES = ("detailed", "concise")
+UNKNOWN = 255
+
+# name -> (array typecode, numpy dtype)
+COLUMNS = {
+    "ts": ("I", "u4"),
+    "task": ("I", "u4"),
+    "learner": ("I", "u4"),
+    "level": ("B", "u1"),
+    "mode": ("B", "u1"),
+    "works": ("B", "u1"),
+    "growth_offsets": ("I", "u4"),
+    "growth_tags": ("I", "u4"),
+    "strength_offsets": ("I", "u4"),
+    "strength_tags": ("I", "u4"),
+}
+# Columns holding codes into a per-segment dictionary, and which dictionary
+DICTIONARY_COLUMNS = {"task": "tasks", "learner": "learners", "growth_tags": "tags", "strength_tags": "tags"}
+
+# Free-text strengths and growth areas are reduced to a tag from this
+# taxonomy (first match wins), else to OTHER_TAG, so the tag vocabulary
+# stays fixed however varied the model's wording is
+TAG_RULES = [
+    ("edge cases", r"edge|empty|corner|boundary"),
+    ("error handling", r"error|exception|try|raise"),
+    ("input validation", r"validat|sanitiz|input check"),
+    ("naming", r"naming|variable name|descriptive name|identifier"),
+    ("pythonic idioms", r"pythonic|idiom|comprehension|built-?in|enumerate|zip"),
+    ("efficiency", r"efficien|performance|complexity|o\(n|faster|optimi"),
+    ("algorithms", r"algorithm|recurs|sort|search|iterat|loop"),
+    ("data structures", r"data structure|\bdict|\bset\b|\blist|tuple|deque|heap|stack|queue"),
+    ("type hints", r"type hint|annotation|typing"),
+    ("documentation", r"docstring|comment|document"),
+    ("testing", r"\btest"),
+    ("code style", r"pep ?8|style|format|indent|consisten|convention"),
+    ("structure", r"structure|organi[sz]|modular|function|decompos|readab|clean"),
+    ("correctness", r"correct|works|logic|bug"),
+]
+OTHER_TAG = "other"
+_TAG_PATTERNS = [(tag, re.compile(pattern, re.IGNORECASE)) for tag, pattern in TAG_RULES]
+
+
+def tag_for(text: str) -> str:
+    """Tag from the fixed taxonomy for a free-text strength or growth area."""
+    for tag, pattern in _TAG_PATTERNS:
+        if pattern.search(text):
+            return tag
+    return OTHER_TAG
+
+
+def normalize_task(task: str) -> str:
+    """Task key: the gallery id for gallery tasks, else the collapsed, truncated description."""
+    import gallery
+
+    known = gallery.TASKS_BY_DESCRIPTION.get(task.strip())
+    if known:
+        return known.id
+    return " ".join(task.lower().split())[:120]
+
+
+class _Dictionary:
+    def __init__(self):
+        self.values: List[str] = []
+        self.codes: Dict[str, int] = {}
+
+    def encode(self, value: str) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+def write_segment(directory: str, columns: dict, dictionaries: Dict[str, List[str]], replaces: List[str] = ()) -> str:
+    """Write one immutable segment; `columns` values are arrays with a `tofile` method.
+
+    `replaces` names the segments whose rows this one contains (see compact).
+    """
+    os.makedirs(directory, exist_ok=True)
+    name = f"seg-{time.time_ns()}-{os.getpid()}-{threading.get_ident() % 10000}"
+    tmp_path = os.path.join(directory, "." + name)
+    os.makedirs(tmp_path)
+    for column in COLUMNS:
+        with open(os.path.join(tmp_path, column + ".bin"), "wb") as f:
+            columns[column].tofile(f)
+    meta = {
+        "version": SEGMENT_VERSION,
+        "rows": len(columns["ts"]),
+        "byteorder": sys.byteorder,
+        "dtypes": {column: dtype for column, (_, dtype) in COLUMNS.items()},
+        "dictionaries": dictionaries,
+        "replaces": list(replaces),
+    }
+    with open(os.path.join(tmp_path, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f, separators=(",", ":"))
+    path = os.path.join(directory, name)
+    os.replace(tmp_path, path)
+    return path
+
+
+class AnalyticsStore:
+    """Buffers assessment rows and flushes them as segments."""
+
+    def __init__(self, directory: str = DEFAULT_DIR, flush_rows: int = 1024, flush_interval: float = 300.0):
+        self.directory = directory
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._reset_buffer()
+
+    def _reset_buffer(self):
+        self._columns = {column: array(typecode) for column, (typecode, _) in COLUMNS.items()}
+        self._columns["growth_offsets"].append(0)
+        self._columns["strength_offsets"].append(0)
+        self._dictionaries = {"tasks": _Dictionary(), "learners": _Dictionary(), "tags": _Dictionary()}
+        self._started = time.monotonic()
+
+    def record(self, task: str, learner: str, level: Optional[str], code_works: bool, feedback_mode: Optional[str],
+               strengths: List[str] = (), growth_areas: List[str] = (), timestamp: Optional[float] = None):
+        with self._lock:
+            columns, tags = self._columns, self._dictionaries["tags"]
+            columns["ts"].append(int(timestamp if timestamp is not None else time.time()))
+            columns["task"].append(self._dictionaries["tasks"].encode(normalize_task(task)))
+            columns["learner"].append(self._dictionaries["learners"].encode(learner))
+            columns["level"].append(LEVELS.index(level) if level in LEVELS else UNKNOWN)
+            columns["mode"].append(MODES.index(feedback_mode) if feedback_mode in MODES else UNKNOWN)
+            columns["works"].append(1 if code_works else 0)
+            for kind, items in (("growth", growth_areas), ("strength", strengths)):
+                codes = sorted({tags.encode(tag_for(item)) for item in items if isinstance(item, str)})
+                columns[f"{kind}_tags"].extend(codes)
+                columns[f"{kind}_offsets"].append(len(columns[f"{kind}_tags"]))
+            due = len(columns["ts"]) >= self.flush_rows or time.monotonic() - self._started >= self.flush_interval
+        if due:
+            self.flush()
+
+    def flush(self):
+        """Write buffered rows as a new segment (no-op when the buffer is empty)."""
+        with self._lock:
+            if not self._columns["ts"]:
+                return
+            columns = self._columns
+            dictionaries = {kind: d.values for kind, d in self._dictionaries.items()}
+            self._reset_buffer()
+        write_segment(self.directory, columns, dictionaries)
+        if len(segment_paths(self.directory)) > COMPACT_SEGMENTS:
+            compact(self.directory, max_rows=COMPACT_MAX_ROWS)
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> Optional[AnalyticsStore]:
+    """The process-wide store configured from the environment (None when disabled)."""
+    global _store
+    if os.environ.get("CODEMENTOR_ANALYTICS", "on").lower() in ("off", "0", "false"):
+        return None
+    with _store_lock:
+        if _store is None:
+            _store = AnalyticsStore()
+            atexit.register(_store.flush)
+        return _store
+
+
+def record_assessment(task: str, learner: str, assessment: dict, feedback_mode: Optional[str] = None):
+    """Record one skill assessment; never lets analytics break the caller.
+
+    The neutral fallback shown after a failed assessment is skipped, so API
+    and parse failures don't show up as intermediate, non-working attempts.
+    """
+    store = get_store()
+    if store is None or assessment.get("fallback"):
+        return
+    try:
+        store.record(
+            task, learner, assessment.get("level"), bool(assessment.get("code_works")), feedback_mode,
+            assessment.get("strengths", []), assessment.get("growth_areas", []),
+        )
+    except OSError:
+        pass
+
+
+# Reading ------------------------------------------------------------------
+
+
+def segment_paths(directory: str = DEFAULT_DIR) -> List[str]:
+    if not os.path.isdir(directory):
+        return []
+    return sorted(
+        os.path.join(directory, name) for name in os.listdir(directory)
+        if name.startswith("seg-") and os.path.exists(os.path.join(directory, name, "meta.json"))
+    )
+
+
+@dataclass
+class Snapshot:
+    """Every row in the store as numpy columns with global dictionary codes."""
+    ts: "object"
+    task: "object"
+    learner: "object"
+    level: "object"
+    mode: "object"
+    works: "object"
+    growth_offsets: "object"
+    growth_tags: "object"
+    strength_offsets: "object"
+    strength_tags: "object"
+    tasks: List[str]
+    learners: List[str]
+    tags: List[str]
+
+    @property
+    def rows(self) -> int:
+        return len(self.ts)
+
+    def select(self, since: Optional[float] = None, task: Optional[str] = None):
+        """Boolean row mask for a time window and/or task."""
+        import numpy as np
+
+        mask = np.ones(self.rows, dtype=bool)
+        if since is not None:
+            mask &= self.ts >= since
+        if task is not None:
+            code = self.tasks.index(task) if task in self.tasks else -1
+            mask &= self.task == code
+        return mask
+
+    def learner_count(self, mask=None) -> int:
+        """Distinct learners among the selected rows."""
+        import numpy as np
+
+        learner = self.learner if mask is None else self.learner[mask]
+        return int(np.count_nonzero(np.bincount(learner, minlength=len(self.learners))))
+
+    def level_distribution(self, mask=None, period: int = 86400) -> dict:
+        """{period start (epoch seconds): [beginner, intermediate, advanced] counts}."""
+        import numpy as np
+
+        ts, level = self.ts, self.level
+        if mask is not None:
+            ts, level = ts[mask], level[mask]
+        known = level < len(LEVELS)
+        ts, level = ts[known], level[known]
+        if not len(ts):
+            return {}
+        start = int(ts.min()) // period
+        bucket = ts // period - start
+        counts = np.bincount(bucket.astype(np.int64) * len(LEVELS) + level, minlength=(int(bucket.max()) + 1) * len(LEVELS))
+        counts = counts.reshape(-1, len(LEVELS))
+        return {(start + i) * period: row.tolist() for i, row in enumerate(counts) if row.any()}
+
+    def pass_rates(self, mask=None) -> Dict[str, dict]:
+        """Per task: attempts, learners and the share of attempts whose code worked."""
+        import numpy as np
+
+        task, works = self.task, self.works
+        if mask is not None:
+            task, works = task[mask], works[mask]
+        attempts = np.bincount(task, minlength=len(self.tasks))
+        passed = np.bincount(task, weights=works, minlength=len(self.tasks))
+        return {
+            name: {"attempts": int(attempts[code]), "pass_rate": float(passed[code] / attempts[code])}
+            for code, name in enumerate(self.tasks) if attempts[code]
+        }
+
+    def top_tags(self, kind: str = "growth", mask=None, per_task: int = 5) -> Dict[str, list]:
+        """Per task, the most common growth-area (or strength) tags as (tag, count).
+
+        Counts only the (task, tag) pairs that occur, so the cost follows the
+        selected rows rather than tasks x tags.
+        """
+        import numpy as np
+
+        offsets, tags = getattr(self, f"{kind}_offsets"), getattr(self, f"{kind}_tags")
+        counts = np.diff(offsets)
+        tag_task = np.repeat(self.task, counts)
+        if mask is not None:
+            keep = np.repeat(mask, counts)
+            tag_task, tags = tag_task[keep], tags[keep]
+        if not len(tags):
+            return {}
+        pairs, totals = np.unique(tag_task.astype(np.int64) * len(self.tags) + tags, return_counts=True)
+        pair_task, pair_tag = pairs // len(self.tags), pairs % len(self.tags)
+        # By task, then most common first (ties by tag code), then rank within each task
+        order = np.lexsort((pair_tag, -totals, pair_task))
+        pair_task, pair_tag, totals = pair_task[order], pair_tag[order], totals[order]
+        starts = np.flatnonzero(np.r_[True, pair_task[1:] != pair_task[:-1]])
+        rank = np.arange(len(pair_task)) - np.repeat(starts, np.diff(np.r_[starts, len(pair_task)]))
+        top = rank < per_task
+        result = {}
+        for task, tag, total in zip(pair_task[top].tolist(), pair_tag[top].tolist(), totals[top].tolist()):
+            result.setdefault(self.tasks[task], []).append((self.tags[tag], total))
+        return result
+
+
+def _read_meta(path: str) -> dict:
+    with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _live_segments(directory: str) -> List[tuple]:
+    """(path, meta) for every current segment, leaving out ones a merged segment already contains."""
+    segments = []
+    for path in segment_paths(directory):
+        try:
+            meta = _read_meta(path)
+        except FileNotFoundError:
+            continue  # removed by a compaction since it was listed
+        if meta.get("version") == SEGMENT_VERSION:
+            segments.append((path, meta))
+    replaced = {name for _, meta in segments for name in meta.get("replaces", ())}
+    return [(path, meta) for path, meta in segments if os.path.basename(path) not in replaced]
+
+
+def load(directory: str = DEFAULT_DIR) -> Optional[Snapshot]:
+    """Memory-map every complete segment into one Snapshot (None when the store is empty)."""
+    for _ in range(3):
+        try:
+            return _load_segments(_live_segments(directory))
+        except FileNotFoundError:
+            continue  # a compaction removed a segment mid-read; list again
+    return _load_segments(_live_segments(directory))
+
+
+def _load_segments(segments: List[tuple]) -> Optional[Snapshot]:
+    import numpy as np
+
+    if not segments:
+        return None
+    global_dicts = {"tasks": {}, "learners": {}, "tags": {}}
+    parts = {column: [] for column in COLUMNS}
+    offset_bases = {"growth": 0, "strength": 0}
+
+    for path, meta in segments:
+        order = "<" if meta["byteorder"] == "little" else ">"
+        remap = {}
+        for kind, values in meta["dictionaries"].items():
+            codes = global_dicts[kind]
+            # The first segment defines the global codes: no remap, the memmap is used as is
+            identity = not codes
+            remap[kind] = None if identity else np.array([codes.setdefault(v, len(codes)) for v in values], dtype=np.uint32)
+            if identity:
+                codes.update((v, i) for i, v in enumerate(values))
+        for column in COLUMNS:
+            file = os.path.join(path, column + ".bin")
+            dtype = np.dtype(order + meta["dtypes"][column])
+            data = np.memmap(file, dtype=dtype, mode="r") if os.path.getsize(file) else np.zeros(0, dtype=dtype)
+            if column in DICTIONARY_COLUMNS:
+                mapping = remap[DICTIONARY_COLUMNS[column]]
+                if mapping is not None:
+                    data = mapping[data]
+            elif column.endswith("_offsets"):
+                kind = column[: -len("_offsets")]
+                base = offset_bases[kind]
+                offset_bases[kind] = base + int(data[-1])
+                if parts[column]:
+                    data = data[1:] + base
+            parts[column].append(data)
+
+    columns = {column: np.concatenate(chunks) if len(chunks) > 1 else chunks[0]
+               for column, chunks in parts.items()}
+    return Snapshot(
+        **columns,
+        tasks=list(global_dicts["tasks"]),
+        learners=list(global_dicts["learners"]),
+        tags=list(global_dicts["tags"]),
+    )
+
+
+def compact(directory: str = DEFAULT_DIR, max_rows: Optional[int] = None) -> int:
+    """Merge segments into one; returns the number merged.
+
+    With `max_rows`, only segments smaller than that are merged, so large
+    ones aren't rewritten on every compaction. Only one process compacts at
+    a time; others return 0.
+    """
+    lock = os.path.join(directory, ".compact.lock")
+    try:
+        fd = os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+    except FileExistsError:
+        try:
+            if time.time() - os.path.getmtime(lock) > COMPACT_LOCK_TIMEOUT:
+                os.remove(lock)  # left behind by a crashed compaction
+        except FileNotFoundError:
+            pass
+        return 0
+    os.close(fd)
+    try:
+        segments = [(path, meta) for path, meta in _live_segments(directory)
+                    if max_rows is None or meta["rows"] < max_rows]
+        if len(segments) < 2:
+            return len(segments)
+        snapshot = _load_segments(segments)
+        columns = {column: getattr(snapshot, column) for column in COLUMNS}
+        write_segment(directory, columns, {"tasks": snapshot.tasks, "learners": snapshot.learners, "tags": snapshot.tags},
+                      replaces=[os.path.basename(path) for path, _ in segments])
+        for path, _ in segments:
+            shutil.rmtree(path, ignore_errors=True)
+        return len(segments)
+    finally:
+        os.remove(lock)
+
+
+# CLI ----------------------------------------------------------------------
+
+
+def synthesize(directory: str, rows: int, days: int = 120, seed: int = 0, custom_tasks: int = 20):
+    """Write `rows` plausible assessment rows as one segment, for trying the dashboard."""
+    import numpy as np
+
+    import gallery
+
+    rng = np.random.default_rng(seed)
+    tasks = [task.id for task in gallery.GALLERY_TASKS] + [f"custom task {i}" for i in range(custom_tasks)]
+    tags = [tag for tag, _ in TAG_RULES] + [OTHER_TAG]
+    now = int(time.time())
+    ts = np.sort(rng.integers(now - days * 86400, now, rows)).astype(np.uint32)
+    # Learners drift from beginner towards advanced over the window
+    progress = (ts - ts.min()) / max(1, int(ts.max() - ts.min()))
+    level = np.clip(np.round(rng.normal(0.6 + 0.8 * progress, 0.7)), 0, 2).astype(np.uint8)
+    task = rng.integers(0, len(tasks), rows).astype(np.uint32)
+    works = (rng.random(rows) < 0.4 + 0.2 * level).astype(np.uint8)
+
+    columns = {
+        "ts": ts, "task": task, "level": level, "works": works,
+        "learner": rng.integers(0, max(1, rows // 20), rows).astype(np.uint32),
+        "mode": rng.integers(0, len(MODES), rows).astype(np.uint8),
+    }
+    learners = [f"learner-{i}" for i in range(max(1, rows // 20))]
+    for kind in ("growth", "strength"):
+        counts = rng.integers(1, 4, rows)
+        columns[f"{kind}_offsets"] = np.concatenate([[0], np.cumsum(counts)]).astype(np.uint32)
+        weights = rng.dirichlet(np.ones(len(tags)) * 0.5)
+        columns[f"{kind}_tags"] = rng.choice(len(tags), int(counts.sum()), p=weights).astype(np.uint32)
+    write_segment(directory, columns, {"tasks": tasks, "learners": learners, "tags": tags})
+
+
+def bench(directory: str, repeat: int = 5):
+    """Time a cold load and each dashboard aggregation (best of `repeat`)."""
+    timings = {}
+    for name, run in (
+        ("load", lambda: load(directory)),
+        ("level_distribution", lambda: snapshot.level_distribution()),
+        ("top_growth_areas", lambda: snapshot.top_tags("growth")),
+        ("pass_rates", lambda: snapshot.pass_rates()),
+    ):
+        best = float("inf")
+        for _ in range(repeat):
+            started = time.perf_counter()
+            result = run()
+            best = min(best, time.perf_counter() - started)
+        if name == "load":
+            snapshot = result
+        timings[name] = best
+    print(f"{snapshot.rows:,} rows in {len(segment_paths(directory))} segment(s)")
+    for name, seconds in timings.items():
+        print(f"  {name:<20} {seconds * 1000:8.1f} ms")
+    print(f"  {'total':<20} {sum(timings.values()) * 1000:8.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dir", default=DEFAULT_DIR, help="store directory")
+    commands = parser.add_subparsers(dest="command", required=True)
+    synth_parser = commands.add_parser("synth", help="append synthetic rows")
+    synth_parser.add_argument("--rows", type=int, default=1_000_000)
+    synth_parser.add_argument("--days", type=int, default=120)
+    synth_parser.add_argument("--seed", type=int, default=0)
+    synth_parser.add_argument("--custom-tasks", type=int, default=20,
+                              help="free-text tasks besides the gallery's (learners' own tasks are unbounded)")
+    commands.add_parser("compact", help="merge all segments into one")
+    commands.add_parser("bench", help="time loading and aggregations")
+    args = parser.parse_args()
+
+    if args.command == "synth":
+        synthesize(args.dir, args.rows, args.days, args.seed, args.custom_tasks)
+        print(f"wrote {args.rows:,} rows to {args.dir}")
+    elif args.command == "compact":
+        print(f"merged {compact(args.dir)} segment(s)")
+    else:
+        bench(args.dir)
+
+
+if __name__ == "__main__":
+    main()
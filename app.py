@@ -8,10 +8,18 @@ An educational tool that helps users understand AI-generated code by:
 4. Comparing readability vs performance trade-offs
 """
 
+import uuid
+
 import streamlit as st
-import anthropic
-import time
-import re
+
+import analytics
+import assets
+import code_metrics
+import gallery
+import similarity_index
+import telemetry
+from mentor import assess_skill_level, generate_pedagogical_review, generate_starter_code
+from review_parser import parse_review
 
 # Page configuration
 st.set_page_config(
@@ -21,502 +29,29 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Custom CSS for a refined, educational aesthetic
-st.markdown("""
-<style>
-    @import url('https://fonts.googleapis.com/css2?family=JetBrains+Mono:wght@400;500;600;700&family=Source+Serif+4:opsz,wght@8..60,400;8..60,600;8..60,700&family=DM+Sans:wght@400;500;600;700&display=swap');
-    
-    :root {
-        --bg-primary: #0d1117;
-        --bg-secondary: #161b22;
-        --bg-tertiary: #21262d;
-        --text-primary: #e6edf3;
-        --text-secondary: #8b949e;
-        --accent-green: #3fb950;
-        --accent-blue: #58a6ff;
-        --accent-purple: #a371f7;
-        --accent-orange: #d29922;
-        --accent-red: #f85149;
-        --border-color: #30363d;
-    }
-    
-    .stApp {
-        background: linear-gradient(135deg, var(--bg-primary) 0%, #0a0e14 100%);
-    }
-    
-    /* Main title styling */
-    .main-title {
-        font-family: 'Source Serif 4', Georgia, serif;
-        font-size: 3.2rem;
-        font-weight: 700;
-        background: linear-gradient(135deg, var(--accent-green) 0%, var(--accent-blue) 50%, var(--accent-purple) 100%);
-        -webkit-background-clip: text;
-        -webkit-text-fill-color: transparent;
-        background-clip: text;
-        margin-bottom: 0.5rem;
-        letter-spacing: -0.02em;
-    }
-    
-    .subtitle {
-        font-family: 'DM Sans', sans-serif;
-        font-size: 1.15rem;
-        color: var(--text-secondary);
-        margin-bottom: 2rem;
-        font-weight: 400;
-    }
-    
-    /* Card styling */
-    .mentor-card {
-        background: var(--bg-secondary);
-        border: 1px solid var(--border-color);
-        border-radius: 12px;
-        padding: 1.5rem;
-        margin-bottom: 1.5rem;
-        transition: all 0.3s ease;
-    }
-    
-    .mentor-card:hover {
-        border-color: var(--accent-blue);
-        box-shadow: 0 0 20px rgba(88, 166, 255, 0.1);
-    }
-    
-    /* Section headers */
-    .section-header {
-        font-family: 'DM Sans', sans-serif;
-        font-size: 1.3rem;
-        font-weight: 600;
-        color: var(--text-primary);
-        margin-bottom: 1rem;
-        display: flex;
-        align-items: center;
-        gap: 0.5rem;
-    }
-    
-    /* Level badges */
-    .level-badge {
-        display: inline-block;
-        padding: 0.4rem 1rem;
-        border-radius: 20px;
-        font-family: 'DM Sans', sans-serif;
-        font-size: 0.85rem;
-        font-weight: 600;
-        text-transform: uppercase;
-        letter-spacing: 0.05em;
-    }
-    
-    .level-beginner {
-        background: linear-gradient(135deg, #238636 0%, #2ea043 100%);
-        color: white;
-    }
-    
-    .level-intermediate {
-        background: linear-gradient(135deg, #1f6feb 0%, #388bfd 100%);
-        color: white;
-    }
-    
-    .level-advanced {
-        background: linear-gradient(135deg, #8957e5 0%, #a371f7 100%);
-        color: white;
-    }
-    
-    /* Explanation boxes */
-    .explanation-box {
-        background: var(--bg-tertiary);
-        border-left: 4px solid var(--accent-blue);
-        border-radius: 0 8px 8px 0;
-        padding: 1.2rem;
-        margin: 1rem 0;
-        font-family: 'DM Sans', sans-serif;
-    }
-    
-    .readability-box {
-        border-left-color: var(--accent-green);
-    }
-    
-    .performance-box {
-        border-left-color: var(--accent-orange);
-    }
-    
-    .tradeoff-box {
-        border-left-color: var(--accent-purple);
-    }
-    
-    /* Code comparison styling */
-    .code-label {
-        font-family: 'JetBrains Mono', monospace;
-        font-size: 0.75rem;
-        font-weight: 600;
-        text-transform: uppercase;
-        letter-spacing: 0.1em;
-        padding: 0.3rem 0.8rem;
-        border-radius: 4px;
-        margin-bottom: 0.5rem;
-        display: inline-block;
-    }
-    
-    .your-code-label {
-        background: var(--accent-orange);
-        color: var(--bg-primary);
-    }
-    
-    .improved-code-label {
-        background: var(--accent-green);
-        color: var(--bg-primary);
-    }
-    
-    /* Metric cards */
-    .metric-row {
-        display: flex;
-        gap: 1rem;
-        margin: 1rem 0;
-    }
-    
-    .metric-card {
-        flex: 1;
-        background: var(--bg-tertiary);
-        border-radius: 8px;
-        padding: 1rem;
-        text-align: center;
-        border: 1px solid var(--border-color);
-    }
-    
-    .metric-value {
-        font-family: 'JetBrains Mono', monospace;
-        font-size: 1.8rem;
-        font-weight: 700;
-        color: var(--accent-blue);
-    }
-    
-    .metric-label {
-        font-family: 'DM Sans', sans-serif;
-        font-size: 0.8rem;
-        color: var(--text-secondary);
-        text-transform: uppercase;
-        letter-spacing: 0.05em;
-    }
-    
-    /* Sidebar styling */
-    section[data-testid="stSidebar"] {
-        background: var(--bg-secondary);
-        border-right: 1px solid var(--border-color);
-    }
-    
-    section[data-testid="stSidebar"] .stMarkdown {
-        font-family: 'DM Sans', sans-serif;
-    }
-    
-    /* Input styling */
-    .stTextArea textarea {
-        font-family: 'JetBrains Mono', monospace !important;
-        background: var(--bg-tertiary) !important;
-        border: 1px solid var(--border-color) !important;
-        border-radius: 8px !important;
-        color: var(--text-primary) !important;
-    }
-    
-    .stTextArea textarea:focus {
-        border-color: var(--accent-blue) !important;
-        box-shadow: 0 0 0 2px rgba(88, 166, 255, 0.2) !important;
-    }
-    
-    /* Button styling */
-    .stButton > button {
-        font-family: 'DM Sans', sans-serif !important;
-        font-weight: 600 !important;
-        border-radius: 8px !important;
-        padding: 0.6rem 1.5rem !important;
-        transition: all 0.2s ease !important;
-    }
-    
-    .stButton > button[kind="primary"] {
-        background: linear-gradient(135deg, var(--accent-blue) 0%, var(--accent-purple) 100%) !important;
-        border: none !important;
-    }
-    
-    .stButton > button:hover {
-        transform: translateY(-2px);
-        box-shadow: 0 4px 12px rgba(88, 166, 255, 0.3);
-    }
-    
-    /* Expander styling */
-    .streamlit-expanderHeader {
-        font-family: 'DM Sans', sans-serif !important;
-        font-weight: 600 !important;
-        background: var(--bg-tertiary) !important;
-        border-radius: 8px !important;
-    }
-    
-    /* Tips callout */
-    .tip-callout {
-        background: linear-gradient(135deg, rgba(63, 185, 80, 0.1) 0%, rgba(88, 166, 255, 0.1) 100%);
-        border: 1px solid rgba(63, 185, 80, 0.3);
-        border-radius: 8px;
-        padding: 1rem;
-        margin: 1rem 0;
-    }
-    
-    .tip-callout h4 {
-        font-family: 'DM Sans', sans-serif;
-        color: var(--accent-green);
-        margin: 0 0 0.5rem 0;
-        font-size: 0.9rem;
-        font-weight: 600;
-    }
-    
-    /* Progress indicator */
-    .step-indicator {
-        display: flex;
-        justify-content: center;
-        gap: 2rem;
-        margin: 2rem 0;
-    }
-    
-    .step {
-        display: flex;
-        flex-direction: column;
-        align-items: center;
-        gap: 0.5rem;
-    }
-    
-    .step-number {
-        width: 40px;
-        height: 40px;
-        border-radius: 50%;
-        display: flex;
-        align-items: center;
-        justify-content: center;
-        font-family: 'JetBrains Mono', monospace;
-        font-weight: 700;
-        font-size: 1.1rem;
-    }
-    
-    .step-active {
-        background: linear-gradient(135deg, var(--accent-blue) 0%, var(--accent-purple) 100%);
-        color: white;
-    }
-    
-    .step-complete {
-        background: var(--accent-green);
-        color: white;
-    }
-    
-    .step-pending {
-        background: var(--bg-tertiary);
-        color: var(--text-secondary);
-        border: 2px solid var(--border-color);
-    }
-    
-    .step-label {
-        font-family: 'DM Sans', sans-serif;
-        font-size: 0.8rem;
-        color: var(--text-secondary);
-    }
-    
-    /* Hide Streamlit branding */
-    #MainMenu {visibility: hidden;}
-    footer {visibility: hidden;}
-    header {visibility: hidden;}
-    
-    /* Tab styling */
-    .stTabs [data-baseweb="tab-list"] {
-        gap: 8px;
-    }
-    
-    .stTabs [data-baseweb="tab"] {
-        font-family: 'DM Sans', sans-serif !important;
-        font-weight: 500 !important;
-        background: var(--bg-tertiary) !important;
-        border-radius: 8px 8px 0 0 !important;
-        padding: 0.5rem 1.5rem !important;
-    }
-    
-    .stTabs [aria-selected="true"] {
-        background: var(--bg-secondary) !important;
-        border-bottom: 2px solid var(--accent-blue) !important;
-    }
-</style>
-""", unsafe_allow_html=True)
-
-
-def get_client():
-    """Initialize Anthropic client."""
-    return anthropic.Anthropic()
-
-
-def assess_skill_level(user_code: str, task_description: str) -> dict:
-    """Assess the user's coding skill level based on their attempt."""
-    client = get_client()
-    
-    prompt = f"""Analyze this code attempt and assess the programmer's skill level.
+# Custom CSS for a refined, educational aesthetic. The stylesheet and fonts are
+# self-hosted (see assets.py); where the server sends .css as text/css, each
+# rerun only re-sends a small <link> whose content-hashed URL the browser
+# keeps cached, otherwise the CSS is inlined.
+st.markdown(assets.style_html(st.get_option("server.enableStaticServing")), unsafe_allow_html=True)
 
-Task Description: {task_description}
 
-User's Code Attempt:
-```python
-{user_code}
-```
-
-Provide a JSON response with:
-1. "level": one of "beginner", "intermediate", or "advanced"
-2. "code_works": boolean - true if the code would work correctly for the task (may have minor issues but fundamentally solves it), false if it has bugs or wouldn't work
-3. "code_issues": if code_works is false, list 1-3 specific issues that would prevent it from working
-4. "indicators": list of 3-5 specific observations that informed your assessment
-5. "strengths": list of 2-3 things they did well (even if basic)
-6. "growth_areas": list of 2-3 specific areas for improvement
-
-Consider:
-- Code structure and organization
-- Use of Python idioms and conventions
-- Error handling awareness
-- Efficiency considerations
-- Naming conventions and readability
-
-Respond ONLY with valid JSON, no markdown formatting."""
-
-    response = client.messages.create(
-        model="claude-sonnet-4-20250514",
-        max_tokens=1000,
-        messages=[{"role": "user", "content": prompt}]
-    )
-    
-    try:
-        import json
-        return json.loads(response.content[0].text)
-    except:
-        return {
-            "level": "intermediate",
-            "code_works": False,
-            "code_issues": [],
-            "indicators": ["Unable to parse assessment"],
-            "strengths": ["Attempted the problem"],
-            "growth_areas": ["Continue practicing"]
-        }
-
-
-def generate_pedagogical_review(task_description: str, user_code: str, skill_level: str, feedback_mode: str, code_works: bool) -> str:
-    """Generate a comprehensive pedagogical code review."""
-    client = get_client()
-    
-    if feedback_mode == "concise":
-        prompt = f"""You are CodeMentor, an expert programming educator. A {skill_level}-level programmer has asked you to help them understand code generation.
-
-Their request: "{task_description}"
-
-Their attempt:
-```python
-{user_code}
-```
-
-{"Their code works correctly! Start with congratulations." if code_works else "Their code has issues that need fixing."}
-
-Provide a CONCISE code review with:
-
-1. **{"🎉 CONGRATULATIONS" if code_works else "QUICK ASSESSMENT"}** (1-2 sentences)
-   {"Congratulate them - their code works! Note it can still be improved." if code_works else "Briefly note the main issue."}
-
-2. **IMPROVED SOLUTION**
-   Provide a clean, improved Python solution with brief inline comments.
-
-3. **LINE-BY-LINE FIXES** (bullet points, max 5)
-   For each issue or improvement:
-   - `their code` → `improved code`: One sentence explanation
-   
-   Focus on the most important changes. Be direct and brief.
-
-4. **KEY TAKEAWAY** (1 sentence)
-   The single most important lesson from this review.
-
-Keep the entire response under 400 words. Be direct, no fluff."""
-
-    else:  # detailed mode
-        prompt = f"""You are CodeMentor, an expert programming educator. A {skill_level}-level programmer has asked you to help them understand code generation.
-
-Their request: "{task_description}"
-
-Their attempt:
-```python
-{user_code}
-```
-
-{"Their code works correctly! Start with congratulations before suggesting improvements." if code_works else "Their code has issues that need fixing."}
-
-Provide a comprehensive, educational response that:
-
-1. **{"🎉 CONGRATULATIONS!" if code_works else "ACKNOWLEDGE THEIR EFFORT"}** (2-3 sentences)
-   {"Congratulate them warmly - their code works! Then mention you'll show some refinements." if code_works else "Recognize what they tried to do and point out something specific they did reasonably well."}
-
-2. **IMPROVED SOLUTION**
-   - Provide a well-crafted Python solution
-   - Include helpful comments explaining key decisions
-   - Match complexity to their {skill_level} level
-
-3. **LINE-BY-LINE LEARNING** (for 3-5 key improvements)
-   For each improvement, explain:
-   - WHAT changed (be specific about the code)
-   - WHY it's better (the reasoning)
-   - THE TRADEOFF between readability and performance
-   
-   Use this format for each:
-   
-   **Improvement: [Name of the improvement]**
-   
-   *Your code:* `[their specific code snippet]`
-   
-   *Improved:* `[the improved version]`
-   
-   *Why this is better:*
-   [Explanation tailored to their level]
-   
-   *Readability vs Performance:*
-   - 📖 Readability: [Score 1-5 stars] - [Brief explanation]
-   - ⚡ Performance: [Score 1-5 stars] - [Brief explanation]
-   - 🎯 Recommendation: [Which to prioritize for this case and why]
-
-4. **PYTHONIC PATTERNS LEARNED**
-   List 2-3 Python idioms or patterns demonstrated, with simple explanations
-
-5. **NEXT CHALLENGE**
-   Suggest one way they could extend or improve this code to practice further
-
-Tailor your language to a {skill_level} programmer:
-- Beginner: Use analogies, avoid jargon, be encouraging
-- Intermediate: Balance explanation with efficiency, introduce best practices
-- Advanced: Focus on nuances, edge cases, and optimization strategies
-
-Be warm, encouraging, and genuinely helpful. Use emojis sparingly for visual breaks."""
-
-    response = client.messages.create(
-        model="claude-sonnet-4-20250514",
-        max_tokens=3000,
-        messages=[{"role": "user", "content": prompt}]
-    )
-    
-    return response.content[0].text
+@st.cache_resource
+def init_telemetry():
+    """Start the telemetry exporters once per server process."""
+    telemetry.configure_from_env()
 
 
-def generate_starter_code(task_description: str) -> str:
-    """Generate a basic starter template based on the task."""
-    client = get_client()
-    
-    prompt = f"""Given this coding task: "{task_description}"
+init_telemetry()
 
-Generate a minimal Python code SKELETON that:
-1. Has the basic structure (function definition, main variables)
-2. Includes TODO comments showing what needs to be implemented
-3. Is intentionally incomplete - the user needs to fill in the logic
-4. Uses descriptive placeholder variable names
 
-The goal is to give them a starting point without solving it for them.
+@st.cache_resource
+def load_gallery():
+    """Load the precomputed example-task bundle once per server process (None if not built)."""
+    return gallery.load_bundle()
 
-Return ONLY the code, no explanations. Keep it under 15 lines."""
 
-    response = client.messages.create(
-        model="claude-sonnet-4-20250514",
-        max_tokens=500,
-        messages=[{"role": "user", "content": prompt}]
-    )
-    
-    return response.content[0].text
+GALLERY = load_gallery()
 
 
 # Initialize session state
@@ -530,10 +65,16 @@ if "skill_assessment" not in st.session_state:
     st.session_state.skill_assessment = None
 if "review" not in st.session_state:
     st.session_state.review = None
+if "parsed_review" not in st.session_state:
+    st.session_state.parsed_review = None
+if "review_similarity" not in st.session_state:
+    st.session_state.review_similarity = None
 if "feedback_mode" not in st.session_state:
     st.session_state.feedback_mode = "detailed"
 if "task_mode" not in st.session_state:
     st.session_state.task_mode = "generate"  # "generate" or "review"
+if "learner_id" not in st.session_state:
+    st.session_state.learner_id = uuid.uuid4().hex  # anonymous, for progression analytics
 
 
 # Sidebar
@@ -581,51 +122,96 @@ with st.sidebar:
         st.rerun()
 
 
-# Main content
-st.markdown('<h1 class="main-title">CodeMentor</h1>', unsafe_allow_html=True)
-st.markdown('<p class="subtitle">Learn to code by doing, then understanding. AI-powered education that makes you a better programmer.</p>', unsafe_allow_html=True)
-
 # Progress indicator
-if st.session_state.task_mode == "review":
-    # Two-step flow for review mode
-    step_states_review = ["complete" if st.session_state.step > 1 else "active" if st.session_state.step == 1 else "pending",
-                          "active" if st.session_state.step == 3 else "pending"]
-    st.markdown(f"""
-    <div class="step-indicator">
-        <div class="step">
-            <div class="step-number step-{step_states_review[0]}">1</div>
-            <span class="step-label">Paste Code</span>
-        </div>
-        <div class="step">
-            <div class="step-number step-{step_states_review[1]}">2</div>
-            <span class="step-label">Learn & Improve</span>
-        </div>
-    </div>
-    """, unsafe_allow_html=True)
-else:
-    # Three-step flow for generate mode
-    step_states = ["complete" if st.session_state.step > i else "active" if st.session_state.step == i else "pending" for i in range(1, 4)]
-    st.markdown(f"""
-    <div class="step-indicator">
-        <div class="step">
-            <div class="step-number step-{step_states[0]}">1</div>
-            <span class="step-label">Describe Task</span>
-        </div>
-        <div class="step">
-            <div class="step-number step-{step_states[1]}">2</div>
-            <span class="step-label">Your Attempt</span>
+def render_progress():
+    """Draw the step indicator for the current task mode."""
+    if st.session_state.task_mode == "review":
+        # Two-step flow for review mode
+        step_states_review = ["complete" if st.session_state.step > 1 else "active" if st.session_state.step == 1 else "pending",
+                              "active" if st.session_state.step == 3 else "pending"]
+        st.markdown(f"""
+        <div class="step-indicator">
+            <div class="step">
+                <div class="step-number step-{step_states_review[0]}">1</div>
+                <span class="step-label">Paste Code</span>
+            </div>
+            <div class="step">
+                <div class="step-number step-{step_states_review[1]}">2</div>
+                <span class="step-label">Learn & Improve</span>
+            </div>
         </div>
-        <div class="step">
-            <div class="step-number step-{step_states[2]}">3</div>
-            <span class="step-label">Learn & Improve</span>
+        """, unsafe_allow_html=True)
+    else:
+        # Three-step flow for generate mode
+        step_states = ["complete" if st.session_state.step > i else "active" if st.session_state.step == i else "pending" for i in range(1, 4)]
+        st.markdown(f"""
+        <div class="step-indicator">
+            <div class="step">
+                <div class="step-number step-{step_states[0]}">1</div>
+                <span class="step-label">Describe Task</span>
+            </div>
+            <div class="step">
+                <div class="step-number step-{step_states[1]}">2</div>
+                <span class="step-label">Your Attempt</span>
+            </div>
+            <div class="step">
+                <div class="step-number step-{step_states[2]}">3</div>
+                <span class="step-label">Learn & Improve</span>
+            </div>
         </div>
-    </div>
-    """, unsafe_allow_html=True)
+        """, unsafe_allow_html=True)
 
-st.markdown("---")
+    st.markdown("---")
 
-# Step 1: Task Description
-if st.session_state.step == 1:
+
+def set_session_value(name: str, value):
+    """Button callback: update session state before the (fragment) rerun starts."""
+    st.session_state[name] = value
+
+
+def use_example(description: str):
+    """Example button callback: switch to generate mode and fill in the task."""
+    st.session_state.task_mode = "generate"
+    st.session_state.task_input = description
+
+
+# Interactive parts of the page are fragments: a click inside one reruns only
+# that fragment, so toggles no longer rebuild the CSS, sidebar or Step 3 review.
+@st.fragment
+def render_feedback_mode_selector():
+    """Detailed / Concise feedback toggle."""
+    st.markdown("**Choose your feedback style:**")
+    
+    col_mode1, col_mode2 = st.columns(2)
+    
+    with col_mode1:
+        detailed_selected = st.session_state.feedback_mode == "detailed"
+        st.button(
+            "📚 Detailed Feedback" + (" ✓" if detailed_selected else ""),
+            use_container_width=True,
+            type="primary" if detailed_selected else "secondary",
+            on_click=set_session_value,
+            args=("feedback_mode", "detailed")
+        )
+        st.caption("In-depth explanations with readability vs performance analysis")
+    
+    with col_mode2:
+        concise_selected = st.session_state.feedback_mode == "concise"
+        st.button(
+            "⚡ Concise Feedback" + (" ✓" if concise_selected else ""),
+            use_container_width=True,
+            type="primary" if concise_selected else "secondary",
+            on_click=set_session_value,
+            args=("feedback_mode", "concise")
+        )
+        st.caption("Quick line-by-line fixes, straight to the point")
+
+
+@st.fragment
+def render_task_step():
+    """Step 1: task mode, task/code inputs and feedback style."""
+    render_progress()
+    
     st.markdown('<div class="section-header">📝 Step 1: What would you like to do?</div>', unsafe_allow_html=True)
     
     # Task mode selection
@@ -635,24 +221,24 @@ if st.session_state.step == 1:
     
     with col_gen:
         gen_selected = st.session_state.task_mode == "generate"
-        if st.button(
+        st.button(
             "🆕 Generate New Code" + (" ✓" if gen_selected else ""),
             use_container_width=True,
-            type="primary" if gen_selected else "secondary"
-        ):
-            st.session_state.task_mode = "generate"
-            st.rerun()
+            type="primary" if gen_selected else "secondary",
+            on_click=set_session_value,
+            args=("task_mode", "generate")
+        )
         st.caption("Describe a task, attempt it yourself, then learn from feedback")
     
     with col_rev:
         rev_selected = st.session_state.task_mode == "review"
-        if st.button(
+        st.button(
             "🔍 Review Existing Code" + (" ✓" if rev_selected else ""),
             use_container_width=True,
-            type="primary" if rev_selected else "secondary"
-        ):
-            st.session_state.task_mode = "review"
-            st.rerun()
+            type="primary" if rev_selected else "secondary",
+            on_click=set_session_value,
+            args=("task_mode", "review")
+        )
         st.caption("Paste code you've already written for a pedagogical review")
     
     st.markdown("---")
@@ -670,7 +256,8 @@ if st.session_state.step == 1:
             "Describe your coding task",
             placeholder="Generate code that...\n\nExample: Generate code that finds all prime numbers up to N using an efficient algorithm",
             height=120,
-            label_visibility="collapsed"
+            label_visibility="collapsed",
+            key="task_input"
         )
         
     else:
@@ -698,31 +285,7 @@ if st.session_state.step == 1:
         )
     
     st.markdown("---")
-    st.markdown("**Choose your feedback style:**")
-    
-    col_mode1, col_mode2 = st.columns(2)
-    
-    with col_mode1:
-        detailed_selected = st.session_state.feedback_mode == "detailed"
-        if st.button(
-            "📚 Detailed Feedback" + (" ✓" if detailed_selected else ""),
-            use_container_width=True,
-            type="primary" if detailed_selected else "secondary"
-        ):
-            st.session_state.feedback_mode = "detailed"
-            st.rerun()
-        st.caption("In-depth explanations with readability vs performance analysis")
-    
-    with col_mode2:
-        concise_selected = st.session_state.feedback_mode == "concise"
-        if st.button(
-            "⚡ Concise Feedback" + (" ✓" if concise_selected else ""),
-            use_container_width=True,
-            type="primary" if concise_selected else "secondary"
-        ):
-            st.session_state.feedback_mode = "concise"
-            st.rerun()
-        st.caption("Quick line-by-line fixes, straight to the point")
+    render_feedback_mode_selector()
     
     st.markdown("---")
     
@@ -749,46 +312,30 @@ if st.session_state.step == 1:
     
     with col2:
         with st.expander("📚 Example tasks to try"):
-            st.markdown("""
-            - Generate code that **reverses words in a sentence** while preserving punctuation
-            - Generate code that **validates email addresses** using regex
-            - Generate code that **finds the longest palindromic substring** in a string
-            - Generate code that **merges two sorted lists** efficiently
-            - Generate code that **implements a simple LRU cache** using a dictionary
-            - Generate code that **flattens a nested list** of arbitrary depth
-            """)
-
-# Step 2: User's Attempt
-elif st.session_state.step == 2:
-    st.markdown('<div class="section-header">💻 Step 2: Give it a try!</div>', unsafe_allow_html=True)
-    
-    st.markdown(f"""
-    <div class="mentor-card">
-        <strong>Your task:</strong> {st.session_state.task_description}
-    </div>
-    """, unsafe_allow_html=True)
-    
-    st.markdown("""
-    <div class="tip-callout">
-        <h4>🧠 Why attempt first?</h4>
-        Writing your own solution—even if imperfect—helps you:
-        <ul>
-            <li>Identify what you already know</li>
-            <li>Recognize gaps in your understanding</li>
-            <li>Better appreciate the improvements later</li>
-        </ul>
-        <em>There's no wrong answer here. Any attempt helps you learn!</em>
-    </div>
-    """, unsafe_allow_html=True)
-    
+            for example in gallery.GALLERY_TASKS:
+                st.button(
+                    example.title,
+                    key=f"example_{example.id}",
+                    help=example.description,
+                    use_container_width=True,
+                    on_click=use_example,
+                    args=(example.description,)
+                )
+
+
+@st.fragment
+def render_attempt_editor():
+    """Step 2: starter template button and the code editor."""
     # Option to get a starter template
     col1, col2 = st.columns([1, 3])
     with col1:
         if st.button("🎯 Get Starter Template", use_container_width=True):
             with st.spinner("Generating starter code..."):
-                starter = generate_starter_code(st.session_state.task_description)
+                starter = GALLERY and GALLERY.starter_for(st.session_state.task_description)
+                if not starter:
+                    starter = generate_starter_code(st.session_state.task_description)
+                # The editor below is drawn after this, so it already picks up the starter
                 st.session_state.user_code = starter
-                st.rerun()
     
     with col2:
         st.caption("Stuck? Get a basic structure to fill in (won't give away the solution)")
@@ -817,48 +364,234 @@ elif st.session_state.step == 2:
             else:
                 st.error("Please write some code first—even a partial attempt helps!")
 
-# Step 3: Pedagogical Review
-elif st.session_state.step == 3:
-    st.markdown('<div class="section-header">🎓 Step 3: Let\'s learn together!</div>', unsafe_allow_html=True)
+
+@st.fragment
+def render_review_actions():
+    """Step 3 action bar."""
+    col1, col2, col3 = st.columns(3)
     
-    # Assess skill level if not done
-    if st.session_state.skill_assessment is None:
-        with st.spinner("🔍 Analyzing your coding style..."):
-            st.session_state.skill_assessment = assess_skill_level(
-                st.session_state.user_code,
-                st.session_state.task_description
-            )
+    with col1:
+        if st.button("🔄 Try Another Task", use_container_width=True):
+            st.session_state.step = 1
+            st.session_state.task_description = ""
+            st.session_state.user_code = ""
+            st.session_state.skill_assessment = None
+            st.session_state.review = None
+            st.rerun()
     
-    # Display skill assessment
-    level = st.session_state.skill_assessment.get("level", "intermediate")
-    code_works = st.session_state.skill_assessment.get("code_works", False)
-    code_issues = st.session_state.skill_assessment.get("code_issues", [])
+    with col2:
+        if st.session_state.task_mode == "generate":
+            if st.button("✏️ Revise My Code", use_container_width=True):
+                st.session_state.step = 2
+                st.session_state.skill_assessment = None
+                st.session_state.review = None
+                st.rerun()
+        else:
+            if st.button("✏️ Edit & Re-review", use_container_width=True):
+                st.session_state.step = 1
+                st.session_state.skill_assessment = None
+                st.session_state.review = None
+                st.rerun()
+    
+    with col3:
+        if st.button("🔀 Switch to " + ("Concise" if st.session_state.feedback_mode == "detailed" else "Detailed"), use_container_width=True):
+            st.session_state.feedback_mode = "concise" if st.session_state.feedback_mode == "detailed" else "detailed"
+            st.session_state.review = None
+            st.rerun()
+
+
+# Sections longer than this start collapsed
+LONG_SECTION_CHARS = 1200
+
+
+def improvement_label(improvement) -> str:
+    """Expander label for one improvement, with its ratings when the model gave them."""
+    label = improvement.title
+    if improvement.readability and improvement.readability.stars:
+        label += f"  ·  📖 {improvement.readability.stars}/5"
+    if improvement.performance and improvement.performance.stars:
+        label += f"  ·  ⚡ {improvement.performance.stars}/5"
+    return label
+
+
+def render_review(parsed):
+    """Render a parsed review section by section, or as plain markdown if it didn't parse."""
+    if not parsed.sections:
+        st.markdown(parsed.raw)
+        return
     
-    level_colors = {
-        "beginner": "level-beginner",
-        "intermediate": "level-intermediate", 
-        "advanced": "level-advanced"
-    }
+    # Jump links to each titled section
+    links = [f"[{section.title}](#review-{i})" for i, section in enumerate(parsed.sections) if section.title]
+    if len(links) > 1:
+        st.caption(" · ".join(links))
+    
+    for i, section in enumerate(parsed.sections):
+        if section.title:
+            st.subheader(section.title, anchor=f"review-{i}")
+        
+        if section.kind == "improvements" and any("\n" in item.body for item in parsed.improvements):
+            # One collapsible block per improvement; the first starts open
+            for n, improvement in enumerate(parsed.improvements):
+                with st.expander(improvement_label(improvement), expanded=n == 0):
+                    st.markdown(improvement.body)
+        elif len(section.body) > LONG_SECTION_CHARS and section.kind != "solution":
+            with st.expander("Show section", expanded=False):
+                st.markdown(section.body)
+        else:
+            st.markdown(section.body)
+
+
+LEVEL_COLORS = {
+    "beginner": "level-beginner",
+    "intermediate": "level-intermediate",
+    "advanced": "level-advanced"
+}
+
+
+def render_assessment(assessment: dict, slots: dict):
+    """Fill the Step 3 assessment slots; called again as each streamed field arrives."""
+    level = assessment.get("level")
+    code_works = assessment.get("code_works")
     
     # Congratulations banner if code works
     if code_works:
-        st.success("🎉 **Congratulations!** Your code works! It solves the task correctly. Below are some refinements to make it even better.")
+        slots["banner"].success("🎉 **Congratulations!** Your code works! It solves the task correctly. Below are some refinements to make it even better.")
+    else:
+        slots["banner"].empty()
+    
+    if level:
+        badge = f'<span class="level-badge {LEVEL_COLORS.get(level, "level-intermediate")}">{level}</span>'
+    else:
+        badge = '<span class="level-badge level-pending">assessing…</span>'
+    slots["profile"].markdown(f"""
+    <div class="mentor-card">
+        <div class="section-header">📊 Your Profile</div>
+        <p style="margin-bottom: 1rem;">
+            {badge}
+        </p>
+        <p style="color: #8b949e; font-size: 0.9rem;">
+            {st.session_state.feedback_mode.title()} feedback mode
+        </p>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    for name, heading, marker in (("strengths", "#### 💪 Your Strengths", "✅"), ("growth_areas", "#### 🌱 Growth Areas", "🎯")):
+        with slots[name].container():
+            st.markdown(heading)
+            for item in assessment.get(name, []):
+                st.markdown(f"{marker} {item}")
+            if name not in assessment:
+                st.caption("Assessing…")
+    
+    # Show code issues if code doesn't work
+    code_issues = assessment.get("code_issues", [])
+    if code_works is False and code_issues:
+        with slots["code_issues"].container():
+            st.markdown("#### ⚠️ Issues to Fix")
+            for issue in code_issues:
+                st.markdown(f"❌ {issue}")
+    else:
+        slots["code_issues"].empty()
+
+
+def render_code_metrics(slot, metrics, improved=None):
+    """Metric cards for the learner's code; with `improved`, deltas show what the improved solution changes."""
+    with slot.container():
+        st.markdown("#### 🔬 Code Metrics")
+        if not metrics.parsed:
+            st.caption(f"Couldn't analyze your code: it doesn't parse ({metrics.error}).")
+            return
+        if improved is not None and not improved.parsed:
+            improved = None
+        naming = round(100 * metrics.identifier_score)
+        cards = (
+            ("Complexity", metrics.max_function_complexity,
+             improved and improved.max_function_complexity, "inverse",
+             f"Cyclomatic complexity of the most complex function ({code_metrics.complexity_label(metrics.max_function_complexity)}); {metrics.complexity} for the whole snippet"),
+            ("Loop nesting", metrics.max_loop_depth, improved and improved.max_loop_depth, "inverse",
+             "Deepest nesting of loops and comprehensions"),
+            ("Quadratic patterns", len(metrics.quadratic), improved and len(improved.quadratic), "inverse",
+             "Linear-time operations repeated inside a loop"),
+            ("Longest function", metrics.longest_function[1] if metrics.longest_function else 0,
+             improved and (improved.longest_function[1] if improved.longest_function else 0), "inverse",
+             "Lines in the longest function"),
+            ("Naming", naming, improved and round(100 * improved.identifier_score), "normal",
+             "Share of identifiers that are descriptive snake_case names and don't shadow built-ins"),
+        )
+        for column, (label, value, after, color, help_text) in zip(st.columns(len(cards)), cards):
+            delta = None
+            if improved is not None:
+                delta = f"{after - value:+d} in improved" if after != value else "same in improved"
+            column.metric(label, f"{value}%" if label == "Naming" else value, delta=delta,
+                          delta_color=color if delta and after != value else "off", help=help_text)
+        findings = [f"🔁 Line {f.line}: {f.message}" for f in metrics.hotspots + metrics.quadratic]
+        findings += [f"🐍 Line {f.line}: {f.message}" for f in metrics.anti_patterns]
+        findings += [f"🏷️ {issue}" for issue in metrics.identifier_issues]
+        with st.expander(f"Findings ({len(findings)}) and Pythonic idioms"):
+            for finding in findings:
+                st.markdown(finding)
+            st.caption("Idioms you used: " + (", ".join(metrics.idioms) if metrics.idioms else "none yet"))
+            if improved is not None:
+                new_idioms = sorted(set(improved.idioms) - set(metrics.idioms))
+                if new_idioms:
+                    st.caption("The improved solution adds: " + ", ".join(new_idioms))
+
+
+# Main content
+st.markdown('<h1 class="main-title">CodeMentor</h1>', unsafe_allow_html=True)
+st.markdown('<p class="subtitle">Learn to code by doing, then understanding. AI-powered education that makes you a better programmer.</p>', unsafe_allow_html=True)
+
+# Step 1: Task Description
+if st.session_state.step == 1:
+    render_task_step()
+
+# Step 2: User's Attempt
+elif st.session_state.step == 2:
+    render_progress()
+    st.markdown('<div class="section-header">💻 Step 2: Give it a try!</div>', unsafe_allow_html=True)
+    
+    st.markdown(f"""
+    <div class="mentor-card">
+        <strong>Your task:</strong> {st.session_state.task_description}
+    </div>
+    """, unsafe_allow_html=True)
     
-    # Task and profile row
+    st.markdown("""
+    <div class="tip-callout">
+        <h4>🧠 Why attempt first?</h4>
+        Writing your own solution—even if imperfect—helps you:
+        <ul>
+            <li>Identify what you already know</li>
+            <li>Recognize gaps in your understanding</li>
+            <li>Better appreciate the improvements later</li>
+        </ul>
+        <em>There's no wrong answer here. Any attempt helps you learn!</em>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    render_attempt_editor()
+
+# Step 3: Pedagogical Review
+elif st.session_state.step == 3:
+    render_progress()
+    st.markdown('<div class="section-header">🎓 Step 3: Let\'s learn together!</div>', unsafe_allow_html=True)
+    
+    new_assessment = st.session_state.skill_assessment is None
+    
+    # Gallery tasks with a known attempt pattern are answered from the bundle
+    gallery_attempt = None
+    if GALLERY and (st.session_state.skill_assessment is None or st.session_state.review is None):
+        gallery_attempt = GALLERY.lookup(st.session_state.task_description, st.session_state.user_code)
+    
+    if st.session_state.skill_assessment is None and gallery_attempt:
+        st.session_state.skill_assessment = gallery_attempt["assessment"]
+    
+    # Task and profile row, with slots the assessment fills in as it streams
+    slots = {"banner": st.empty()}
     col1, col2 = st.columns([1, 2])
     
     with col1:
-        st.markdown(f"""
-        <div class="mentor-card">
-            <div class="section-header">📊 Your Profile</div>
-            <p style="margin-bottom: 1rem;">
-                <span class="level-badge {level_colors.get(level, 'level-intermediate')}">{level}</span>
-            </p>
-            <p style="color: #8b949e; font-size: 0.9rem;">
-                {st.session_state.feedback_mode.title()} feedback mode
-            </p>
-        </div>
-        """, unsafe_allow_html=True)
+        slots["profile"] = st.empty()
     
     with col2:
         st.markdown(f"""
@@ -872,22 +605,32 @@ elif st.session_state.step == 3:
     st.markdown("---")
     
     col_str, col_grow = st.columns(2)
-    
     with col_str:
-        st.markdown("#### 💪 Your Strengths")
-        for strength in st.session_state.skill_assessment.get("strengths", []):
-            st.markdown(f"✅ {strength}")
-    
+        slots["strengths"] = st.empty()
     with col_grow:
-        st.markdown("#### 🌱 Growth Areas")
-        for area in st.session_state.skill_assessment.get("growth_areas", []):
-            st.markdown(f"🎯 {area}")
+        slots["growth_areas"] = st.empty()
+    slots["code_issues"] = st.empty()
     
-    # Show code issues if code doesn't work
-    if not code_works and code_issues:
-        st.markdown("#### ⚠️ Issues to Fix")
-        for issue in code_issues:
-            st.markdown(f"❌ {issue}")
+    # Assess skill level if not done
+    if st.session_state.skill_assessment is None:
+        render_assessment({}, slots)
+        with st.spinner("🔍 Analyzing your coding style..."):
+            st.session_state.skill_assessment = assess_skill_level(
+                st.session_state.user_code,
+                st.session_state.task_description,
+                on_update=lambda partial: render_assessment(partial, slots)
+            )
+    if new_assessment:
+        analytics.record_assessment(
+            st.session_state.task_description,
+            st.session_state.learner_id,
+            st.session_state.skill_assessment,
+            st.session_state.feedback_mode
+        )
+    render_assessment(st.session_state.skill_assessment, slots)
+    
+    level = st.session_state.skill_assessment.get("level", "intermediate")
+    code_works = st.session_state.skill_assessment.get("code_works", False)
     
     st.markdown("---")
     
@@ -895,56 +638,56 @@ elif st.session_state.step == 3:
     st.markdown("#### 👀 Your Code")
     st.code(st.session_state.user_code, language="python")
     
+    # Local analysis: shown straight away, before the review call returns
+    metrics = code_metrics.analyze(st.session_state.user_code)
+    metrics_slot = st.empty()
+    render_code_metrics(metrics_slot, metrics)
+    
     st.markdown("---")
     
     # Generate review if not done
     if st.session_state.review is None:
-        with st.spinner("🎓 Preparing your personalized learning experience..."):
-            st.session_state.review = generate_pedagogical_review(
-                st.session_state.task_description,
-                st.session_state.user_code,
-                level,
-                st.session_state.feedback_mode,
-                code_works
-            )
-    
-    # Display the pedagogical review (only once, as markdown)
+        stored_review = gallery_attempt and gallery_attempt["reviews"].get(level, {}).get(st.session_state.feedback_mode)
+        st.session_state.review_similarity = None
+        if stored_review:
+            st.session_state.review = stored_review
+        else:
+            with st.spinner("🎓 Preparing your personalized learning experience..."):
+                st.session_state.review = generate_pedagogical_review(
+                    st.session_state.task_description,
+                    st.session_state.user_code,
+                    level,
+                    st.session_state.feedback_mode,
+                    code_works
+                )
+            reused = similarity_index.last_match()
+            st.session_state.review_similarity = reused.score if reused else None
+        # Parse once here; reruns render the cached structure
+        st.session_state.parsed_review = parse_review(st.session_state.review)
+    
+    improved_code = st.session_state.parsed_review.improved_code
+    if improved_code:
+        render_code_metrics(metrics_slot, metrics, code_metrics.analyze(improved_code))
+    
+    # Display the pedagogical review
     st.markdown('<div class="section-header">📚 Your Personalized Code Review</div>', unsafe_allow_html=True)
-    st.markdown(st.session_state.review)
+    if st.session_state.review_similarity:
+        reuse = similarity_index.stats()
+        reuse_rate = f" · {reuse['hit_rate']:.0%} of {reuse['lookups']} lookups reused on this server" if reuse else ""
+        st.caption(f"♻️ Reused the review of the same code submitted for a {st.session_state.review_similarity:.0%} similar task{reuse_rate}")
+    render_review(st.session_state.parsed_review)
+    
+    gallery_task = GALLERY.task_entry(st.session_state.task_description) if GALLERY else None
+    if gallery_task:
+        benchmark = gallery_task["reference"]["benchmark"]
+        with st.expander("📏 Reference solution & benchmark"):
+            st.code(gallery_task["reference"]["code"], language="python")
+            st.caption(f"`{benchmark['statement']}` runs in {benchmark['best_us']:,.1f} µs (best of {benchmark['repeat']})")
     
     st.markdown("---")
     
     # Action buttons
-    col1, col2, col3 = st.columns(3)
-    
-    with col1:
-        if st.button("🔄 Try Another Task", use_container_width=True):
-            st.session_state.step = 1
-            st.session_state.task_description = ""
-            st.session_state.user_code = ""
-            st.session_state.skill_assessment = None
-            st.session_state.review = None
-            st.rerun()
-    
-    with col2:
-        if st.session_state.task_mode == "generate":
-            if st.button("✏️ Revise My Code", use_container_width=True):
-                st.session_state.step = 2
-                st.session_state.skill_assessment = None
-                st.session_state.review = None
-                st.rerun()
-        else:
-            if st.button("✏️ Edit & Re-review", use_container_width=True):
-                st.session_state.step = 1
-                st.session_state.skill_assessment = None
-                st.session_state.review = None
-                st.rerun()
-    
-    with col3:
-        if st.button("🔀 Switch to " + ("Concise" if st.session_state.feedback_mode == "detailed" else "Detailed"), use_container_width=True):
-            st.session_state.feedback_mode = "concise" if st.session_state.feedback_mode == "detailed" else "detailed"
-            st.session_state.review = None
-            st.rerun()
+    render_review_actions()
 
 
 # Footer
@@ -0,0 +1,171 @@
+"""
+Skill-assessment schema, validation and incremental JSON parsing.
+
+The assessment is requested as a forced tool call, so the model has to fill
+in `ASSESSMENT_TOOL`'s input schema instead of free-form text. Its arguments
+arrive as a stream of `input_json_delta` fragments; `PartialJSONParser`
+turns the fragments received so far into the largest complete object, so
+Step 3 can show the level badge, strengths and growth areas as each field
+lands.
+"""
+
+import json
+from typing import List, Optional
+
+LEVELS = ("beginner", "intermediate", "advanced")
+
+# Property order is the order fields stream in, so the badge shows up first
+ASSESSMENT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "level": {"type": "string", "enum": list(LEVELS)},
+        "code_works": {
+            "type": "boolean",
+            "description": "True if the code fundamentally solves the task (minor issues allowed)",
+        },
+        "strengths": {
+            "type": "array", "items": {"type": "string"}, "minItems": 1, "maxItems": 3,
+            "description": "2-3 things they did well, even if basic",
+        },
+        "growth_areas": {
+            "type": "array", "items": {"type": "string"}, "minItems": 1, "maxItems": 3,
+            "description": "2-3 specific areas for improvement",
+        },
+        "code_issues": {
+            "type": "array", "items": {"type": "string"}, "maxItems": 3,
+            "description": "If code_works is false, 1-3 specific issues that stop it working; otherwise empty",
+        },
+        "indicators": {
+            "type": "array", "items": {"type": "string"}, "maxItems": 5,
+            "description": "3-5 specific observations that informed the assessment",
+        },
+    },
+    "required": ["level", "code_works", "strengths", "growth_areas", "code_issues", "indicators"],
+    "additionalProperties": False,
+}
+
+ASSESSMENT_TOOL = {
+    "name": "record_assessment",
+    "description": "Record the skill assessment of the programmer's code attempt.",
+    "input_schema": ASSESSMENT_SCHEMA,
+}
+
+# Shown when the model's assessment can't be used; "fallback" marks it so
+# it is never counted as a real judgement (see analytics.record_assessment)
+FALLBACK_ASSESSMENT = {
+    "level": "intermediate",
+    "code_works": False,
+    "code_issues": [],
+    "indicators": ["Unable to parse assessment"],
+    "strengths": ["Attempted the problem"],
+    "growth_areas": ["Continue practicing"],
+    "fallback": True,
+}
+
+
+def validate_assessment(data) -> List[str]:
+    """Schema violations in a parsed assessment (empty when it is valid)."""
+    if not isinstance(data, dict):
+        return [f"expected an object, got {type(data).__name__}"]
+    problems = []
+    properties = ASSESSMENT_SCHEMA["properties"]
+    for name in ASSESSMENT_SCHEMA["required"]:
+        if name not in data:
+            problems.append(f"missing '{name}'")
+    for name, value in data.items():
+        spec = properties.get(name)
+        if spec is None:
+            problems.append(f"unexpected field '{name}'")
+        elif spec["type"] == "string" and value not in spec["enum"]:
+            problems.append(f"'{name}' must be one of {', '.join(spec['enum'])}, got {value!r}")
+        elif spec["type"] == "boolean" and not isinstance(value, bool):
+            problems.append(f"'{name}' must be true or false, got {value!r}")
+        elif spec["type"] == "array":
+            if not isinstance(value, list) or not all(isinstance(item, str) for item in value):
+                problems.append(f"'{name}' must be a list of strings")
+            elif len(value) < spec.get("minItems", 0):
+                problems.append(f"'{name}' needs at least {spec['minItems']} item(s)")
+    return problems
+
+
+class PartialJSONParser:
+    """Incremental parser for a JSON object streamed in arbitrary fragments.
+
+    `feed` scans only the new characters and remembers the last position
+    where a value was complete, together with the containers still open
+    there. `snapshot` cuts the buffer at that point and closes the open
+    containers, so it only ever reports finished fields and list items -
+    never half a string or a number that might still grow.
+    """
+
+    def __init__(self):
+        self.text = ""
+        self._stack = []           # open containers: ["{", expecting "key"/"value"] or ["["]
+        self._in_string = False
+        self._string_is_key = False
+        self._escape = False
+        self._scalar_start = None  # start of an unterminated number/true/false/null
+        self._cut = 0
+        self._cut_closers = ""
+        self._snapshot = None
+        self._snapshot_cut = -1
+
+    def feed(self, fragment: str):
+        start = len(self.text)
+        self.text += fragment
+        for i in range(start, len(self.text)):
+            self._step(i, self.text[i])
+
+    def _mark(self, end: int):
+        self._cut = end
+        self._cut_closers = "".join("}" if frame[0] == "{" else "]" for frame in reversed(self._stack))
+
+    def _step(self, i: int, char: str):
+        if self._in_string:
+            if self._escape:
+                self._escape = False
+            elif char == "\\":
+                self._escape = True
+            elif char == '"':
+                self._in_string = False
+                if not self._string_is_key:
+                    self._mark(i + 1)
+            return
+
+        if self._scalar_start is not None:
+            if char.isalnum() or char in "+-.":
+                return
+            self._scalar_start = None
+            self._mark(i)
+
+        if char == '"':
+            self._in_string = True
+            self._string_is_key = bool(self._stack) and self._stack[-1] == ["{", "key"]
+        elif char == "{":
+            self._stack.append(["{", "key"])
+            self._mark(i + 1)
+        elif char == "[":
+            self._stack.append(["["])
+            self._mark(i + 1)
+        elif char in "}]":
+            if self._stack:
+                self._stack.pop()
+            self._mark(i + 1)
+        elif char == ":":
+            if self._stack and self._stack[-1][0] == "{":
+                self._stack[-1][1] = "value"
+        elif char == ",":
+            if self._stack and self._stack[-1][0] == "{":
+                self._stack[-1][1] = "key"
+        elif not char.isspace():
+            self._scalar_start = i
+
+    def snapshot(self) -> Optional[dict]:
+        """The fields completed so far, or None before the object has started."""
+        if self._cut != self._snapshot_cut:
+            self._snapshot_cut = self._cut
+            try:
+                self._snapshot = json.loads(self.text[:self._cut] + self._cut_closers)
+            except json.JSONDecodeError:
+                pass  # keep the previous snapshot; the final parse reports real errors
+        return self._snapshot
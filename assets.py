@@ -0,0 +1,115 @@
+"""
+Self-hosted static assets: the CodeMentor stylesheet and its fonts.
+
+The stylesheet lives in ./static and is served by Streamlit's static file
+serving (enabled in .streamlit/config.toml) at `app/static/...`. Its URL
+carries a hash of the file's content, so browsers can keep it cached for as
+long as the file is unchanged and pick up a new version as soon as it
+changes.
+
+The <link> is only used on Streamlit's Starlette server, which sends .css
+as text/css. The older Tornado server sends every static file outside a
+short image/PDF list as text/plain with `X-Content-Type-Options: nosniff`,
+and browsers refuse to apply such a stylesheet; there, and whenever static
+serving is off (e.g. under AppTest), the CSS is inlined instead.
+
+The fonts are .woff2 files with content-hashed URLs in @font-face rules
+generated here. They are not checked in. On a machine with network access
+run
+
+    python assets.py fetch-fonts
+
+and deploy the resulting static/fonts/ directory with the app. Until then
+installed local copies or the stylesheet's fallback stacks are used.
+"""
+
+import argparse
+import hashlib
+import importlib.util
+import os
+import urllib.request
+from functools import lru_cache
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+STATIC_URL = "app/static"
+STYLESHEET = "codementor.css"
+
+# Variable-weight Latin subsets from Fontsource
+_FONT_SOURCE = "https://cdn.jsdelivr.net/fontsource/fonts"
+# file in static/fonts -> (family, weight range, download URL)
+FONTS = {
+    "DMSans.woff2": ("DM Sans", "100 1000", f"{_FONT_SOURCE}/dm-sans:vf@latest/latin-wght-normal.woff2"),
+    "JetBrainsMono.woff2": ("JetBrains Mono", "100 800", f"{_FONT_SOURCE}/jetbrains-mono:vf@latest/latin-wght-normal.woff2"),
+    "SourceSerif4.woff2": ("Source Serif 4", "200 900", f"{_FONT_SOURCE}/source-serif-4:vf@latest/latin-wght-normal.woff2"),
+}
+
+
+@lru_cache(maxsize=None)
+def _read(name: str) -> bytes:
+    with open(os.path.join(STATIC_DIR, name), "rb") as f:
+        return f.read()
+
+
+def content_hash(name: str) -> str:
+    return hashlib.sha256(_read(name)).hexdigest()[:12]
+
+
+def url_for(name: str) -> str:
+    """Versioned URL for a file in ./static (relative, so it works under a base path)."""
+    return f"{STATIC_URL}/{name}?v={content_hash(name)}"
+
+
+@lru_cache(maxsize=None)
+def _server_serves_css() -> bool:
+    """True on Streamlit's Starlette server, which sends static .css as text/css."""
+    return importlib.util.find_spec("streamlit.web.server.starlette") is not None
+
+
+def font_faces(static_serving: bool) -> str:
+    """@font-face rules: local copies first, then the fetched .woff2 files when they can be served."""
+    rules = []
+    for name, (family, weights, _) in FONTS.items():
+        sources = [f"local('{family}')"]
+        if static_serving and os.path.exists(os.path.join(STATIC_DIR, "fonts", name)):
+            sources.append(f"url('{url_for('fonts/' + name)}') format('woff2')")
+        rules.append(f"@font-face {{ font-family: '{family}'; src: {', '.join(sources)}; "
+                     f"font-weight: {weights}; font-display: swap; }}")
+    return "\n".join(rules)
+
+
+def style_html(static_serving: bool) -> str:
+    """HTML that applies the fonts and stylesheet: a cached <link> where that works, else inline CSS."""
+    fonts = font_faces(static_serving)
+    if static_serving and _server_serves_css():
+        return f'<style>\n{fonts}\n</style><link rel="stylesheet" href="{url_for(STYLESHEET)}">'
+    return f"<style>\n{fonts}\n{_read(STYLESHEET).decode('utf-8')}</style>"
+
+
+def fetch_fonts(force: bool = False):
+    """Download the font files the stylesheet references into static/fonts."""
+    directory = os.path.join(STATIC_DIR, "fonts")
+    os.makedirs(directory, exist_ok=True)
+    for name, (_, _, url) in FONTS.items():
+        path = os.path.join(directory, name)
+        if os.path.exists(path) and not force:
+            print(f"{name}: present")
+            continue
+        with urllib.request.urlopen(url, timeout=60) as response:
+            data = response.read()
+        with open(path, "wb") as f:
+            f.write(data)
+        print(f"{name}: {len(data) // 1024} KiB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    fetch = commands.add_parser("fetch-fonts", help="download the self-hosted font files")
+    fetch.add_argument("--force", action="store_true", help="download again even if present")
+    args = parser.parse_args()
+    if args.command == "fetch-fonts":
+        fetch_fonts(args.force)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Load-test CodeMentor end to end against the offline stand-in model server.
+
+Drives N concurrent simulated Streamlit sessions (streamlit.testing AppTest)
+through Step 1 → Step 2 (with a starter template) → Step 3, all talking to
+benchmarks/fake_model_server.py, and reports throughput, p50/p95/p99 latency
+per step and memory per session. AppTest keeps process-global state, so each
+concurrent session runs in its own worker process.
+
+    python benchmarks/bench_sessions.py --sessions 20 --latency lognormal:0.8,0.4 \\
+        --tokens-per-second 120 --rate-limit-rate 0.02 --malformed-rate 0.05
+
+Memory per session is the traced Python heap growth of one extra session per
+worker, run after warm-up; timed sessions run untraced so tracemalloc doesn't
+skew the latencies.
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+import tracemalloc
+
+from common import REPO_ROOT, drive_flow, print_table, summarize
+from fake_model_server import add_config_arguments, config_from_args, serve
+
+ATTEMPT = """def reverse_words(sentence):
+    words = sentence.split(" ")
+    result = ""
+    for i in range(len(words) - 1, -1, -1):
+        result += words[i] + " "
+    return result.strip()
+"""
+
+STEPS = ("load", "step1_continue", "step2_starter", "step2_submit_to_step3")
+
+
+def run_session(index: int, feedback_mode: str, timeout: float, trace_memory: bool = False) -> dict:
+    """Walk one session through Steps 1-3; return per-step seconds and heap growth."""
+    from streamlit.testing.v1 import AppTest
+
+    flow = {
+        "task": f"Generate code that reverses words in a sentence (session {index})",
+        "code": ATTEMPT,
+        "feedback_mode": feedback_mode,
+        "use_starter": True,
+    }
+    if trace_memory:
+        tracemalloc.start()
+    at = AppTest.from_file(os.path.join(REPO_ROOT, "app.py"), default_timeout=timeout)
+    timings = drive_flow(at, flow, timeout)
+
+    memory = None
+    if trace_memory:
+        memory, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return {"timings": timings, "memory": memory}
+
+
+_worker_memory = None
+
+
+def _warm_worker(timeout: float):
+    # Pay for imports and caches once per worker so sessions measure steady
+    # state, then trace one more session for the memory figure.
+    global _worker_memory
+    sys.path.insert(0, REPO_ROOT)
+    run_session(-1, "concise", timeout)
+    _worker_memory = run_session(-2, "detailed", timeout, trace_memory=True)["memory"]
+
+
+def _run_session_safely(args):
+    try:
+        result = run_session(*args)
+        result.update(pid=os.getpid(), memory=_worker_memory)
+        return result
+    except Exception as exc:
+        return {"error": f"{type(exc).__name__}: {exc}"}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=10, help="total simulated sessions")
+    parser.add_argument("--concurrency", type=int, default=None, help="sessions in flight at once (default: all)")
+    parser.add_argument("--timeout", type=float, default=120.0, help="per-rerun timeout in seconds")
+    parser.add_argument("--feedback-mode", choices=("detailed", "concise", "mixed"), default="mixed")
+    add_config_arguments(parser)
+    args = parser.parse_args()
+
+    server = serve(config_from_args(args))
+    os.environ["ANTHROPIC_BASE_URL"] = f"http://127.0.0.1:{server.server_address[1]}"
+    os.environ.setdefault("ANTHROPIC_API_KEY", "fake-key")
+    # Sessions submit near-identical code; reuse would hide the model calls being measured
+    os.environ.setdefault("CODEMENTOR_SIMILARITY", "off")
+    # Simulated sessions aren't learners; keep them out of the analytics store
+    os.environ.setdefault("CODEMENTOR_ANALYTICS", "off")
+    # A built gallery bundle would answer gallery flows with no model calls
+    os.environ.setdefault("CODEMENTOR_GALLERY_BUNDLE", os.path.join(REPO_ROOT, "benchmarks", "no-gallery-bundle.json"))
+
+    def mode_for(i):
+        if args.feedback_mode == "mixed":
+            return "concise" if i % 2 else "detailed"
+        return args.feedback_mode
+
+    # AppTest swaps sys.modules["__main__"] for app.py inside the workers, so
+    # hand the pool functions that pickle by this module's real name.
+    import bench_sessions
+
+    workers = args.concurrency or args.sessions
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(workers, initializer=bench_sessions._warm_worker, initargs=(args.timeout,)) as pool:
+        # Wait for every worker to finish warming up before starting the clock
+        pool.map(time.sleep, [0.1] * workers)
+        started = time.perf_counter()
+        results = pool.map(bench_sessions._run_session_safely, [(i, mode_for(i), args.timeout) for i in range(args.sessions)], chunksize=1)
+        elapsed = time.perf_counter() - started
+    server.shutdown()
+
+    samples = {step: [] for step in STEPS}
+    memory = {}
+    completed = 0
+    failures = []
+    for result in results:
+        if "error" in result:
+            failures.append(result["error"])
+            continue
+        completed += 1
+        for step, seconds in result["timings"].items():
+            samples[step].append(seconds)
+        memory[result["pid"]] = result["memory"]
+
+    memory = [value for value in memory.values() if value is not None]
+    print_table({step: summarize(values) for step, values in samples.items()}, f"Step latency ({args.sessions} sessions, {workers} concurrent)")
+    print(f"\ncompleted sessions:    {completed}/{args.sessions}")
+    print(f"throughput:            {completed / elapsed * 60:.1f} sessions/min ({elapsed:.1f}s wall)")
+    if memory:
+        print(f"memory per session:    {sum(memory) / len(memory) / 1024:.0f} KiB mean, {max(memory) / 1024:.0f} KiB max")
+    for error in failures[:5]:
+        print(f"failed: {error}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Cold-start benchmark: server boot time and time-to-first-paint per new session.
+
+For each boot it starts the app with `streamlit run` and measures:
+
+- server_boot: process start until /_stcore/health answers
+- first_session: the first session after boot, which pays for the app's own
+  imports (Streamlit only runs the script once a session connects)
+- new_session: each further session against the already-warm server
+
+With `--browser` a session is a fresh Playwright browser context, timed
+from navigation until the CodeMentor title is painted; the browser's
+first-contentful-paint is reported alongside. Without a browser a session is
+a new AppTest script run in a fresh process, which covers the server-side
+share of first paint (imports, cached resources and the first script run).
+
+To compare before/after, run it once per version of the app:
+
+    git show <old-rev>:app.py > app_before.py
+    python benchmarks/bench_startup.py --app app_before.py --boots 5
+    python benchmarks/bench_startup.py --app app.py --boots 5
+
+`--browser` requires Playwright (`pip install playwright && playwright install chromium`).
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+
+from common import REPO_ROOT, free_port, print_table, start_streamlit, stop, summarize, wait_for_http
+
+# Inherited by the servers and probe processes: benchmark sessions aren't learners
+os.environ.setdefault("CODEMENTOR_ANALYTICS", "off")
+
+# Runs in a fresh interpreter so the app's imports are cold for the first session
+_SCRIPT_PROBE = """
+import json, sys, time
+from streamlit.testing.v1 import AppTest
+app, sessions, timeout = sys.argv[1], int(sys.argv[2]), float(sys.argv[3])
+times = []
+for _ in range(sessions):
+    at = AppTest.from_file(app, default_timeout=timeout)
+    started = time.perf_counter()
+    at.run()
+    times.append(time.perf_counter() - started)
+    if at.exception:
+        sys.exit(at.exception[0].value)
+print(json.dumps(times))
+"""
+
+
+def script_sessions(app_path: str, sessions: int, timeout: float) -> list:
+    """Seconds for each of `sessions` consecutive first script runs in one fresh process."""
+    result = subprocess.run(
+        [sys.executable, "-c", _SCRIPT_PROBE, app_path, str(sessions), str(timeout)],
+        cwd=REPO_ROOT, capture_output=True, text=True, check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+async def browser_sessions(url: str, sessions: int, timeout: float) -> tuple:
+    """(seconds to the painted title, first-contentful-paint seconds) per new browser context."""
+    from playwright.async_api import async_playwright
+
+    painted, fcp = [], []
+    async with async_playwright() as playwright:
+        browser = await playwright.chromium.launch()
+        for _ in range(sessions):
+            context = await browser.new_context()
+            page = await context.new_page()
+            started = time.perf_counter()
+            await page.goto(url)
+            await page.locator("h1.main-title").wait_for(timeout=timeout * 1000)
+            painted.append(time.perf_counter() - started)
+            entry = await page.evaluate(
+                "performance.getEntriesByName('first-contentful-paint').map(e => e.startTime)[0] || 0"
+            )
+            fcp.append(entry / 1000)
+            await context.close()
+        await browser.close()
+    return painted, fcp
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--app", default="app.py", help="app script, relative to the repository root")
+    parser.add_argument("--boots", type=int, default=5, help="number of server starts")
+    parser.add_argument("--sessions", type=int, default=5, help="sessions per boot")
+    parser.add_argument("--browser", action="store_true", help="time real browser sessions with Playwright")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    args = parser.parse_args()
+
+    samples = {"server_boot": [], "first_session": [], "new_session": [], "first_contentful_paint": []}
+    for _ in range(args.boots):
+        port = free_port()
+        process = start_streamlit(args.app, port, {"ANTHROPIC_API_KEY": os.environ.get("ANTHROPIC_API_KEY", "unused")})
+        try:
+            started = time.perf_counter()
+            wait_for_http(f"http://127.0.0.1:{port}/_stcore/health", args.timeout)
+            samples["server_boot"].append(time.perf_counter() - started)
+
+            if args.browser:
+                painted, fcp = asyncio.run(browser_sessions(f"http://127.0.0.1:{port}/", args.sessions, args.timeout))
+                samples["first_contentful_paint"] += fcp
+            else:
+                painted = script_sessions(os.path.join(REPO_ROOT, args.app), args.sessions, args.timeout)
+            samples["first_session"].append(painted[0])
+            samples["new_session"] += painted[1:]
+        finally:
+            stop(process)
+
+    print_table({name: summarize(values) for name, values in samples.items() if values},
+                f"{args.app}: {args.boots} boots x {args.sessions} sessions ({'browser' if args.browser else 'script'})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+Button-click round-trip benchmark for the Step 1 toggles.
+
+Starts the app with `streamlit run`, opens N concurrent browser sessions and
+clicks the task-mode and feedback-mode toggles back and forth. Each sample is
+the time from the click until the clicked button shows its "✓", i.e. the
+round trip through the server and back into the DOM.
+
+To compare before/after, run it once per version of the app:
+
+    git show <old-rev>:app.py > app_before.py
+    python benchmarks/bench_toggles.py --app app_before.py --sessions 25
+    python benchmarks/bench_toggles.py --app app.py --sessions 25
+
+Requires Playwright (`pip install playwright && playwright install chromium`).
+
+Where no browser can be installed, `--client protocol` speaks Streamlit's
+websocket protocol directly: each sample is the time from sending the click
+until the server reports the run finished, which covers the server side of
+the round trip but not the browser's rendering. It also reports the bytes
+the server sent per click.
+"""
+
+import argparse
+import asyncio
+import time
+
+from common import free_port, print_table, start_streamlit, stop, summarize, wait_for_http
+
+TOGGLES = [
+    ("feedback_mode", "⚡ Concise Feedback"),
+    ("feedback_mode", "📚 Detailed Feedback"),
+    ("task_mode", "🔍 Review Existing Code"),
+    ("task_mode", "🆕 Generate New Code"),
+]
+
+
+async def run_session(browser, url: str, clicks: int, samples: dict):
+    context = await browser.new_context()
+    page = await context.new_page()
+    await page.goto(url)
+    await page.get_by_role("button", name="🆕 Generate New Code ✓").wait_for(timeout=60_000)
+
+    for i in range(clicks):
+        name, label = TOGGLES[i % len(TOGGLES)]
+        started = time.perf_counter()
+        await page.get_by_role("button", name=label, exact=True).click()
+        await page.get_by_role("button", name=f"{label} ✓").wait_for(timeout=60_000)
+        samples[name].append(time.perf_counter() - started)
+
+    await context.close()
+
+
+async def read_run(ws, buttons: dict) -> int:
+    """Read messages up to the end of the current run; return the bytes received.
+
+    Records every button drawn as {label: (widget id, fragment id)}. A run
+    cut short by st.rerun() is followed by the full rerun, so keep reading.
+    """
+    from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+    received = 0
+    while True:
+        raw = await asyncio.wait_for(ws.recv(), timeout=60)
+        received += len(raw)
+        msg = ForwardMsg()
+        msg.ParseFromString(raw)
+        kind = msg.WhichOneof("type")
+        if kind == "delta" and msg.delta.WhichOneof("type") == "new_element":
+            element = msg.delta.new_element
+            if element.WhichOneof("type") == "button":
+                buttons[element.button.label] = (element.button.id, msg.delta.fragment_id)
+        elif kind == "script_finished" and msg.script_finished != ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+            if msg.script_finished == ForwardMsg.FINISHED_WITH_COMPILE_ERROR:
+                raise RuntimeError("the app failed to compile")
+            return received
+
+
+async def run_protocol_session(url: str, clicks: int, samples: dict, sizes: dict):
+    import websockets
+    from streamlit.proto.BackMsg_pb2 import BackMsg
+
+    async with websockets.connect(url.replace("http", "ws", 1) + "/_stcore/stream", max_size=None) as ws:
+        buttons = {}
+        load = BackMsg()
+        load.rerun_script.query_string = ""
+        await ws.send(load.SerializeToString())
+        await read_run(ws, buttons)
+
+        for i in range(clicks):
+            name, label = TOGGLES[i % len(TOGGLES)]
+            widget_id, fragment_id = buttons[label]
+            message = BackMsg()
+            message.rerun_script.query_string = ""
+            message.rerun_script.widget_states.widgets.add(id=widget_id, trigger_value=True)
+            if fragment_id:
+                message.rerun_script.fragment_id = fragment_id
+            drawn = {}
+            started = time.perf_counter()
+            await ws.send(message.SerializeToString())
+            received = await read_run(ws, drawn)
+            samples[name].append(time.perf_counter() - started)
+            sizes[name].append(received)
+            if f"{label} ✓" not in drawn:
+                raise RuntimeError(f"clicking {label!r} did not select it")
+            buttons.update(drawn)
+
+
+async def run_protocol(url: str, sessions: int, clicks: int):
+    samples = {name: [] for name, _ in TOGGLES}
+    sizes = {name: [] for name, _ in TOGGLES}
+    await asyncio.gather(*(run_protocol_session(url, clicks, samples, sizes) for _ in range(sessions)))
+    return samples, sizes
+
+
+async def run(url: str, sessions: int, clicks: int) -> dict:
+    from playwright.async_api import async_playwright
+
+    samples = {name: [] for name, _ in TOGGLES}
+    async with async_playwright() as playwright:
+        browser = await playwright.chromium.launch()
+        await asyncio.gather(*(run_session(browser, url, clicks, samples) for _ in range(sessions)))
+        await browser.close()
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--app", default="app.py", help="app script to serve (relative to the repo root)")
+    parser.add_argument("--url", help="benchmark an already running server instead of starting one")
+    parser.add_argument("--sessions", type=int, default=10, help="concurrent browser sessions")
+    parser.add_argument("--clicks", type=int, default=20, help="toggle clicks per session")
+    parser.add_argument("--client", choices=("browser", "protocol"), default="browser",
+                        help="drive Chromium through Playwright, or speak the websocket protocol directly")
+    args = parser.parse_args()
+
+    server = None
+    url = args.url
+    if url is None:
+        port = free_port()
+        server = start_streamlit(args.app, port)
+        url = f"http://127.0.0.1:{port}"
+        wait_for_http(f"{url}/_stcore/health")
+
+    try:
+        if args.client == "protocol":
+            samples, sizes = asyncio.run(run_protocol(url, args.sessions, args.clicks))
+        else:
+            samples, sizes = asyncio.run(run(url, args.sessions, args.clicks)), None
+    finally:
+        if server is not None:
+            stop(server)
+
+    print_table(
+        {name: summarize(values) for name, values in samples.items()},
+        f"Toggle round trip ({args.client}): {args.app}, {args.sessions} sessions x {args.clicks} clicks",
+    )
+    if sizes:
+        for name, values in sizes.items():
+            print(f"{name}: {sum(values) / len(values) / 1024:.1f} KiB sent per click")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""Helpers shared by the CodeMentor benchmark scripts."""
+
+import math
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def percentile(values, pct: float) -> float:
+    """Nearest-rank percentile; 0.0 for an empty list."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def summarize(values) -> dict:
+    """Count, mean and tail percentiles of a list of seconds, reported in milliseconds."""
+    return {
+        "n": len(values),
+        "mean_ms": round(1000 * sum(values) / len(values), 1) if values else 0.0,
+        "p50_ms": round(1000 * percentile(values, 50), 1),
+        "p95_ms": round(1000 * percentile(values, 95), 1),
+        "p99_ms": round(1000 * percentile(values, 99), 1),
+    }
+
+
+def print_table(rows: dict, title: str = ""):
+    """Print {name: summarize(...)} as an aligned table."""
+    if title:
+        print(f"\n{title}")
+    width = max([len(name) for name in rows] + [10])
+    print(f"{'':<{width}}  {'n':>6}  {'mean':>9}  {'p50':>9}  {'p95':>9}  {'p99':>9}")
+    for name, stats in rows.items():
+        print(
+            f"{name:<{width}}  {stats['n']:>6}  {stats['mean_ms']:>7.1f}ms  {stats['p50_ms']:>7.1f}ms"
+            f"  {stats['p95_ms']:>7.1f}ms  {stats['p99_ms']:>7.1f}ms"
+        )
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_http(url: str, timeout: float = 60.0) -> float:
+    """Poll `url` until it answers 200; return the seconds waited."""
+    started = time.perf_counter()
+    while True:
+        try:
+            with urllib.request.urlopen(url, timeout=1) as response:
+                if response.status == 200:
+                    return time.perf_counter() - started
+        except OSError:
+            pass
+        if time.perf_counter() - started > timeout:
+            raise TimeoutError(f"{url} did not come up within {timeout:.0f}s")
+        time.sleep(0.05)
+
+
+def start_streamlit(app_path: str, port: int, env: dict = None) -> subprocess.Popen:
+    """Launch `streamlit run` headless on `port` from the repository root."""
+    return subprocess.Popen(
+        [
+            sys.executable, "-m", "streamlit", "run", app_path,
+            "--server.headless", "true",
+            "--server.port", str(port),
+            "--browser.gatherUsageStats", "false",
+        ],
+        cwd=REPO_ROOT,
+        env={**os.environ, **(env or {})},
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+
+def stop(process: subprocess.Popen):
+    process.terminate()
+    try:
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+def click(at, label: str, timeout: float):
+    """Click the first AppTest button whose label starts with `label` and rerun."""
+    for button in at.button:
+        if button.label.startswith(label):
+            return button.click().run(timeout=timeout)
+    raise LookupError(f"no button starting with {label!r}")
+
+
+def drive_flow(at, flow: dict, timeout: float) -> dict:
+    """Walk an AppTest session through one CodeMentor flow; return seconds per step.
+
+    `flow` keys: task, code, task_mode ("generate" | "review"),
+    feedback_mode ("detailed" | "concise") and use_starter (bool).
+    """
+    timings = {}
+    started = time.perf_counter()
+    at.run(timeout=timeout)
+    timings["load"] = time.perf_counter() - started
+
+    if flow.get("feedback_mode") == "concise":
+        click(at, "⚡ Concise Feedback", timeout)
+
+    if flow.get("task_mode") == "review":
+        click(at, "🔍 Review Existing Code", timeout)
+        at.text_area[0].input(flow.get("task", ""))
+        at.text_area[1].input(flow["code"])
+        started = time.perf_counter()
+        click(at, "Get Review", timeout)
+        timings["step1_to_step3"] = time.perf_counter() - started
+    else:
+        at.text_area[0].input(flow["task"])
+        started = time.perf_counter()
+        click(at, "Continue", timeout)
+        timings["step1_continue"] = time.perf_counter() - started
+
+        if flow.get("use_starter"):
+            started = time.perf_counter()
+            click(at, "🎯 Get Starter Template", timeout)
+            timings["step2_starter"] = time.perf_counter() - started
+
+        at.text_area[0].input(flow["code"])
+        started = time.perf_counter()
+        click(at, "Get Feedback", timeout)
+        timings["step2_submit_to_step3"] = time.perf_counter() - started
+
+    if at.exception:
+        raise RuntimeError(at.exception[0].value)
+    if at.session_state.review is None:
+        raise RuntimeError("flow finished without a review")
+    return timings
@@ -0,0 +1,333 @@
+"""
+Offline stand-in for the Anthropic messages endpoint.
+
+Serves `POST /v1/messages` with canned responses shaped like the real ones for
+each CodeMentor call: skill assessments (as forced tool calls, including
+repair requests), detailed or concise reviews and starter templates. Latency,
+streaming speed, rate limiting and schema-violating assessments are
+configurable, so the app can be load-tested without spending tokens:
+
+    python benchmarks/fake_model_server.py --port 8765 --latency lognormal:0.8,0.4 \\
+        --tokens-per-second 80 --rate-limit-rate 0.05 --malformed-rate 0.1
+    ANTHROPIC_BASE_URL=http://127.0.0.1:8765 ANTHROPIC_API_KEY=fake streamlit run app.py
+
+Latency is `first-token delay + output_tokens / tokens_per_second`. Streaming
+requests (`"stream": true`) get the same server-sent event sequence as the
+real API, paced at that token rate; tool calls stream `input_json_delta`
+fragments. A request ending in an assistant turn gets the rest of the canned
+reply after that prefill, so truncated replies can be continued.
+"""
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+@dataclass
+class FakeServerConfig:
+    latency: str = "fixed:0.0"        # first-token delay: fixed:S | uniform:LO,HI | lognormal:MEDIAN,SIGMA
+    tokens_per_second: float = 0.0    # 0 disables generation time
+    rate_limit_rate: float = 0.0      # fraction of requests answered with HTTP 429
+    malformed_rate: float = 0.0       # fraction of assessments that violate the schema
+    seed: int = None
+
+
+def sample_latency(spec: str, rng: random.Random) -> float:
+    """Draw one first-token delay, in seconds, from a distribution spec."""
+    kind, _, params = spec.partition(":")
+    values = [float(v) for v in params.split(",") if v]
+    if kind == "fixed":
+        return values[0] if values else 0.0
+    if kind == "uniform":
+        return rng.uniform(values[0], values[1])
+    if kind == "lognormal":
+        median, sigma = values
+        return median * rng.lognormvariate(0.0, sigma)
+    raise ValueError(f"unknown latency distribution: {spec}")
+
+
+def estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+def classify(prompt: str) -> str:
+    if "Repair this skill assessment" in prompt:
+        return "assess_repair"
+    if "assess the programmer's skill level" in prompt:
+        return "assess"
+    if "code SKELETON" in prompt:
+        return "starter"
+    if "CONCISE code review" in prompt:
+        return "review_concise"
+    return "review_detailed"
+
+
+def _quoted(prompt: str, label: str) -> str:
+    match = re.search(label + r':?\s*"?(.+?)"?\n', prompt)
+    return match.group(1).strip() if match else "the task"
+
+
+def _skill_level(prompt: str) -> str:
+    match = re.search(r"A (beginner|intermediate|advanced)-level programmer", prompt)
+    return match.group(1) if match else "intermediate"
+
+
+def assessment_payload(prompt: str, rng: random.Random) -> dict:
+    return {
+        "level": rng.choice(["beginner", "intermediate", "advanced"]),
+        "code_works": rng.random() < 0.6,
+        "strengths": ["Clear structure", "Readable variable names"],
+        "growth_areas": ["Edge case handling", "Pythonic idioms"],
+        "code_issues": ["Does not handle empty input"],
+        "indicators": ["Uses a plain for loop", "Descriptive names", "No type hints"],
+    }
+
+
+def starter_text(prompt: str) -> str:
+    task = _quoted(prompt, "Given this coding task")
+    return (
+        "def solve(data):\n"
+        f'    """{task[:60]}"""\n'
+        "    result = None\n"
+        "    # TODO: validate the input\n"
+        "    # TODO: implement the main logic\n"
+        "    return result\n"
+    )
+
+
+def review_text(prompt: str, concise: bool) -> str:
+    level = _skill_level(prompt)
+    code = (
+        "```python\n"
+        "def solve(items):\n"
+        "    # Build the result in one pass\n"
+        "    return [item for item in items if item]\n"
+        "```"
+    )
+    if concise:
+        return (
+            "1. **QUICK ASSESSMENT**\nSolid attempt; the loop can be simplified.\n\n"
+            f"2. **IMPROVED SOLUTION**\n{code}\n\n"
+            "3. **LINE-BY-LINE FIXES**\n"
+            "- `for i in range(len(items))` → `for item in items`: iterate directly\n"
+            "- `result = result + [x]` → `result.append(x)`: avoids copying the list\n\n"
+            "4. **KEY TAKEAWAY**\nLet Python do the indexing for you.\n"
+        )
+    improvement = (
+        "**Improvement: {name}**\n\n"
+        "*Your code:* `for i in range(len(items)):`\n\n"
+        "*Improved:* `for item in items:`\n\n"
+        "*Why this is better:*\n" + f"As a {level} programmer you'll see this pattern everywhere. " * 3 + "\n\n"
+        "*Readability vs Performance:*\n"
+        "- 📖 Readability: ⭐⭐⭐⭐⭐ - Reads like English\n"
+        "- ⚡ Performance: ⭐⭐⭐⭐ - Same complexity, fewer lookups\n"
+        "- 🎯 Recommendation: Prefer readability here.\n\n"
+    )
+    return (
+        "## 🎉 CONGRATULATIONS!\n\nYour code works. Here are some refinements.\n\n"
+        f"## IMPROVED SOLUTION\n\n{code}\n\n"
+        "## LINE-BY-LINE LEARNING\n\n"
+        + "".join(improvement.format(name=name) for name in ("Direct iteration", "List comprehension", "Early return"))
+        + "## PYTHONIC PATTERNS LEARNED\n\n- Direct iteration\n- Comprehensions\n\n"
+        "## NEXT CHALLENGE\n\nMake it work on generators too.\n"
+    )
+
+
+def build_response(request: dict, config: FakeServerConfig, rng: random.Random) -> dict:
+    """Message object for a request body, as the real endpoint would return it."""
+    def text_of(message):
+        content = message["content"]
+        return content if isinstance(content, str) else "".join(block.get("text", "") for block in content)
+
+    messages = request.get("messages", [])
+    prompt = "".join(text_of(message) for message in messages if message["role"] == "user")
+    # A trailing assistant turn is a prefill to continue from
+    prefill = text_of(messages[-1]) if messages and messages[-1]["role"] == "assistant" else ""
+    kind = classify(prompt)
+    tool_choice = request.get("tool_choice") or {}
+    if tool_choice.get("type") == "tool":
+        payload = assessment_payload(prompt, rng)
+        if kind == "assess" and rng.random() < config.malformed_rate:
+            payload.update(level="expert", code_works="mostly")
+            del payload["growth_areas"]
+        output_tokens = estimate_tokens(json.dumps(payload))
+        content = [{"type": "tool_use", "id": f"toolu_fake_{uuid.uuid4().hex[:20]}",
+                    "name": tool_choice["name"], "input": payload}]
+        stop_reason = "tool_use"
+    else:
+        if kind.startswith("assess"):
+            text = json.dumps(assessment_payload(prompt, rng))
+        elif kind == "starter":
+            text = starter_text(prompt)
+        else:
+            text = review_text(prompt, concise=kind == "review_concise")
+        if prefill:
+            text = text[len(prefill):] if text.startswith(prefill) else ""
+
+        output_tokens = estimate_tokens(text)
+        stop_reason = "end_turn"
+        max_tokens = request.get("max_tokens")
+        if max_tokens and output_tokens > max_tokens:
+            text = text[: max_tokens * 4]
+            output_tokens, stop_reason = max_tokens, "max_tokens"
+        content = [{"type": "text", "text": text}]
+
+    return {
+        "id": f"msg_fake_{uuid.uuid4().hex[:20]}",
+        "type": "message",
+        "role": "assistant",
+        "model": request.get("model", "fake"),
+        "content": content,
+        "stop_reason": stop_reason,
+        "stop_sequence": None,
+        "usage": {
+            "input_tokens": estimate_tokens(prompt + prefill),
+            "output_tokens": output_tokens,
+            "cache_creation_input_tokens": 0,
+            "cache_read_input_tokens": 0,
+        },
+    }
+
+
+def stream_events(message: dict):
+    """Yield (event, data) pairs in the order the real endpoint streams them."""
+    start = {**message, "content": [], "stop_reason": None, "usage": {**message["usage"], "output_tokens": 1}}
+    yield "message_start", {"type": "message_start", "message": start}
+    for index, block in enumerate(message["content"]):
+        if block["type"] == "tool_use":
+            start_block = {**block, "input": {}}
+            text, delta_type, field = json.dumps(block["input"]), "input_json_delta", "partial_json"
+        else:
+            start_block = {"type": "text", "text": ""}
+            text, delta_type, field = block["text"], "text_delta", "text"
+        yield "content_block_start", {"type": "content_block_start", "index": index, "content_block": start_block}
+        for offset in range(0, len(text), 16):
+            yield "content_block_delta", {
+                "type": "content_block_delta", "index": index,
+                "delta": {"type": delta_type, field: text[offset:offset + 16]},
+            }
+        yield "content_block_stop", {"type": "content_block_stop", "index": index}
+    yield "message_delta", {
+        "type": "message_delta",
+        "delta": {"stop_reason": message["stop_reason"], "stop_sequence": None},
+        "usage": {"output_tokens": message["usage"]["output_tokens"]},
+    }
+    yield "message_stop", {"type": "message_stop"}
+
+
+def make_handler(config: FakeServerConfig):
+    rng = random.Random(config.seed)
+    rng_lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):
+            if not self.path.startswith("/v1/messages"):
+                self.send_error(404)
+                return
+            request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+
+            with rng_lock:
+                rate_limited = rng.random() < config.rate_limit_rate
+                delay = sample_latency(config.latency, rng)
+                message = build_response(request, config, rng)
+
+            if rate_limited:
+                self._send_json(429, {
+                    "type": "error",
+                    "error": {"type": "rate_limit_error", "message": "Fake rate limit"},
+                }, {"retry-after": "1"})
+                return
+
+            time.sleep(delay)
+            generation = message["usage"]["output_tokens"] / config.tokens_per_second if config.tokens_per_second else 0.0
+
+            if request.get("stream"):
+                self._stream(message, generation)
+            else:
+                time.sleep(generation)
+                self._send_json(200, message)
+
+        def _send_json(self, status: int, body: dict, headers: dict = None):
+            payload = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.send_header("request-id", f"req_fake_{uuid.uuid4().hex[:12]}")
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def _stream(self, message: dict, generation: float):
+            events = list(stream_events(message))
+            deltas = sum(1 for name, _ in events if name == "content_block_delta")
+            pause = generation / deltas if deltas else 0.0
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Cache-Control", "no-cache")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            for name, data in events:
+                if name == "content_block_delta" and pause:
+                    time.sleep(pause)
+                self.wfile.write(f"event: {name}\ndata: {json.dumps(data)}\n\n".encode("utf-8"))
+                self.wfile.flush()
+            self.close_connection = True
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def serve(config: FakeServerConfig, port: int = 0, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """Start the server on a daemon thread and return it (port 0 picks a free port)."""
+    server = ThreadingHTTPServer((host, port), make_handler(config))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="fake-model-server", daemon=True).start()
+    return server
+
+
+def add_config_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--latency", default="fixed:0.0", help="first-token delay: fixed:S, uniform:LO,HI or lognormal:MEDIAN,SIGMA")
+    parser.add_argument("--tokens-per-second", type=float, default=0.0, help="simulated generation speed (0 = instant)")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="fraction of requests answered with 429")
+    parser.add_argument("--malformed-rate", type=float, default=0.0, help="fraction of assessments that violate the schema")
+    parser.add_argument("--seed", type=int, default=None)
+
+
+def config_from_args(args) -> FakeServerConfig:
+    return FakeServerConfig(
+        latency=args.latency,
+        tokens_per_second=args.tokens_per_second,
+        rate_limit_rate=args.rate_limit_rate,
+        malformed_rate=args.malformed_rate,
+        seed=args.seed,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    add_config_arguments(parser)
+    args = parser.parse_args()
+
+    server = serve(config_from_args(args), args.port, args.host)
+    print(f"Fake model server on http://{args.host}:{server.server_address[1]} (Ctrl+C to stop)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""
+Record and replay cassettes through the full Step 1 → 3 pipeline.
+
+    # Record one cassette per flow (against the real API, or the fake server
+    # via ANTHROPIC_BASE_URL)
+    python benchmarks/regress_cassettes.py record --flows benchmarks/flows.json --out cassettes/
+
+    # Replay them and write the baseline
+    python benchmarks/regress_cassettes.py replay --cassettes cassettes/ --baseline cassettes/baseline.json --update-baseline
+
+    # Later: replay again and flag regressions against the baseline
+    python benchmarks/regress_cassettes.py replay --cassettes cassettes/ --baseline cassettes/baseline.json --speed 10
+
+Each flow is replayed through AppTest with CODEMENTOR_CASSETTE_MODE=replay.
+For every cassette it compares the number of model calls per type, the
+locally estimated prompt tokens per call type and the end-to-end latency
+against the baseline. It exits non-zero if anything regressed.
+
+Latency is the best of `--repeat` replays. It only counts as a regression
+when it is both `--latency-tolerance` slower in relative terms and
+`--latency-floor` seconds slower in absolute terms. At `--speed 0` nothing
+waits on recorded timings, so latency is not checked at all.
+"""
+
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+
+from common import REPO_ROOT, drive_flow
+
+sys.path.insert(0, REPO_ROOT)
+import cassettes  # noqa: E402
+
+# Keep each flow's calls independent of the flows that ran before it
+os.environ.setdefault("CODEMENTOR_SIMILARITY", "off")
+# Replayed sessions aren't learners; keep them out of the analytics store
+os.environ.setdefault("CODEMENTOR_ANALYTICS", "off")
+# A built gallery bundle would answer gallery flows with no model calls
+os.environ.setdefault("CODEMENTOR_GALLERY_BUNDLE", os.path.join(REPO_ROOT, "benchmarks", "no-gallery-bundle.json"))
+
+
+def _app_test(timeout: float):
+    from streamlit.testing.v1 import AppTest
+    return AppTest.from_file(os.path.join(REPO_ROOT, "app.py"), default_timeout=timeout)
+
+
+def _use_cassette(path: str, mode: str, speed: float = 1.0):
+    os.environ["CODEMENTOR_CASSETTE"] = path
+    os.environ["CODEMENTOR_CASSETTE_MODE"] = mode
+    os.environ["CODEMENTOR_REPLAY_SPEED"] = str(speed)
+    cassettes.reset()
+
+
+def record(args):
+    with open(args.flows, encoding="utf-8") as f:
+        flows = json.load(f)
+    os.makedirs(args.out, exist_ok=True)
+    for name, flow in flows.items():
+        path = os.path.join(args.out, f"{name}.jsonl.gz")
+        _use_cassette(path, "record")
+        cassettes.activate(cassettes.Cassette.create(path, flow={"name": name, **flow}))
+        drive_flow(_app_test(args.timeout), flow, args.timeout)
+        print(f"recorded {path} ({len(cassettes.active_cassette().interactions)} calls)")
+
+
+def measure(path: str, speed: float, timeout: float, repeat: int = 1) -> dict:
+    """Replay one cassette `repeat` times through the app; latency is the best run."""
+    flow = cassettes.Cassette.load(path).flow
+    if not flow:
+        raise ValueError(f"{path} has no flow header; record it with this script")
+
+    elapsed = float("inf")
+    for _ in range(repeat):
+        _use_cassette(path, "replay", speed)
+        started = time.perf_counter()
+        drive_flow(_app_test(timeout), flow, timeout)
+        elapsed = min(elapsed, time.perf_counter() - started)
+
+    played = cassettes.active_cassette().played
+    calls, prompt_tokens = {}, {}
+    for item in played:
+        calls[item.call_type] = calls.get(item.call_type, 0) + 1
+        prompt_tokens[item.call_type] = prompt_tokens.get(item.call_type, 0) + item.prompt_tokens
+    return {
+        "calls": calls,
+        "prompt_tokens": prompt_tokens,
+        "latency": round(elapsed, 3),
+        "speed": speed,
+        "unmatched_prompts": sum(1 for item in played if not item.exact_match),
+    }
+
+
+def compare(name: str, current: dict, baseline: dict, token_tolerance: float, latency_tolerance: float,
+            latency_floor: float) -> list:
+    problems = []
+    if current["calls"] != baseline["calls"]:
+        problems.append(f"{name}: calls per flow {baseline['calls']} -> {current['calls']}")
+    for call_type, tokens in current["prompt_tokens"].items():
+        before = baseline["prompt_tokens"].get(call_type)
+        if before and abs(tokens - before) / before > token_tolerance:
+            problems.append(f"{name}: {call_type} prompt tokens {before} -> {tokens}")
+    slower = current["latency"] - baseline["latency"]
+    if (current["speed"] and baseline.get("speed") == current["speed"]
+            and slower > latency_floor and slower > baseline["latency"] * latency_tolerance):
+        problems.append(f"{name}: end-to-end latency {baseline['latency']:.2f}s -> {current['latency']:.2f}s")
+    return problems
+
+
+def replay(args):
+    paths = sorted(glob.glob(os.path.join(args.cassettes, "*.jsonl.gz")))
+    if not paths:
+        sys.exit(f"no cassettes in {args.cassettes}")
+
+    baseline = {}
+    if os.path.exists(args.baseline) and not args.update_baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    # Warm imports and Streamlit caches so the first cassette isn't penalised
+    measure(paths[0], 0, args.timeout)
+
+    results, problems = {}, []
+    for path in paths:
+        name = os.path.basename(path)[: -len(".jsonl.gz")]
+        results[name] = current = measure(path, args.speed, args.timeout, args.repeat)
+        print(f"{name:<30} calls={current['calls']} prompt_tokens={current['prompt_tokens']} "
+              f"latency={current['latency']:.2f}s unmatched={current['unmatched_prompts']}")
+        if name in baseline:
+            problems += compare(name, current, baseline[name], args.token_tolerance, args.latency_tolerance,
+                                args.latency_floor)
+        elif baseline:
+            print(f"  (no baseline entry for {name})")
+
+    if args.update_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print(f"\nbaseline written to {args.baseline}")
+        return
+
+    if problems:
+        print("\nREGRESSIONS:")
+        for problem in problems:
+            print(f"  {problem}")
+        sys.exit(1)
+    print("\nno regressions")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--timeout", type=float, default=300.0, help="per-rerun timeout in seconds")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    record_parser = commands.add_parser("record", help="record one cassette per flow")
+    record_parser.add_argument("--flows", default=os.path.join(REPO_ROOT, "benchmarks", "flows.json"))
+    record_parser.add_argument("--out", required=True, help="directory to write cassettes to")
+    record_parser.set_defaults(handler=record)
+
+    replay_parser = commands.add_parser("replay", help="replay cassettes and compare with the baseline")
+    replay_parser.add_argument("--cassettes", required=True, help="directory of *.jsonl.gz cassettes")
+    replay_parser.add_argument("--baseline", required=True, help="baseline JSON file")
+    replay_parser.add_argument("--update-baseline", action="store_true", help="write the baseline instead of checking it")
+    replay_parser.add_argument("--speed", type=float, default=1.0, help="replay speed (1 = original timing, 0 = no delay)")
+    replay_parser.add_argument("--token-tolerance", type=float, default=0.05, help="allowed relative change in prompt tokens")
+    replay_parser.add_argument("--latency-tolerance", type=float, default=0.25, help="allowed relative increase in latency")
+    replay_parser.add_argument("--latency-floor", type=float, default=0.5,
+                               help="latency increases up to this many seconds are never flagged")
+    replay_parser.add_argument("--repeat", type=int, default=3, help="replays per cassette; latency is the best of them")
+    replay_parser.set_defaults(handler=replay)
+
+    args = parser.parse_args()
+    args.handler(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""
+Token budgets for model calls.
+
+Before a call, `fit_code` estimates the submission's size locally and trims
+oversized code to a head and tail with the middle elided, so one huge paste
+can't blow up the prompt. `max_tokens_for` sizes the output budget from the
+call type, feedback mode and skill level: until enough calls have been seen
+it uses the defaults below, after that the 95th percentile of recent output
+lengths plus headroom, clamped to a floor and ceiling. Reviews also get room
+for an improved solution about as long as the submission.
+
+History is kept in memory per process and seeded from the telemetry log
+(CODEMENTOR_TELEMETRY_DIR) when one exists. Settings:
+
+    CODEMENTOR_MAX_CODE_TOKENS=3000   trim submissions above this estimate
+"""
+
+import glob
+import json
+import os
+import re
+import threading
+from collections import deque
+from typing import Dict, Optional, Tuple
+
+import telemetry
+
+MAX_CODE_TOKENS = int(os.environ.get("CODEMENTOR_MAX_CODE_TOKENS", "3000"))
+MAX_CONTINUATIONS = 2
+
+# (default, floor, ceiling) output tokens per call type and feedback mode
+OUTPUT_LIMITS: Dict[Tuple[str, Optional[str]], Tuple[int, int, int]] = {
+    ("assess", None): (700, 400, 1000),
+    ("starter", None): (400, 250, 600),
+    ("review", "concise"): (900, 600, 1500),
+    ("review", "detailed"): (2600, 1500, 4500),
+}
+# Detailed explanations get longer the less experience we assume
+LEVEL_FACTORS = {"beginner": 1.15, "intermediate": 1.0, "advanced": 0.9}
+HEADROOM = 1.25
+PERCENTILE = 0.95
+MIN_SAMPLES = 20
+HISTORY_SIZE = 500
+
+_TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+
+telemetry.REGISTRY.describe("codementor_budget_trimmed_total", "counter", "Submissions trimmed to fit the prompt budget.")
+telemetry.REGISTRY.describe("codementor_llm_continuations_total", "counter", "Follow-up calls made after a max_tokens stop.")
+
+
+def estimate_tokens(text: str) -> int:
+    """Local token estimate: one per punctuation mark, about four characters per word."""
+    return sum(len(piece) // 4 + 1 for piece in _TOKEN_PATTERN.findall(text))
+
+
+def fit_code(code: str, max_tokens: int = MAX_CODE_TOKENS) -> str:
+    """`code` unchanged if it fits, otherwise its head and tail with the middle elided."""
+    if estimate_tokens(code) <= max_tokens:
+        return code
+    lines = code.splitlines()
+    head, tail, used = [], [], 0
+    head_budget = max_tokens * 0.6
+    for line in lines:
+        cost = estimate_tokens(line) + 1
+        if used + cost > head_budget:
+            break
+        head.append(line)
+        used += cost
+    for line in reversed(lines[len(head):]):
+        cost = estimate_tokens(line) + 1
+        if used + cost > max_tokens:
+            break
+        tail.insert(0, line)
+        used += cost
+    omitted = len(lines) - len(head) - len(tail)
+    telemetry.REGISTRY.inc("codementor_budget_trimmed_total", {})
+    return "\n".join(head + [f"# ... {omitted} lines omitted to fit the review budget ..."] + tail)
+
+
+class OutputHistory:
+    """Recent output lengths per (call type, feedback mode, skill level)."""
+
+    def __init__(self, size: int = HISTORY_SIZE):
+        self.size = size
+        self._samples: Dict[tuple, deque] = {}
+        self._lock = threading.Lock()
+
+    def record(self, call_type: str, feedback_mode: Optional[str], skill_level: Optional[str], output_tokens: int):
+        with self._lock:
+            for key in ((call_type, feedback_mode, skill_level), (call_type, feedback_mode, None)):
+                self._samples.setdefault(key, deque(maxlen=self.size)).append(output_tokens)
+
+    def percentile(self, call_type: str, feedback_mode: Optional[str], skill_level: Optional[str],
+                   q: float = PERCENTILE) -> Optional[int]:
+        """The q-th percentile for the most specific key with enough samples, or None."""
+        with self._lock:
+            for key in ((call_type, feedback_mode, skill_level), (call_type, feedback_mode, None)):
+                samples = self._samples.get(key)
+                if samples and len(samples) >= MIN_SAMPLES:
+                    ordered = sorted(samples)
+                    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+        return None
+
+    def seed_from_telemetry(self, directory: str):
+        """Load output lengths of completed calls from the rotated telemetry JSONL files.
+
+        The log only has gross lengths, so seeded reviews slightly overstate
+        the budget until fresh samples replace them.
+        """
+        for path in sorted(glob.glob(os.path.join(directory, "calls.jsonl*")), reverse=True):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        call = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    if call.get("error") or call.get("stop_reason") == "max_tokens":
+                        continue
+                    self.record(call["call_type"], call.get("feedback_mode"), call.get("skill_level"), call["output_tokens"])
+
+
+_history = None
+_history_lock = threading.Lock()
+
+
+def history() -> OutputHistory:
+    """The process-wide output history, seeded from the telemetry log on first use."""
+    global _history
+    with _history_lock:
+        if _history is None:
+            _history = OutputHistory()
+            directory = os.environ.get("CODEMENTOR_TELEMETRY_DIR")
+            if directory and os.path.isdir(directory):
+                _history.seed_from_telemetry(directory)
+        return _history
+
+
+def record_output(call_type: str, feedback_mode: Optional[str], skill_level: Optional[str], output_tokens: int,
+                  code: str = ""):
+    """Add a finished call's output length, net of the room reserved for restating `code`."""
+    if call_type == "review" and code:
+        output_tokens = max(0, output_tokens - min(estimate_tokens(code), MAX_CODE_TOKENS))
+    history().record(call_type, feedback_mode, skill_level, output_tokens)
+
+
+def max_tokens_for(call_type: str, feedback_mode: Optional[str] = None, skill_level: Optional[str] = None,
+                   code: str = "") -> int:
+    """Output budget for one call; reviews add room to restate the submission."""
+    default, floor, ceiling = OUTPUT_LIMITS.get((call_type, feedback_mode)) or OUTPUT_LIMITS[(call_type, None)]
+    observed = history().percentile(call_type, feedback_mode, skill_level)
+    if observed is None:
+        budget = default * (LEVEL_FACTORS.get(skill_level, 1.0) if feedback_mode == "detailed" else 1.0)
+    else:
+        budget = observed * HEADROOM
+    budget = min(ceiling, max(floor, budget))
+    if call_type == "review" and code:
+        budget += min(estimate_tokens(code), MAX_CODE_TOKENS)
+    return int(budget)
@@ -0,0 +1,179 @@
+"""
+Record/replay of model calls ("cassettes") for deterministic regression runs.
+
+A cassette is a gzip-compressed JSONL file: a header line describing the flow
+that produced it, then one line per model call with the exact request, the
+response text, stop reason, usage and the original timing.
+
+`_send_message` and `call_tool` in mentor.py consult `active_cassette()` on
+every request:
+
+    CODEMENTOR_CASSETTE=cassettes/lru_cache.jsonl.gz
+    CODEMENTOR_CASSETTE_MODE=record | replay
+    CODEMENTOR_REPLAY_SPEED=1.0     # 1 = original timing, 10 = 10x faster, 0 = no delay
+
+Record mode starts a fresh cassette the first time the process uses the
+path, so re-recording never appends to an old run.
+
+In replay mode requests are matched on their exact content first. If a
+prompt has changed since recording, the next unplayed call of the same type
+is served instead and the mismatch is noted, so a regression run can still
+complete and report what changed.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from typing import List, Optional
+
+FORMAT = "codementor-cassette"
+VERSION = 1
+
+
+class CassetteMiss(LookupError):
+    """Replay was asked for a call the cassette has no response for."""
+
+
+@dataclass
+class Interaction:
+    call_type: str
+    request: dict
+    text: str
+    stop_reason: Optional[str]
+    usage: dict
+    latency: float
+    ttft: Optional[float] = None
+    request_hash: str = ""
+
+    def __post_init__(self):
+        if not self.request_hash:
+            self.request_hash = request_hash(self.request)
+
+
+@dataclass
+class Played:
+    """One call served during replay, as the regression runner sees it."""
+    call_type: str
+    prompt_tokens: int
+    exact_match: bool
+
+
+@dataclass
+class Cassette:
+    path: str
+    mode: str
+    speed: float = 1.0
+    flow: Optional[dict] = None
+    interactions: List[Interaction] = field(default_factory=list)
+    played: List[Played] = field(default_factory=list)
+    _used: set = field(default_factory=set, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    @classmethod
+    def create(cls, path: str, flow: Optional[dict] = None) -> "Cassette":
+        """Start a new cassette for recording, replacing any existing file."""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with gzip.open(path, "wt", encoding="utf-8") as f:
+            f.write(json.dumps({"format": FORMAT, "version": VERSION, "flow": flow}) + "\n")
+        return cls(path=path, mode="record", flow=flow)
+
+    @classmethod
+    def load(cls, path: str, speed: float = 1.0) -> "Cassette":
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            header = json.loads(f.readline())
+            if header.get("format") != FORMAT:
+                raise ValueError(f"{path} is not a CodeMentor cassette")
+            if header.get("version") != VERSION:
+                raise ValueError(f"{path} has cassette version {header.get('version')}, expected {VERSION}")
+            interactions = [Interaction(**json.loads(line)) for line in f if line.strip()]
+        return cls(path=path, mode="replay", speed=speed, flow=header.get("flow"), interactions=interactions)
+
+    def record(self, interaction: Interaction):
+        # Each call is appended as its own gzip member, so a crash mid-flow
+        # still leaves a readable cassette.
+        with self._lock:
+            if not os.path.exists(self.path):
+                Cassette.create(self.path, self.flow)
+            with gzip.open(self.path, "at", encoding="utf-8") as f:
+                f.write(json.dumps(asdict(interaction), separators=(",", ":")) + "\n")
+            self.interactions.append(interaction)
+
+    def replay(self, call_type: str, request: dict) -> Interaction:
+        """Return the recorded response for `request`, sleeping for its original latency."""
+        key = request_hash(request)
+        with self._lock:
+            index = next(
+                (i for i, item in enumerate(self.interactions) if i not in self._used and item.request_hash == key),
+                None,
+            )
+            exact = index is not None
+            if index is None:
+                index = next(
+                    (i for i, item in enumerate(self.interactions) if i not in self._used and item.call_type == call_type),
+                    None,
+                )
+            if index is None:
+                raise CassetteMiss(f"{self.path} has no unplayed '{call_type}' call left")
+            self._used.add(index)
+            self.played.append(Played(call_type, estimate_prompt_tokens(request), exact))
+            interaction = self.interactions[index]
+
+        if self.speed > 0:
+            time.sleep(interaction.latency / self.speed)
+        return interaction
+
+
+def request_hash(request: dict) -> str:
+    canonical = json.dumps(request, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:32]
+
+
+def estimate_prompt_tokens(request: dict) -> int:
+    """Rough local token count for the messages in a request (about 4 characters per token)."""
+    text = "".join(
+        message["content"] if isinstance(message["content"], str) else json.dumps(message["content"])
+        for message in request.get("messages", [])
+    )
+    return max(1, len(text) // 4)
+
+
+_active = {}
+_active_lock = threading.Lock()
+
+
+def active_cassette() -> Optional[Cassette]:
+    """The cassette selected by the environment, or None when record/replay is off."""
+    path = os.environ.get("CODEMENTOR_CASSETTE")
+    mode = os.environ.get("CODEMENTOR_CASSETTE_MODE", "replay")
+    if not path:
+        return None
+    if mode not in ("record", "replay"):
+        raise ValueError(f"CODEMENTOR_CASSETTE_MODE must be 'record' or 'replay', not {mode!r}")
+
+    key = (os.path.abspath(path), mode)
+    with _active_lock:
+        cassette = _active.get(key)
+        if cassette is None:
+            if mode == "replay":
+                cassette = Cassette.load(path, float(os.environ.get("CODEMENTOR_REPLAY_SPEED", "1.0")))
+            else:
+                cassette = Cassette.create(path)
+            _active[key] = cassette
+        return cassette
+
+
+def activate(cassette: Cassette) -> Cassette:
+    """Make `cassette` the one `active_cassette()` returns for its path and mode."""
+    with _active_lock:
+        _active[(os.path.abspath(cassette.path), cassette.mode)] = cassette
+    return cassette
+
+
+def reset():
+    """Forget loaded cassettes so the next call re-reads the environment and files."""
+    with _active_lock:
+        _active.clear()
@@ -0,0 +1,412 @@
+"""
+Deterministic code metrics from a single `ast` walk.
+
+`analyze(code)` gives the numbers behind the 📖 Readability and ⚡
+Performance discussion without waiting for the model:
+
+- cyclomatic complexity (whole snippet and worst function)
+- maximum loop nesting depth, and the nested loops that are hot spots
+- patterns that are quadratic inside a loop: `in` on a list, `list.remove`
+  / `index` / `count` / `pop(0)` / `insert(0, ...)`, string `+=` and
+  `lst = lst + [...]`
+- function length
+- identifier quality: single letters, non-snake_case names, shadowed builtins
+- Pythonic idioms used, and the usual anti-patterns (`range(len(...))`,
+  `== None` / `== True`, `type(x) == ...`, bare `except:`)
+
+Step 3 shows them as metric cards as soon as the code is submitted, and
+`prompt_summary` puts them in the review prompt so the model can build on
+them rather than re-derive them.
+"""
+
+import ast
+import builtins
+import re
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+LONG_FUNCTION_LINES = 30
+_SNAKE_CASE = re.compile(r"^_{0,2}[a-z][a-z0-9_]*_{0,2}$")
+_CLASS_CASE = re.compile(r"^_?[A-Z][A-Za-z0-9]*$")
+_CONSTANT_CASE = re.compile(r"^_?[A-Z][A-Z0-9_]*$")
+_SHORT_OK = frozenset("i j k n m x y z _ e f".split())
+_BUILTIN_NAMES = frozenset(name for name in dir(builtins) if not name.startswith("_")) - {"copyright", "credits", "license", "exit", "quit"}
+_LINEAR_LIST_METHODS = {"remove": "list.remove()", "index": "list.index()", "count": "list.count()"}
+# CPython 3.11 keeps the AST-to-object recursion depth in interpreter-wide
+# state, so concurrent ast.parse calls (Streamlit sessions, grading and
+# gallery-build workers) can fail with "AST constructor recursion depth
+# mismatch"; every parse goes through this lock
+_PARSE_LOCK = threading.Lock()
+
+
+@dataclass
+class Finding:
+    line: int
+    message: str
+
+
+@dataclass
+class CodeMetrics:
+    parsed: bool = True
+    error: str = ""
+    lines: int = 0
+    functions: int = 0
+    complexity: int = 1
+    max_function_complexity: int = 0
+    max_loop_depth: int = 0
+    hotspots: List[Finding] = field(default_factory=list)
+    quadratic: List[Finding] = field(default_factory=list)
+    longest_function: Optional[Tuple[str, int]] = None
+    identifiers: int = 0
+    identifier_issues: List[str] = field(default_factory=list)
+    idioms: List[str] = field(default_factory=list)
+    anti_patterns: List[Finding] = field(default_factory=list)
+
+    @property
+    def identifier_score(self) -> float:
+        """Share of distinct identifiers with no naming issue (1.0 when there are none)."""
+        return 1.0 - len(self.identifier_issues) / self.identifiers if self.identifiers else 1.0
+
+
+class _Walker(ast.NodeVisitor):
+    """Collects every metric in one pass over the tree."""
+
+    def __init__(self, metrics: CodeMetrics):
+        self.m = metrics
+        self.loop_depth = 0
+        self.loop_lines: List[int] = []
+        self.function_complexity: List[int] = []   # stack, innermost last
+        self.kinds: Dict[str, str] = {}            # name -> "list" | "str" | "set" | "dict", as last assigned
+        self.seen_names: Dict[str, int] = {}
+        self.idioms = set()
+
+    # Helpers ----------------------------------------------------------------
+
+    def _branch(self, count: int = 1):
+        self.m.complexity += count
+        if self.function_complexity:
+            self.function_complexity[-1] += count
+
+    def _in_loop(self, line: int, message: str):
+        if self.loop_depth:
+            self.m.quadratic.append(Finding(line, message))
+
+    def _name(self, name: str, line: int, kind: str = "variable"):
+        if name in self.seen_names:
+            return
+        self.seen_names[name] = line
+        if kind == "class":
+            ok, issue = bool(_CLASS_CASE.match(name)), f"`{name}` (line {line}) should be CapWords"
+        elif len(name) == 1 and name not in _SHORT_OK:
+            ok, issue = False, f"`{name}` (line {line}) is a single letter"
+        elif name in _BUILTIN_NAMES:
+            ok, issue = False, f"`{name}` (line {line}) shadows the built-in"
+        else:
+            ok = bool(_SNAKE_CASE.match(name) or (kind == "variable" and _CONSTANT_CASE.match(name)))
+            issue = f"`{name}` (line {line}) is not snake_case"
+        self.m.identifiers += 1
+        if not ok:
+            self.m.identifier_issues.append(issue)
+
+    def _bind(self, target, value=None):
+        for node in ast.walk(target):
+            if isinstance(node, ast.Name):
+                self._name(node.id, node.lineno)
+        if isinstance(target, ast.Name) and value is not None:
+            kind = _kind_of(value, self.kinds)
+            if kind:
+                self.kinds[target.id] = kind
+            else:
+                self.kinds.pop(target.id, None)
+        if isinstance(target, (ast.Tuple, ast.List)):
+            self.idioms.add("tuple unpacking")
+
+    def _loop(self, line: int, targets=()):
+        self.loop_depth += 1
+        self.loop_lines.append(line)
+        if self.loop_depth > self.m.max_loop_depth:
+            self.m.max_loop_depth = self.loop_depth
+        if self.loop_depth >= 2:
+            self.m.hotspots.append(Finding(line, f"loop nested {self.loop_depth} deep (outer loop on line {self.loop_lines[0]})"))
+        for target in targets:
+            self._bind(target)
+
+    def _end_loop(self):
+        self.loop_depth -= 1
+        self.loop_lines.pop()
+
+    # Definitions ------------------------------------------------------------
+
+    def visit_FunctionDef(self, node):
+        self.m.functions += 1
+        self._name(node.name, node.lineno, "function")
+        for arg in node.args.posonlyargs + node.args.args + node.args.kwonlyargs:
+            if arg.arg not in ("self", "cls"):
+                self._name(arg.arg, arg.lineno)
+            if isinstance(arg.annotation, ast.Name) and arg.annotation.id in ("list", "str", "set", "dict"):
+                self.kinds[arg.arg] = arg.annotation.id
+        if node.returns is not None or any(a.annotation for a in node.args.args):
+            self.idioms.add("type hints")
+        if ast.get_docstring(node):
+            self.idioms.add("docstrings")
+        length = (node.end_lineno or node.lineno) - node.lineno + 1
+        if self.m.longest_function is None or length > self.m.longest_function[1]:
+            self.m.longest_function = (node.name, length)
+
+        # A function body starts outside any loop of its caller
+        outer_depth, outer_lines = self.loop_depth, self.loop_lines
+        self.loop_depth, self.loop_lines = 0, []
+        self.function_complexity.append(1)
+        self.generic_visit(node)
+        complexity = self.function_complexity.pop()
+        self.m.max_function_complexity = max(self.m.max_function_complexity, complexity)
+        self.loop_depth, self.loop_lines = outer_depth, outer_lines
+
+    visit_AsyncFunctionDef = visit_FunctionDef
+
+    def visit_Lambda(self, node):
+        self.generic_visit(node)
+
+    def visit_ClassDef(self, node):
+        self._name(node.name, node.lineno, "class")
+        self.generic_visit(node)
+
+    # Branches and loops -----------------------------------------------------
+
+    def visit_If(self, node):
+        self._branch()
+        self.generic_visit(node)
+
+    def visit_IfExp(self, node):
+        self._branch()
+        self.generic_visit(node)
+
+    def visit_BoolOp(self, node):
+        self._branch(len(node.values) - 1)
+        self.generic_visit(node)
+
+    def visit_ExceptHandler(self, node):
+        self._branch()
+        if node.type is None:
+            self.m.anti_patterns.append(Finding(node.lineno, "bare `except:` also catches KeyboardInterrupt and typos"))
+        self.generic_visit(node)
+
+    def visit_match_case(self, node):
+        self._branch()
+        self.generic_visit(node)
+
+    def visit_For(self, node):
+        self._branch()
+        self.visit(node.iter)
+        iter_call = node.iter if isinstance(node.iter, ast.Call) else None
+        if iter_call and isinstance(iter_call.func, ast.Name):
+            if iter_call.func.id == "range" and len(iter_call.args) == 1 and _is_len_call(iter_call.args[0]):
+                self.m.anti_patterns.append(Finding(node.lineno, "`for i in range(len(...))` - iterate directly or use enumerate()"))
+            elif iter_call.func.id in ("enumerate", "zip", "reversed", "sorted"):
+                self.idioms.add(f"{iter_call.func.id}()")
+        self._loop(node.lineno, (node.target,))
+        for child in node.body + node.orelse:
+            self.visit(child)
+        self._end_loop()
+
+    visit_AsyncFor = visit_For
+
+    def visit_While(self, node):
+        self._branch()
+        self.visit(node.test)
+        self._loop(node.lineno)
+        for child in node.body + node.orelse:
+            self.visit(child)
+        self._end_loop()
+
+    def _comprehension(self, node, idiom: str):
+        self.idioms.add(idiom)
+        for generator in node.generators:
+            self._branch(1 + len(generator.ifs))
+            self.visit(generator.iter)
+            self._loop(node.lineno, (generator.target,))
+            for condition in generator.ifs:
+                self.visit(condition)
+        for part in ("elt", "key", "value"):
+            if hasattr(node, part):
+                self.visit(getattr(node, part))
+        for _ in node.generators:
+            self._end_loop()
+
+    def visit_ListComp(self, node):
+        self._comprehension(node, "list comprehension")
+
+    def visit_SetComp(self, node):
+        self._comprehension(node, "set comprehension")
+
+    def visit_DictComp(self, node):
+        self._comprehension(node, "dict comprehension")
+
+    def visit_GeneratorExp(self, node):
+        self._comprehension(node, "generator expression")
+
+    # Statements and expressions ---------------------------------------------
+
+    def visit_Assign(self, node):
+        self.visit(node.value)
+        for target in node.targets:
+            if (isinstance(target, ast.Name) and isinstance(node.value, ast.BinOp) and isinstance(node.value.op, ast.Add)
+                    and isinstance(node.value.left, ast.Name) and node.value.left.id == target.id):
+                kind = self.kinds.get(target.id) or _kind_of(node.value.right, self.kinds)
+                if kind in ("list", "str"):
+                    self._in_loop(node.lineno, f"`{target.id} = {target.id} + ...` copies the whole {kind} every iteration")
+            self._bind(target, node.value)
+            if not isinstance(target, ast.Name):
+                self.visit(target)
+
+    def visit_AnnAssign(self, node):
+        if node.value is not None:
+            self.visit(node.value)
+        self.idioms.add("type hints")
+        self._bind(node.target, node.value)
+        if isinstance(node.target, ast.Name) and isinstance(node.annotation, ast.Name) and node.annotation.id in ("list", "str", "set", "dict"):
+            self.kinds[node.target.id] = node.annotation.id
+
+    def visit_AugAssign(self, node):
+        self.visit(node.value)
+        if isinstance(node.op, ast.Add) and isinstance(node.target, ast.Name):
+            kind = self.kinds.get(node.target.id) or _kind_of(node.value, self.kinds)
+            if kind == "str":
+                self._in_loop(node.lineno, f"string `{node.target.id} +=` in a loop rebuilds the string each time - collect parts and ''.join() them")
+        self._bind(node.target)
+
+    def visit_With(self, node):
+        self.idioms.add("context manager (with)")
+        for item in node.items:
+            self.visit(item.context_expr)
+            if item.optional_vars is not None:
+                self._bind(item.optional_vars)
+        for child in node.body:
+            self.visit(child)
+
+    visit_AsyncWith = visit_With
+
+    def visit_Compare(self, node):
+        self.generic_visit(node)
+        for op, right in zip(node.ops, node.comparators):
+            if isinstance(op, (ast.In, ast.NotIn)) and _kind_of(right, self.kinds) == "list":
+                self._in_loop(node.lineno, "`in` on a list is a linear scan inside a loop - use a set for membership tests")
+            if isinstance(op, (ast.Eq, ast.NotEq)) and isinstance(right, ast.Constant) and (right.value is None or isinstance(right.value, bool)):
+                self.m.anti_patterns.append(Finding(node.lineno, f"`== {right.value}` - use `is {right.value}` or test truthiness"))
+        if (isinstance(node.left, ast.Call) and isinstance(node.left.func, ast.Name) and node.left.func.id == "type"
+                and any(isinstance(op, (ast.Eq, ast.NotEq, ast.Is)) for op in node.ops)):
+            self.m.anti_patterns.append(Finding(node.lineno, "`type(x) == ...` - use isinstance()"))
+
+    def visit_Call(self, node):
+        self.generic_visit(node)
+        func = node.func
+        if isinstance(func, ast.Attribute):
+            receiver_kind = _kind_of(func.value, self.kinds)
+            if func.attr in _LINEAR_LIST_METHODS and receiver_kind == "list":
+                self._in_loop(node.lineno, f"{_LINEAR_LIST_METHODS[func.attr]} scans the list inside a loop")
+            elif func.attr == "pop" and node.args and _is_zero(node.args[0]) and receiver_kind != "dict":
+                self._in_loop(node.lineno, "`pop(0)` shifts every element - use collections.deque.popleft()")
+            elif func.attr == "insert" and node.args and _is_zero(node.args[0]):
+                self._in_loop(node.lineno, "`insert(0, ...)` shifts every element - use collections.deque.appendleft()")
+            elif func.attr == "join" and isinstance(func.value, ast.Constant) and isinstance(func.value.value, str):
+                self.idioms.add("str.join()")
+            elif func.attr == "get" and receiver_kind != "list":
+                self.idioms.add("dict.get()")
+        elif isinstance(func, ast.Name):
+            if func.id in ("any", "all", "sum", "min", "max") and node.args and isinstance(node.args[0], ast.GeneratorExp):
+                self.idioms.add(f"{func.id}() over a generator")
+            elif func.id == "isinstance":
+                self.idioms.add("isinstance()")
+            if func.id in ("sorted", "min", "max") and any(k.arg == "key" for k in node.keywords):
+                self.idioms.add("key= functions")
+
+    def visit_JoinedStr(self, node):
+        self.idioms.add("f-strings")
+        self.generic_visit(node)
+
+
+def _is_len_call(node) -> bool:
+    return isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id == "len"
+
+
+def _is_zero(node) -> bool:
+    return isinstance(node, ast.Constant) and node.value == 0
+
+
+def _kind_of(node, kinds: Dict[str, str]) -> Optional[str]:
+    """Best-effort static type of an expression: list, str, set, dict or None."""
+    if isinstance(node, (ast.List, ast.ListComp)):
+        return "list"
+    if isinstance(node, (ast.Set, ast.SetComp)):
+        return "set"
+    if isinstance(node, (ast.Dict, ast.DictComp)):
+        return "dict"
+    if isinstance(node, ast.JoinedStr) or (isinstance(node, ast.Constant) and isinstance(node.value, str)):
+        return "str"
+    if isinstance(node, ast.Name):
+        return kinds.get(node.id)
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id in ("list", "str", "set", "dict", "sorted"):
+        return "list" if node.func.id == "sorted" else node.func.id
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute) and node.func.attr in ("split", "splitlines"):
+        return "list"
+    if isinstance(node, ast.BinOp) and isinstance(node.op, ast.Add):
+        return _kind_of(node.left, kinds) or _kind_of(node.right, kinds)
+    return None
+
+
+def parse(code: str) -> ast.Module:
+    """`ast.parse`, serialized across threads (see _PARSE_LOCK)."""
+    with _PARSE_LOCK:
+        return ast.parse(code)
+
+
+def analyze(code: str) -> CodeMetrics:
+    """All metrics for a snippet; `parsed` is False (with `error`) if it isn't valid Python."""
+    metrics = CodeMetrics(lines=len([line for line in code.splitlines() if line.strip()]))
+    try:
+        tree = parse(code)
+    except (SyntaxError, ValueError) as exc:
+        metrics.parsed = False
+        metrics.error = f"line {getattr(exc, 'lineno', '?')}: {getattr(exc, 'msg', exc)}"
+        return metrics
+    walker = _Walker(metrics)
+    walker.visit(tree)
+    metrics.idioms = sorted(walker.idioms)
+    if not metrics.max_function_complexity:
+        metrics.max_function_complexity = metrics.complexity
+    return metrics
+
+
+def complexity_label(complexity: int) -> str:
+    """The usual cyclomatic-complexity bands."""
+    if complexity <= 5:
+        return "simple"
+    if complexity <= 10:
+        return "moderate"
+    if complexity <= 20:
+        return "complex"
+    return "very complex"
+
+
+def prompt_summary(metrics: CodeMetrics) -> str:
+    """Plain-text block for the review prompt."""
+    if not metrics.parsed:
+        return f"- The code does not parse ({metrics.error})."
+    lines = [
+        f"- Cyclomatic complexity: {metrics.complexity} overall, {metrics.max_function_complexity} in the most complex function ({complexity_label(metrics.max_function_complexity)})",
+        f"- Maximum loop nesting depth: {metrics.max_loop_depth}",
+    ]
+    if metrics.longest_function:
+        name, length = metrics.longest_function
+        lines.append(f"- Longest function: `{name}` with {length} lines")
+    for finding in metrics.hotspots:
+        lines.append(f"- Hot spot, line {finding.line}: {finding.message}")
+    for finding in metrics.quadratic:
+        lines.append(f"- Quadratic pattern, line {finding.line}: {finding.message}")
+    for finding in metrics.anti_patterns:
+        lines.append(f"- Anti-pattern, line {finding.line}: {finding.message}")
+    if metrics.identifier_issues:
+        lines.append("- Identifier issues: " + "; ".join(metrics.identifier_issues[:5]))
+    lines.append("- Pythonic idioms already used: " + (", ".join(metrics.idioms) if metrics.idioms else "none"))
+    return "\n".join(lines)
@@ -0,0 +1,104 @@
+"""
+CodeMentor instructor dashboard - learner progression across all sessions.
+
+Reads the analytics store written by the app and the batch grader (see
+analytics.py). Run it alongside the learner-facing app:
+
+    streamlit run dashboard.py --server.port 8502
+"""
+
+import time
+from datetime import datetime, timezone
+
+import pandas as pd
+import streamlit as st
+
+import analytics
+import assets
+
+st.set_page_config(
+    page_title="CodeMentor · Instructor dashboard",
+    page_icon="📊",
+    layout="wide"
+)
+st.markdown(assets.style_html(st.get_option("server.enableStaticServing")), unsafe_allow_html=True)
+
+WINDOWS = {"Last 7 days": 7, "Last 30 days": 30, "Last 90 days": 90, "All time": None}
+PERIODS = {"Day": 86400, "Week": 7 * 86400}
+
+
+@st.cache_resource(max_entries=1)
+def load_snapshot(segments: tuple):
+    """Map the store once per set of segments; a new segment gives a new cache key."""
+    return analytics.load()
+
+
+st.markdown('<h1 class="main-title">Instructor dashboard</h1>', unsafe_allow_html=True)
+st.markdown('<p class="subtitle">How learners are progressing across every CodeMentor session.</p>', unsafe_allow_html=True)
+
+snapshot = load_snapshot(tuple(analytics.segment_paths()))
+if snapshot is None:
+    st.info(f"No assessments recorded yet in `{analytics.DEFAULT_DIR}`. "
+            "They are added as learners reach Step 3, or by `python grade.py`.")
+    st.stop()
+
+with st.sidebar:
+    st.markdown("### 📊 Filters")
+    window = st.selectbox("Time window", list(WINDOWS), index=1)
+    task = st.selectbox("Task", ["All tasks"] + sorted(snapshot.tasks))
+    period = st.radio("Group levels by", list(PERIODS), horizontal=True)
+
+started = time.perf_counter()
+days = WINDOWS[window]
+mask = snapshot.select(
+    since=time.time() - days * 86400 if days else None,
+    task=None if task == "All tasks" else task,
+)
+levels = snapshot.level_distribution(mask, PERIODS[period])
+passes = snapshot.pass_rates(mask)
+growth = snapshot.top_tags("growth", mask, per_task=5)
+assessments = int(mask.sum())
+learners = snapshot.learner_count(mask)
+elapsed = time.perf_counter() - started
+
+col1, col2, col3, col4 = st.columns(4)
+col1.metric("Assessments", f"{assessments:,}")
+col2.metric("Learners", f"{learners:,}")
+attempted = sum(p["attempts"] for p in passes.values())
+col3.metric("Pass rate", f"{sum(p['attempts'] * p['pass_rate'] for p in passes.values()) / attempted:.0%}" if attempted else "–")
+col4.metric("Tasks", f"{len(passes):,}")
+
+st.markdown('<div class="section-header">📈 Skill levels over time</div>', unsafe_allow_html=True)
+if levels:
+    frame = pd.DataFrame.from_dict(levels, orient="index", columns=list(analytics.LEVELS))
+    frame.index = [datetime.fromtimestamp(ts, timezone.utc).date() for ts in frame.index]
+    st.area_chart(frame.div(frame.sum(axis=1), axis=0), height=280)
+    st.caption("Share of assessments at each level per " + period.lower())
+else:
+    st.caption("No assessments in this window.")
+
+col_pass, col_growth = st.columns(2)
+
+with col_pass:
+    st.markdown('<div class="section-header">✅ Pass rate by task</div>', unsafe_allow_html=True)
+    table = pd.DataFrame([
+        {"Task": name, "Attempts": p["attempts"], "Pass rate": 100 * p["pass_rate"]}
+        for name, p in sorted(passes.items(), key=lambda item: -item[1]["attempts"])
+    ])
+    if len(table):
+        st.dataframe(table, hide_index=True, use_container_width=True, column_config={
+            "Pass rate": st.column_config.ProgressColumn("Pass rate", format="%.0f%%", min_value=0, max_value=100),
+        })
+
+with col_growth:
+    st.markdown('<div class="section-header">🌱 Most common growth areas</div>', unsafe_allow_html=True)
+    if task != "All tasks" and task in growth:
+        st.bar_chart(pd.DataFrame(growth[task], columns=["Growth area", "Assessments"]).set_index("Growth area"),
+                     height=280)
+    elif growth:
+        st.dataframe(pd.DataFrame([
+            {"Task": name, "Top growth areas": " · ".join(f"{tag} ({count:,})" for tag, count in ranked[:3])}
+            for name, ranked in sorted(growth.items(), key=lambda item: -sum(c for _, c in item[1]))
+        ]), hide_index=True, use_container_width=True)
+
+st.caption(f"{snapshot.rows:,} rows in {len(analytics.segment_paths())} segment(s) · aggregated in {elapsed * 1000:.0f} ms")
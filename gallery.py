@@ -0,0 +1,470 @@
+"""
+Precomputed example-task gallery.
+
+The "📚 Example tasks to try" tasks are fixed, so everything the model would
+say about them can be generated ahead of time. A build step produces a
+versioned JSON bundle with, for every gallery task:
+
+- a starter template
+- a reference solution and its measured benchmark timing
+- for each common attempt pattern: the skill assessment and a review at
+  every skill level and feedback mode
+
+The app loads the bundle once per process. Submissions for a gallery task
+that match a known attempt pattern (the same code up to comments and
+formatting) get their assessment and review with no model calls.
+
+Build (needs ANTHROPIC_API_KEY; ANTHROPIC_BASE_URL works for dry runs):
+
+    python gallery.py build --out gallery_bundle.json --workers 4
+
+`--task ID` (repeatable) rebuilds only those tasks and keeps the others
+already in the bundle at `--out`.
+"""
+
+import argparse
+import ast
+import hashlib
+import json
+import os
+import timeit
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+import code_metrics
+import telemetry
+
+BUNDLE_FORMAT = "codementor-gallery"
+BUNDLE_VERSION = 2
+DEFAULT_BUNDLE_PATH = os.environ.get(
+    "CODEMENTOR_GALLERY_BUNDLE",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "gallery_bundle.json"),
+)
+
+SKILL_LEVELS = ("beginner", "intermediate", "advanced")
+ASSESSMENT_ATTEMPTS = 3
+FEEDBACK_MODES = ("detailed", "concise")
+
+
+@dataclass
+class GalleryTask:
+    id: str
+    title: str
+    description: str
+    reference: str
+    benchmark: str
+    benchmark_setup: str = ""
+    attempts: Dict[str, str] = field(default_factory=dict)
+
+
+GALLERY_TASKS: List[GalleryTask] = [
+    GalleryTask(
+        id="reverse_words",
+        title="Reverse words in a sentence",
+        description="Generate code that reverses words in a sentence while preserving punctuation",
+        reference='''import re
+
+
+def reverse_words(sentence: str) -> str:
+    """Reverse the word order; sentence-ending punctuation stays at the end."""
+    body, ending = re.fullmatch(r"(.*?)([.!?]*)", sentence.strip(), re.DOTALL).groups()
+    return " ".join(reversed(body.split())) + ending
+''',
+        benchmark_setup='SENTENCE = "the quick brown fox jumps over the lazy dog " * 200 + "!"',
+        benchmark="reverse_words(SENTENCE)",
+        attempts={
+            "loop_concat": '''def reverse_words(sentence):
+    words = sentence.split(" ")
+    result = ""
+    for i in range(len(words) - 1, -1, -1):
+        result += words[i] + " "
+    return result.strip()''',
+            "split_reverse_join": '''def reverse_words(sentence):
+    return " ".join(sentence.split()[::-1])''',
+        },
+    ),
+    GalleryTask(
+        id="validate_email",
+        title="Validate email addresses",
+        description="Generate code that validates email addresses using regex",
+        reference='''import re
+
+EMAIL_PATTERN = re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9-]+(\\.[A-Za-z0-9-]+)*\\.[A-Za-z]{2,}")
+
+
+def is_valid_email(address: str) -> bool:
+    """True if the whole string looks like a deliverable email address."""
+    return EMAIL_PATTERN.fullmatch(address) is not None
+''',
+        benchmark='is_valid_email("someone.name+tag@mail.example.co.uk")',
+        attempts={
+            "contains_at": '''def is_valid_email(email):
+    return "@" in email and "." in email''',
+            "loose_regex": '''import re
+
+def is_valid_email(email):
+    return re.match(r".+@.+\\..+", email) is not None''',
+        },
+    ),
+    GalleryTask(
+        id="longest_palindrome",
+        title="Longest palindromic substring",
+        description="Generate code that finds the longest palindromic substring in a string",
+        reference='''def longest_palindrome(text: str) -> str:
+    """Expand around every centre: O(n^2) time, O(1) extra space."""
+    start, end = 0, 0
+    for centre in range(len(text)):
+        for left, right in ((centre, centre), (centre, centre + 1)):
+            while left >= 0 and right < len(text) and text[left] == text[right]:
+                left -= 1
+                right += 1
+            if right - left - 1 > end - start:
+                start, end = left + 1, right
+    return text[start:end]
+''',
+        benchmark_setup='TEXT = "abacdfgdcaba" * 20 + "racecar"',
+        benchmark="longest_palindrome(TEXT)",
+        attempts={
+            "brute_force": '''def longest_palindrome(s):
+    longest = ""
+    for i in range(len(s)):
+        for j in range(i, len(s)):
+            sub = s[i:j + 1]
+            if sub == sub[::-1] and len(sub) > len(longest):
+                longest = sub
+    return longest''',
+            "odd_centres_only": '''def longest_palindrome(s):
+    best = ""
+    for i in range(len(s)):
+        l, r = i, i
+        while l >= 0 and r < len(s) and s[l] == s[r]:
+            l -= 1
+            r += 1
+        if r - l - 1 > len(best):
+            best = s[l + 1:r]
+    return best''',
+        },
+    ),
+    GalleryTask(
+        id="merge_sorted",
+        title="Merge two sorted lists",
+        description="Generate code that merges two sorted lists efficiently",
+        reference='''def merge_sorted(left: list, right: list) -> list:
+    """Two-pointer merge: O(n + m) time, inputs are left untouched."""
+    merged = []
+    i = j = 0
+    while i < len(left) and j < len(right):
+        if left[i] <= right[j]:
+            merged.append(left[i])
+            i += 1
+        else:
+            merged.append(right[j])
+            j += 1
+    merged.extend(left[i:])
+    merged.extend(right[j:])
+    return merged
+''',
+        benchmark_setup="EVENS, ODDS = list(range(0, 2000, 2)), list(range(1, 2000, 2))",
+        benchmark="merge_sorted(EVENS, ODDS)",
+        attempts={
+            "concat_sort": '''def merge(a, b):
+    result = a + b
+    result.sort()
+    return result''',
+            "pop_front": '''def merge(a, b):
+    result = []
+    while a and b:
+        if a[0] < b[0]:
+            result.append(a.pop(0))
+        else:
+            result.append(b.pop(0))
+    return result + a + b''',
+        },
+    ),
+    GalleryTask(
+        id="lru_cache",
+        title="Simple LRU cache",
+        description="Generate code that implements a simple LRU cache using a dictionary",
+        reference='''class LRUCache:
+    """Least-recently-used cache built on dict insertion order."""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._data = {}
+
+    def get(self, key, default=None):
+        if key not in self._data:
+            return default
+        value = self._data.pop(key)
+        self._data[key] = value
+        return value
+
+    def put(self, key, value):
+        self._data.pop(key, None)
+        self._data[key] = value
+        if len(self._data) > self.capacity:
+            del self._data[next(iter(self._data))]
+''',
+        benchmark="""cache = LRUCache(100)
+for i in range(1000):
+    cache.put(i % 150, i)
+    cache.get(i % 70)""",
+        attempts={
+            "list_order": '''class LRUCache:
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.cache = {}
+        self.order = []
+
+    def get(self, key):
+        if key in self.cache:
+            self.order.remove(key)
+            self.order.append(key)
+            return self.cache[key]
+        return None
+
+    def put(self, key, value):
+        if key in self.cache:
+            self.order.remove(key)
+        elif len(self.cache) >= self.capacity:
+            oldest = self.order.pop(0)
+            del self.cache[oldest]
+        self.cache[key] = value
+        self.order.append(key)''',
+            "no_recency_update": '''class LRUCache:
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.cache = {}
+
+    def get(self, key):
+        return self.cache.get(key)
+
+    def put(self, key, value):
+        if len(self.cache) >= self.capacity:
+            first = list(self.cache.keys())[0]
+            del self.cache[first]
+        self.cache[key] = value''',
+        },
+    ),
+    GalleryTask(
+        id="flatten",
+        title="Flatten a nested list",
+        description="Generate code that flattens a nested list of arbitrary depth",
+        reference='''def flatten(items: list) -> list:
+    """Iterative depth-first flatten, so deep nesting can't hit the recursion limit."""
+    flat = []
+    stack = [iter(items)]
+    while stack:
+        for item in stack[-1]:
+            if isinstance(item, list):
+                stack.append(iter(item))
+                break
+            flat.append(item)
+        else:
+            stack.pop()
+    return flat
+''',
+        benchmark_setup="NESTED = [[i, [i + 1, [i + 2, [i + 3]]]] for i in range(250)]",
+        benchmark="flatten(NESTED)",
+        attempts={
+            "recursive_concat": '''def flatten(items):
+    out = []
+    for item in items:
+        if type(item) == list:
+            out = out + flatten(item)
+        else:
+            out.append(item)
+    return out''',
+            "one_level": '''def flatten(nested):
+    return [x for sub in nested for x in sub]''',
+        },
+    ),
+]
+
+TASKS_BY_DESCRIPTION = {task.description: task for task in GALLERY_TASKS}
+
+telemetry.REGISTRY.describe("codementor_gallery_hits_total", "counter", "Results served from the precomputed gallery bundle.")
+
+
+# Fingerprints ---------------------------------------------------------------
+
+def code_fingerprint(code: str) -> str:
+    """Hash of the code's AST: comments and formatting are ignored, names and literals are not.
+
+    Stored reviews quote the attempt's own identifiers, so a renamed copy
+    must not match.
+    """
+    try:
+        canonical = ast.dump(code_metrics.parse(code), annotate_fields=False)
+    except (SyntaxError, ValueError):
+        canonical = " ".join(code.split())
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:24]
+
+
+# Bundle ---------------------------------------------------------------------
+
+@dataclass
+class GalleryBundle:
+    """A loaded bundle; task entries are the plain dicts written by `build_bundle`."""
+    version: int
+    built_at: str
+    model: str
+    tasks: Dict[str, dict]
+    _fingerprints: Dict[str, Dict[str, str]] = field(default_factory=dict, repr=False)
+
+    def __post_init__(self):
+        for task_id, entry in self.tasks.items():
+            self._fingerprints[task_id] = {
+                attempt["fingerprint"]: attempt_id for attempt_id, attempt in entry.get("attempts", {}).items()
+            }
+
+    def task_entry(self, task_description: str) -> Optional[dict]:
+        task = TASKS_BY_DESCRIPTION.get(task_description.strip())
+        return self.tasks.get(task.id) if task else None
+
+    def starter_for(self, task_description: str) -> Optional[str]:
+        entry = self.task_entry(task_description)
+        if entry and entry.get("starter"):
+            telemetry.REGISTRY.inc("codementor_gallery_hits_total", {"kind": "starter"})
+            return entry["starter"]
+        return None
+
+    def lookup(self, task_description: str, code: str) -> Optional[dict]:
+        """The precomputed attempt entry matching this submission, if any."""
+        task = TASKS_BY_DESCRIPTION.get(task_description.strip())
+        if task is None or task.id not in self.tasks:
+            return None
+        attempt_id = self._fingerprints[task.id].get(code_fingerprint(code))
+        if attempt_id is None:
+            return None
+        telemetry.REGISTRY.inc("codementor_gallery_hits_total", {"kind": "attempt"})
+        return self.tasks[task.id]["attempts"][attempt_id]
+
+
+def load_bundle(path: str = DEFAULT_BUNDLE_PATH) -> Optional[GalleryBundle]:
+    """Load the bundle, or return None if it is missing or from another bundle version."""
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    if data.get("format") != BUNDLE_FORMAT or data.get("version") != BUNDLE_VERSION:
+        return None
+    return GalleryBundle(
+        version=data["version"],
+        built_at=data.get("built_at", ""),
+        model=data.get("model", ""),
+        tasks=data.get("tasks", {}),
+    )
+
+
+# Build ----------------------------------------------------------------------
+
+def benchmark_reference(task: GalleryTask, repeat: int = 5) -> dict:
+    """Time the reference solution on its benchmark statement (best of `repeat`)."""
+    namespace = {}
+    exec(compile(task.reference, f"<gallery:{task.id}>", "exec"), namespace)
+    timer = timeit.Timer(task.benchmark, setup=task.benchmark_setup or "pass", globals=namespace)
+    number, _ = timer.autorange()
+    best = min(timer.repeat(repeat=repeat, number=number)) / number
+    return {"statement": task.benchmark, "best_us": round(best * 1e6, 2), "loops": number, "repeat": repeat}
+
+
+def assess_attempt(task: GalleryTask, code: str) -> dict:
+    """The model's assessment of an attempt, retried rather than storing the fallback."""
+    from mentor import assess_skill_level
+
+    for _ in range(ASSESSMENT_ATTEMPTS):
+        assessment = assess_skill_level(code, task.description)
+        if not assessment.get("fallback"):
+            return assessment
+    raise RuntimeError(f"{task.id}: no usable assessment after {ASSESSMENT_ATTEMPTS} attempts")
+
+
+def build_task(task: GalleryTask, workers: int) -> dict:
+    from mentor import generate_pedagogical_review, generate_starter_code
+
+    entry = {
+        "title": task.title,
+        "description": task.description,
+        "starter": generate_starter_code(task.description),
+        "reference": {"code": task.reference, "benchmark": benchmark_reference(task)},
+        "attempts": {},
+    }
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        assessments = dict(zip(task.attempts, pool.map(
+            lambda code: assess_attempt(task, code), task.attempts.values()
+        )))
+        jobs = {
+            (attempt_id, level, mode): pool.submit(
+                generate_pedagogical_review, task.description, code, level, mode,
+                assessments[attempt_id].get("code_works", False),
+            )
+            for attempt_id, code in task.attempts.items()
+            for level in SKILL_LEVELS
+            for mode in FEEDBACK_MODES
+        }
+        for attempt_id, code in task.attempts.items():
+            entry["attempts"][attempt_id] = {
+                "code": code,
+                "fingerprint": code_fingerprint(code),
+                "assessment": assessments[attempt_id],
+                "reviews": {
+                    level: {mode: jobs[(attempt_id, level, mode)].result() for mode in FEEDBACK_MODES}
+                    for level in SKILL_LEVELS
+                },
+            }
+    return entry
+
+
+def build_bundle(path: str, workers: int = 4, task_ids: Optional[List[str]] = None):
+    from mentor import MODEL
+
+    known = {task.id for task in GALLERY_TASKS}
+    unknown = sorted(set(task_ids or ()) - known)
+    if unknown:
+        raise ValueError(f"unknown task id(s): {', '.join(unknown)} (known: {', '.join(sorted(known))})")
+    tasks = [task for task in GALLERY_TASKS if not task_ids or task.id in task_ids]
+
+    # A partial rebuild keeps the other tasks of the existing bundle
+    existing = load_bundle(path) if task_ids else None
+    bundle = {
+        "format": BUNDLE_FORMAT,
+        "version": BUNDLE_VERSION,
+        "built_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "model": MODEL,
+        "tasks": {task_id: entry for task_id, entry in existing.tasks.items() if task_id in known} if existing else {},
+    }
+    if existing and existing.model != MODEL:
+        print(f"note: keeping tasks built with {existing.model} alongside tasks built with {MODEL}")
+    for task in tasks:
+        print(f"building {task.id} ({len(task.attempts)} attempts)...")
+        bundle["tasks"][task.id] = build_task(task, workers)
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(bundle, f, indent=1, ensure_ascii=False)
+    os.replace(tmp_path, path)
+    print(f"wrote {path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    build_parser = commands.add_parser("build", help="precompute the gallery bundle")
+    build_parser.add_argument("--out", default=DEFAULT_BUNDLE_PATH)
+    build_parser.add_argument("--workers", type=int, default=4, help="concurrent model calls per task")
+    build_parser.add_argument("--task", action="append", dest="tasks", help="only build this task id (repeatable)")
+    args = parser.parse_args()
+    # Every bundle entry should be a fresh model answer, not a near-duplicate reuse
+    os.environ["CODEMENTOR_SIMILARITY"] = "off"
+    try:
+        build_bundle(args.out, args.workers, args.tasks)
+    except ValueError as exc:
+        parser.error(str(exc))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,317 @@
+"""
+Headless batch grading: run CodeMentor over a whole class's submissions.
+
+    python grade.py --task "Generate code that merges two sorted lists efficiently" \\
+        submissions/ --out results.jsonl --concurrency 8 --rpm 50
+
+Submissions are either a directory of .py files (the path without `.py` is
+the submission id) or a JSONL file with one {"id": ..., "code": ...} object
+per line, optionally with its own "task". Each submission gets the same
+skill assessment and review the app would give, using the shared
+prompts in mentor.py; Streamlit is never imported.
+
+- Up to `--concurrency` submissions are graded at once, and every model
+  request (assessments, reviews, repairs and continuations) first takes a
+  slot from one shared `--rpm` token bucket (the client's own retries on
+  429 still apply on top).
+- Byte-identical submissions (ignoring trailing whitespace) are graded once;
+  copies get the same result with `duplicate_of` set.
+- Finished submissions are appended to a checkpoint file next to the
+  output; rerunning the same command skips them and appends the rest.
+- Results stream to `--out` as they finish, as JSONL or CSV (by suffix).
+  Failures are reported on stderr only, so `--out` holds one row per graded
+  submission however many reruns it takes.
+- Assessments are added to the analytics store (see analytics.py) with the
+  submission id as the learner.
+
+Needs ANTHROPIC_API_KEY; ANTHROPIC_BASE_URL works for dry runs.
+"""
+
+import argparse
+import asyncio
+import csv
+import glob
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import analytics
+
+CSV_FIELDS = [
+    "id", "level", "code_works", "strengths", "growth_areas", "code_issues",
+    "review", "duplicate_of", "source", "seconds",
+]
+
+
+@dataclass
+class Submission:
+    id: str
+    task: str
+    code: str
+
+    @property
+    def key(self) -> str:
+        """Content key for deduplication: same task and code up to trailing whitespace."""
+        code = "\n".join(line.rstrip() for line in self.code.strip().splitlines())
+        return hashlib.sha256(f"{self.task.strip()}\0{code}".encode("utf-8")).hexdigest()[:24]
+
+
+class RateLimiter:
+    """Token bucket shared by every worker: `per_minute` calls a minute, bursts up to `burst`."""
+
+    def __init__(self, per_minute: float, burst: int = 1):
+        self.rate = per_minute / 60.0
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            # Going negative reserves a future slot, so waiters are served in order
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait:
+            await asyncio.sleep(wait)
+
+
+def load_submissions(source: str, task: Optional[str]) -> List[Submission]:
+    if os.path.isdir(source):
+        paths = sorted(glob.glob(os.path.join(source, "**", "*.py"), recursive=True))
+        submissions = []
+        for path in paths:
+            with open(path, encoding="utf-8") as f:
+                code = f.read()
+            submissions.append(Submission(os.path.relpath(path, source)[:-3], task or "", code))
+    else:
+        submissions = []
+        with open(source, encoding="utf-8") as f:
+            for number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                item = json.loads(line)
+                submissions.append(Submission(str(item.get("id", number)), item.get("task") or task or "", item["code"]))
+    missing = [s.id for s in submissions if not s.task]
+    if missing:
+        raise SystemExit(f"no task for {len(missing)} submission(s), e.g. {missing[0]}; pass --task")
+    return submissions
+
+
+class Grader:
+    """Grades submissions with bounded concurrency, dedup and checkpointing."""
+
+    def __init__(self, feedback_mode: str, concurrency: int, rpm: float, checkpoint: str, writer):
+        self.feedback_mode = feedback_mode
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.limiter = RateLimiter(rpm)
+        self.checkpoint_path = checkpoint
+        self.writer = writer
+        self.results: Dict[str, dict] = {}          # content key -> result
+        self.first_id: Dict[str, str] = {}          # content key -> id that was graded
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.done_ids = set()
+        self.graded = 0
+        self.failed = 0
+        self.gallery = None
+
+    def load_checkpoint(self):
+        if not os.path.exists(self.checkpoint_path):
+            return
+        with open(self.checkpoint_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    item = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # a line cut short by an interrupted run
+                self.done_ids.add(item["id"])
+                self.results.setdefault(item["key"], item["result"])
+                self.first_id.setdefault(item["key"], item["id"])
+
+    def wait_for_slot(self, loop: asyncio.AbstractEventLoop):
+        """Block a worker thread until the shared rate limiter grants a request (mentor.before_request)."""
+        asyncio.run_coroutine_threadsafe(self.limiter.acquire(), loop).result()
+
+    async def _call(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+
+    async def _grade(self, submission: Submission) -> dict:
+        from mentor import assess_skill_level, generate_pedagogical_review
+
+        attempt = self.gallery.lookup(submission.task, submission.code) if self.gallery else None
+        if attempt:
+            assessment = attempt["assessment"]
+            level = assessment.get("level", "intermediate")
+            review = attempt["reviews"].get(level, {}).get(self.feedback_mode)
+            if review:
+                return {"assessment": assessment, "review": review, "source": "gallery"}
+
+        assessment = await self._call(assess_skill_level, submission.code, submission.task)
+        review = await self._call(
+            generate_pedagogical_review, submission.task, submission.code,
+            assessment.get("level", "intermediate"), self.feedback_mode, assessment.get("code_works", False),
+        )
+        return {"assessment": assessment, "review": review, "source": "fallback" if assessment.get("fallback") else "model"}
+
+    async def process(self, submission: Submission):
+        key = submission.key
+        duplicate_of = None
+        started = time.perf_counter()
+        try:
+            if key in self.results:
+                result = self.results[key]
+                duplicate_of = self.first_id[key]
+            elif key in self._inflight:
+                duplicate_of = self.first_id[key]
+                result = await self._inflight[key]
+            else:
+                future = asyncio.get_running_loop().create_future()
+                self._inflight[key] = future
+                self.first_id[key] = submission.id
+                try:
+                    async with self.semaphore:
+                        result = await self._grade(submission)
+                except Exception as exc:
+                    future.set_exception(exc)
+                    future.exception()  # mark retrieved; duplicates re-raise it themselves
+                    raise
+                finally:
+                    del self._inflight[key]
+                self.results[key] = result
+                future.set_result(result)
+                self.graded += 1
+        except Exception as exc:
+            # Not checkpointed or written to --out, so the next run retries it
+            self.failed += 1
+            print(f"  failed {submission.id}: {type(exc).__name__}: {exc}", file=sys.stderr)
+            return
+
+        analytics.record_assessment(submission.task, submission.id, result["assessment"], self.feedback_mode)
+        # Output first: a crash in between repeats this row on resume instead of losing it
+        self.writer.write(row(submission, result, duplicate_of, time.perf_counter() - started))
+        with open(self.checkpoint_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"id": submission.id, "key": key, "result": result}) + "\n")
+        self.done_ids.add(submission.id)
+
+
+def row(submission: Submission, result: dict, duplicate_of: Optional[str], seconds: float) -> dict:
+    assessment = result.get("assessment", {})
+    return {
+        "id": submission.id,
+        "level": assessment.get("level"),
+        "code_works": assessment.get("code_works"),
+        "strengths": assessment.get("strengths", []),
+        "growth_areas": assessment.get("growth_areas", []),
+        "code_issues": assessment.get("code_issues", []),
+        "review": result.get("review"),
+        "duplicate_of": duplicate_of,
+        "source": result.get("source"),
+        "seconds": round(seconds, 3),
+    }
+
+
+class ResultWriter:
+    """Appends result rows to a JSONL or CSV file, flushing after each one."""
+
+    def __init__(self, path: str, append: bool):
+        self.csv = path.lower().endswith(".csv")
+        exists = append and os.path.exists(path) and os.path.getsize(path) > 0
+        self._file = open(path, "a" if append else "w", encoding="utf-8", newline="")
+        if self.csv:
+            self._csv = csv.DictWriter(self._file, fieldnames=CSV_FIELDS)
+            if not exists:
+                self._csv.writeheader()
+
+    def write(self, data: dict):
+        if self.csv:
+            self._csv.writerow({
+                name: " | ".join(value) if isinstance(value, list) else value
+                for name, value in data.items()
+            })
+        else:
+            self._file.write(json.dumps(data, ensure_ascii=False) + "\n")
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+async def run(args) -> int:
+    import gallery
+    import mentor
+    import similarity_index
+    import telemetry
+
+    submissions = load_submissions(args.submissions, args.task)
+    checkpoint = args.checkpoint or args.out + ".checkpoint.jsonl"
+    if args.restart and os.path.exists(checkpoint):
+        os.remove(checkpoint)
+    resuming = os.path.exists(checkpoint)
+
+    writer = ResultWriter(args.out, append=resuming)
+    grader = Grader(args.feedback_mode, args.concurrency, args.rpm, checkpoint, writer)
+    grader.load_checkpoint()
+    grader.gallery = gallery.load_bundle()
+    pending = [s for s in submissions if s.id not in grader.done_ids]
+    unique = len({s.key for s in pending} - set(grader.results))
+    print(f"{len(submissions)} submissions, {len(submissions) - len(pending)} already done, "
+          f"{len(pending)} to go ({unique} unique)", file=sys.stderr)
+
+    loop = asyncio.get_running_loop()
+    loop.set_default_executor(ThreadPoolExecutor(max_workers=args.concurrency))
+    mentor.before_request = lambda: grader.wait_for_slot(loop)
+    started = time.perf_counter()
+    tasks = [asyncio.create_task(grader.process(s)) for s in pending]
+    try:
+        for finished, task in enumerate(asyncio.as_completed(tasks), 1):
+            await task
+            if finished % args.progress_every == 0 or finished == len(tasks):
+                elapsed = time.perf_counter() - started
+                print(f"  {finished}/{len(tasks)}  {60 * finished / elapsed:.1f} submissions/min", file=sys.stderr)
+    finally:
+        mentor.before_request = None
+        writer.close()
+
+    elapsed = time.perf_counter() - started
+    done = len(pending) - grader.failed
+    cost = telemetry.REGISTRY.counter_value("codementor_llm_cost_usd_total")
+    print(f"\n{done} graded in {elapsed:.1f}s ({60 * done / elapsed if elapsed else 0:.1f} submissions/min), "
+          f"{grader.graded} unique, {grader.failed} failed, ~${cost:.2f}", file=sys.stderr)
+    reuse = similarity_index.stats()
+    if reuse and reuse["lookups"]:
+        print(f"similarity index: {reuse['hits']}/{reuse['lookups']} lookups reused ({reuse['hit_rate']:.0%}), "
+              f"{reuse['entries']} entries", file=sys.stderr)
+    print(f"results: {args.out}" + (f" (rerun to retry the {grader.failed} failures)" if grader.failed else ""),
+          file=sys.stderr)
+    return 1 if grader.failed else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("submissions", help="directory of .py files or a JSONL file")
+    parser.add_argument("--task", help="task description (required unless every JSONL row has one)")
+    parser.add_argument("--out", required=True, help="results file, .jsonl or .csv")
+    parser.add_argument("--feedback-mode", choices=("detailed", "concise"), default="detailed")
+    parser.add_argument("--concurrency", type=int, default=8, help="submissions graded at once")
+    parser.add_argument("--rpm", type=float, default=50.0, help="model requests per minute across all workers, including repairs and continuations")
+    parser.add_argument("--checkpoint", help="progress file (default: <out>.checkpoint.jsonl)")
+    parser.add_argument("--restart", action="store_true", help="ignore the checkpoint and start over")
+    parser.add_argument("--reuse-similar", action="store_true",
+                        help="let the same code submitted for a similar task share a review (see similarity_index.py)")
+    parser.add_argument("--progress-every", type=int, default=10)
+    args = parser.parse_args()
+    if not args.reuse_similar:
+        # Each student gets a review of their own code unless asked otherwise
+        os.environ["CODEMENTOR_SIMILARITY"] = "off"
+    sys.exit(asyncio.run(run(args)))
+
+
+if __name__ == "__main__":
+    main()
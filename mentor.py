@@ -0,0 +1,406 @@
+"""
+CodeMentor model calls - skill assessment, pedagogical reviews and starter code.
+
+Kept free of Streamlit so the same prompts can be used by the web app, the
+example-gallery build step and other offline tools.
+"""
+
+import json
+from types import SimpleNamespace
+from typing import Callable, Optional
+
+import budget
+import cassettes
+import code_metrics
+from assessment import ASSESSMENT_TOOL, FALLBACK_ASSESSMENT, PartialJSONParser, validate_assessment
+import similarity_index
+import telemetry
+
+MODEL = "claude-sonnet-4-20250514"
+REPAIR_MODEL = "claude-3-5-haiku-20241022"
+
+# Called before every API request (cassette replays excluded), including
+# repairs and continuations; grade.py uses it to hold all of its workers to
+# one requests-per-minute budget
+before_request: Optional[Callable[[], None]] = None
+
+telemetry.REGISTRY.describe(
+    "codementor_assessment_parse_total", "counter",
+    "Skill assessments by outcome: ok, repaired (fixed by the repair call) or failed (fallback shown).",
+)
+
+
+def get_client():
+    """Initialize Anthropic client.
+    
+    The SDK takes about a second to import, so it's loaded on the first
+    model call rather than when a session starts.
+    """
+    import anthropic
+    return anthropic.Anthropic()
+
+
+def call_model(call_type: str, prompt: str, max_tokens: int = None, feedback_mode: str = None,
+               skill_level: str = None, code: str = "") -> str:
+    """Send a single-turn prompt to the model and record telemetry for the call.
+    
+    `max_tokens` defaults to the budget for this call type, mode and level
+    (see budget.py); `code` is the submission the reply may restate. A reply
+    cut off at `max_tokens` is continued by prefilling it as the assistant
+    turn, up to `budget.MAX_CONTINUATIONS` times.
+    """
+    if max_tokens is None:
+        max_tokens = budget.max_tokens_for(call_type, feedback_mode, skill_level, code)
+    messages = [{"role": "user", "content": prompt}]
+    text, call = _send_message(call_type, messages, max_tokens, feedback_mode, skill_level)
+    output_tokens = call.output_tokens
+    
+    for _ in range(budget.MAX_CONTINUATIONS):
+        if call.stop_reason != "max_tokens":
+            break
+        telemetry.REGISTRY.inc("codementor_llm_continuations_total", {"call_type": call_type})
+        # The API rejects an assistant prefill that ends in whitespace
+        text = text.rstrip()
+        continued = messages + [{"role": "assistant", "content": text}]
+        more, call = _send_message(f"{call_type}_continue", continued, max_tokens, feedback_mode, skill_level)
+        text += more
+        output_tokens += call.output_tokens
+    
+    budget.record_output(call_type, feedback_mode, skill_level, output_tokens, code)
+    return text
+
+
+def _send_message(call_type: str, messages: list, max_tokens: int, feedback_mode: str = None, skill_level: str = None):
+    """One API call, as (text, CallRecord).
+    
+    The response is streamed so the call records its time to first token.
+    When a cassette is active (see cassettes.py) the call is recorded to it,
+    or served from it without touching the API.
+    """
+    request = {
+        "model": MODEL,
+        "max_tokens": max_tokens,
+        "messages": messages
+    }
+    cassette = cassettes.active_cassette()
+    _wait_for_slot(cassette)
+    
+    with telemetry.track_call(call_type, MODEL, feedback_mode=feedback_mode, skill_level=skill_level) as call:
+        if cassette is not None and cassette.mode == "replay":
+            interaction = cassette.replay(call_type, request)
+            call.set_usage(SimpleNamespace(**interaction.usage), interaction.stop_reason)
+            text = interaction.text
+        else:
+            raw = get_client().messages.with_raw_response.create(**request, stream=True)
+            call.retries = raw.retries_taken
+            fragments, usage, stop_reason = [], SimpleNamespace(), None
+            for event in raw.parse():
+                if event.type == "message_start":
+                    usage = SimpleNamespace(**event.message.usage.model_dump())
+                elif event.type == "content_block_delta" and event.delta.type == "text_delta":
+                    call.mark_first_token()
+                    fragments.append(event.delta.text)
+                elif event.type == "message_delta":
+                    usage.output_tokens = event.usage.output_tokens
+                    stop_reason = event.delta.stop_reason
+            call.set_usage(usage, stop_reason)
+            text = "".join(fragments)
+    
+    if cassette is not None and cassette.mode == "record":
+        _record(cassette, call_type, request, text, call)
+    return text, call
+
+
+def call_tool(call_type: str, prompt: str, tool: dict, max_tokens: int, model: str = MODEL,
+              on_delta: Optional[Callable[[str], None]] = None) -> str:
+    """Force a call to `tool` and return its input as the raw JSON text the model produced.
+    
+    The response is streamed; `on_delta` receives each `input_json_delta`
+    fragment as it arrives. Cassettes store the JSON text, and replay hands
+    it to `on_delta` in one piece.
+    """
+    request = {
+        "model": model,
+        "max_tokens": max_tokens,
+        "tools": [tool],
+        "tool_choice": {"type": "tool", "name": tool["name"]},
+        "messages": [{"role": "user", "content": prompt}]
+    }
+    cassette = cassettes.active_cassette()
+    _wait_for_slot(cassette)
+    
+    with telemetry.track_call(call_type, model) as call:
+        if cassette is not None and cassette.mode == "replay":
+            interaction = cassette.replay(call_type, request)
+            call.set_usage(SimpleNamespace(**interaction.usage), interaction.stop_reason)
+            if on_delta:
+                on_delta(interaction.text)
+            return interaction.text
+        
+        raw = get_client().messages.with_raw_response.create(**request, stream=True)
+        call.retries = raw.retries_taken
+        fragments, usage, stop_reason = [], SimpleNamespace(), None
+        for event in raw.parse():
+            if event.type == "message_start":
+                usage = SimpleNamespace(**event.message.usage.model_dump())
+            elif event.type == "content_block_delta" and event.delta.type == "input_json_delta":
+                call.mark_first_token()
+                fragments.append(event.delta.partial_json)
+                if on_delta:
+                    on_delta(event.delta.partial_json)
+            elif event.type == "message_delta":
+                usage.output_tokens = event.usage.output_tokens
+                stop_reason = event.delta.stop_reason
+        call.set_usage(usage, stop_reason)
+    
+    text = "".join(fragments)
+    if cassette is not None and cassette.mode == "record":
+        _record(cassette, call_type, request, text, call)
+    if call.stop_reason != "max_tokens":
+        budget.record_output(call_type, None, None, call.output_tokens)
+    return text
+
+
+def _wait_for_slot(cassette):
+    """Run the `before_request` hook unless the call is served from a cassette."""
+    if before_request is not None and not (cassette is not None and cassette.mode == "replay"):
+        before_request()
+
+
+def _record(cassette, call_type: str, request: dict, text: str, call):
+    cassette.record(cassettes.Interaction(
+        call_type=call_type,
+        request=request,
+        text=text,
+        stop_reason=call.stop_reason,
+        usage={
+            "input_tokens": call.input_tokens,
+            "output_tokens": call.output_tokens,
+            "cache_creation_input_tokens": call.cache_creation_input_tokens,
+            "cache_read_input_tokens": call.cache_read_input_tokens,
+        },
+        latency=call.latency_seconds,
+        ttft=call.ttft_seconds,
+    ))
+
+
+def assess_skill_level(user_code: str, task_description: str,
+                       on_update: Optional[Callable[[dict], None]] = None) -> dict:
+    """Assess the user's coding skill level based on their attempt.
+    
+    The assessment comes back as a forced `record_assessment` tool call.
+    `on_update` is called with the fields completed so far each time another
+    one arrives. Output that doesn't parse or violates the schema gets one
+    repair attempt on the cheaper model before falling back to a neutral
+    assessment.
+    """
+    prompt = f"""Analyze this code attempt and assess the programmer's skill level.
+
+Task Description: {task_description}
+
+User's Code Attempt:
+```python
+{budget.fit_code(user_code)}
+```
+
+Record your assessment with the record_assessment tool:
+1. "level": one of "beginner", "intermediate", or "advanced"
+2. "code_works": boolean - true if the code would work correctly for the task (may have minor issues but fundamentally solves it), false if it has bugs or wouldn't work
+3. "strengths": list of 2-3 things they did well (even if basic)
+4. "growth_areas": list of 2-3 specific areas for improvement
+5. "code_issues": if code_works is false, list 1-3 specific issues that would prevent it from working
+6. "indicators": list of 3-5 specific observations that informed your assessment
+
+Consider:
+- Code structure and organization
+- Use of Python idioms and conventions
+- Error handling awareness
+- Efficiency considerations
+- Naming conventions and readability"""
+
+    parser = PartialJSONParser()
+    shown = {}
+    
+    def on_delta(fragment: str):
+        nonlocal shown
+        parser.feed(fragment)
+        partial = parser.snapshot()
+        if on_update and partial and partial != shown:
+            shown = partial
+            on_update(partial)
+    
+    text = call_tool("assess", prompt, ASSESSMENT_TOOL, max_tokens=budget.max_tokens_for("assess"), on_delta=on_delta)
+    assessment, problems = _parse_assessment(text)
+    outcome = "ok"
+    if problems:
+        assessment, problems = _repair_assessment(text, problems)
+        outcome = "failed" if problems else "repaired"
+    telemetry.REGISTRY.inc("codementor_assessment_parse_total", {"result": outcome})
+    if outcome == "failed":
+        return dict(FALLBACK_ASSESSMENT)
+    return assessment
+
+
+def _parse_assessment(text: str):
+    """(assessment, schema problems) for the tool input the model produced."""
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError as exc:
+        return None, [f"invalid JSON: {exc}"]
+    return data, validate_assessment(data)
+
+
+def _repair_assessment(text: str, problems: list):
+    """One cheap retry: ask the small model to fix the broken assessment, not to redo it."""
+    prompt = f"""Repair this skill assessment so it satisfies the record_assessment tool schema.
+
+Keep every judgement it makes; only fix the structure.
+
+Problems found:
+{chr(10).join(f"- {problem}" for problem in problems)}
+
+Broken assessment:
+{text or "(empty)"}"""
+    
+    import anthropic
+    try:
+        repaired = call_tool("assess_repair", prompt, ASSESSMENT_TOOL, max_tokens=600, model=REPAIR_MODEL)
+    except anthropic.APIError as exc:
+        return None, [f"repair call failed: {exc}"]
+    return _parse_assessment(repaired)
+
+
+def generate_pedagogical_review(task_description: str, user_code: str, skill_level: str, feedback_mode: str, code_works: bool) -> str:
+    """Generate a comprehensive pedagogical code review.
+    
+    A stored review for the same code (up to comments and formatting) and a
+    similar task, at the same level and mode, is reused instead of calling
+    the model.
+    """
+    scope = f"{skill_level}|{feedback_mode}|{bool(code_works)}"
+    match = similarity_index.lookup("review", task_description, code=user_code, scope=scope)
+    if match:
+        return match.payload
+    
+    code = budget.fit_code(user_code)
+    metrics = code_metrics.prompt_summary(code_metrics.analyze(user_code))
+    if feedback_mode == "concise":
+        prompt = f"""You are CodeMentor, an expert programming educator. A {skill_level}-level programmer has asked you to help them understand code generation.
+
+Their request: "{task_description}"
+
+Their attempt:
+```python
+{code}
+```
+
+{"Their code works correctly! Start with congratulations." if code_works else "Their code has issues that need fixing."}
+
+Static analysis of their code (already measured - rely on these rather than re-deriving them):
+{metrics}
+
+Provide a CONCISE code review with:
+
+1. **{"🎉 CONGRATULATIONS" if code_works else "QUICK ASSESSMENT"}** (1-2 sentences)
+   {"Congratulate them - their code works! Note it can still be improved." if code_works else "Briefly note the main issue."}
+
+2. **IMPROVED SOLUTION**
+   Provide a clean, improved Python solution with brief inline comments.
+
+3. **LINE-BY-LINE FIXES** (bullet points, max 5)
+   For each issue or improvement:
+   - `their code` → `improved code`: One sentence explanation
+   
+   Focus on the most important changes. Be direct and brief.
+
+4. **KEY TAKEAWAY** (1 sentence)
+   The single most important lesson from this review.
+
+Keep the entire response under 400 words. Be direct, no fluff."""
+
+    else:  # detailed mode
+        prompt = f"""You are CodeMentor, an expert programming educator. A {skill_level}-level programmer has asked you to help them understand code generation.
+
+Their request: "{task_description}"
+
+Their attempt:
+```python
+{code}
+```
+
+{"Their code works correctly! Start with congratulations before suggesting improvements." if code_works else "Their code has issues that need fixing."}
+
+Static analysis of their code (already measured - rely on these rather than re-deriving them, and ground the Readability vs Performance scores in them):
+{metrics}
+
+Provide a comprehensive, educational response that:
+
+1. **{"🎉 CONGRATULATIONS!" if code_works else "ACKNOWLEDGE THEIR EFFORT"}** (2-3 sentences)
+   {"Congratulate them warmly - their code works! Then mention you'll show some refinements." if code_works else "Recognize what they tried to do and point out something specific they did reasonably well."}
+
+2. **IMPROVED SOLUTION**
+   - Provide a well-crafted Python solution
+   - Include helpful comments explaining key decisions
+   - Match complexity to their {skill_level} level
+
+3. **LINE-BY-LINE LEARNING** (for 3-5 key improvements)
+   For each improvement, explain:
+   - WHAT changed (be specific about the code)
+   - WHY it's better (the reasoning)
+   - THE TRADEOFF between readability and performance
+   
+   Use this format for each:
+   
+   **Improvement: [Name of the improvement]**
+   
+   *Your code:* `[their specific code snippet]`
+   
+   *Improved:* `[the improved version]`
+   
+   *Why this is better:*
+   [Explanation tailored to their level]
+   
+   *Readability vs Performance:*
+   - 📖 Readability: [Score 1-5 stars] - [Brief explanation]
+   - ⚡ Performance: [Score 1-5 stars] - [Brief explanation]
+   - 🎯 Recommendation: [Which to prioritize for this case and why]
+
+4. **PYTHONIC PATTERNS LEARNED**
+   List 2-3 Python idioms or patterns demonstrated, with simple explanations
+
+5. **NEXT CHALLENGE**
+   Suggest one way they could extend or improve this code to practice further
+
+Tailor your language to a {skill_level} programmer:
+- Beginner: Use analogies, avoid jargon, be encouraging
+- Intermediate: Balance explanation with efficiency, introduce best practices
+- Advanced: Focus on nuances, edge cases, and optimization strategies
+
+Be warm, encouraging, and genuinely helpful. Use emojis sparingly for visual breaks."""
+
+    review = call_model("review", prompt, feedback_mode=feedback_mode, skill_level=skill_level, code=code)
+    similarity_index.remember("review", task_description, review, code=user_code, scope=scope)
+    return review
+
+
+def generate_starter_code(task_description: str) -> str:
+    """Generate a basic starter template based on the task (reused for similar tasks)."""
+    match = similarity_index.lookup("starter", task_description)
+    if match:
+        return match.payload
+    
+    prompt = f"""Given this coding task: "{task_description}"
+
+Generate a minimal Python code SKELETON that:
+1. Has the basic structure (function definition, main variables)
+2. Includes TODO comments showing what needs to be implemented
+3. Is intentionally incomplete - the user needs to fill in the logic
+4. Uses descriptive placeholder variable names
+
+The goal is to give them a starting point without solving it for them.
+
+Return ONLY the code, no explanations. Keep it under 15 lines."""
+
+    starter = call_model("starter", prompt)
+    similarity_index.remember("starter", task_description, starter)
+    return starter
@@ -0,0 +1,219 @@
+"""
+Structured parsing of CodeMentor reviews.
+
+The review prompts ask the model for a fixed outline (congratulations or
+assessment, improved solution, line-by-line improvements with 📖/⚡/🎯
+ratings, patterns, next challenge or key takeaway). `parse_review` turns the
+markdown into a `ParsedReview` once, when the review arrives, so the UI can
+render each part separately and later features can read the improved code
+and ratings without parsing the text again.
+
+Parsing is best-effort: anything that does not match the outline stays in
+the raw text, and `ParsedReview.sections` is empty when nothing matched.
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+
+# Section kinds in the order the prompts ask for them, with the heading
+# keywords that identify each one.
+SECTION_KEYWORDS = [
+    ("intro", ("CONGRATULATION", "ACKNOWLEDGE", "QUICK ASSESSMENT")),
+    ("solution", ("IMPROVED SOLUTION",)),
+    ("improvements", ("LINE-BY-LINE", "LINE BY LINE", "KEY IMPROVEMENTS")),
+    ("patterns", ("PYTHONIC PATTERN", "PATTERNS LEARNED")),
+    ("next_challenge", ("NEXT CHALLENGE",)),
+    ("takeaway", ("KEY TAKEAWAY",)),
+]
+
+_HEADING = re.compile(
+    r"^\s*(?:#{1,6}\s+)?(?:\d+[.)]\s*)?\*\*(?P<bold>.+?)\*\*(?P<rest>.*)$"
+    r"|^\s*#{1,6}\s+(?:\d+[.)]\s*)?(?P<plain>.+?)\s*$"
+)
+_IMPROVEMENT_HEADING = re.compile(
+    r"^\s*(?:#{1,6}\s*)?(?:\d+[.)]\s*)?\*{0,2}\s*Improvement\s*\d*\s*[:\-–—]\s*(?P<title>.+?)\s*\*{0,2}\s*$",
+    re.IGNORECASE,
+)
+_ARROW_BULLET = re.compile(r"^\s*[-*]\s+(?P<before>`[^`]*`)\s*(?:→|->)\s*(?P<after>`[^`]*`)\s*:?\s*(?P<why>.*)$")
+_CODE_BLOCK = re.compile(r"```[\w+-]*\n(?P<code>.*?)```", re.DOTALL)
+_YOUR_CODE = re.compile(r"\*Your code:?\*:?\s*`(?P<code>[^`]*)`", re.IGNORECASE)
+_IMPROVED = re.compile(r"\*Improved:?\*:?\s*`(?P<code>[^`]*)`", re.IGNORECASE)
+_RATING_LINE = re.compile(r"^\s*[-*]?\s*(?P<icon>📖|⚡|🎯)\s*\**\s*(?:Readability|Performance|Recommendation)\s*\**\s*:?\s*(?P<rest>.*)$")
+
+
+@dataclass
+class Rating:
+    """A 📖 or ⚡ rating: 1-5 stars (None if the model gave no number) and its note."""
+    stars: Optional[int]
+    note: str
+
+
+@dataclass
+class Improvement:
+    title: str
+    body: str
+    your_code: str = ""
+    improved_code: str = ""
+    readability: Optional[Rating] = None
+    performance: Optional[Rating] = None
+    recommendation: str = ""
+
+
+@dataclass
+class Section:
+    kind: str
+    title: str
+    body: str
+
+
+@dataclass
+class ParsedReview:
+    raw: str
+    sections: List[Section] = field(default_factory=list)
+    improvements: List[Improvement] = field(default_factory=list)
+    improved_code: str = ""
+
+    def section(self, kind: str) -> Optional[Section]:
+        """First section of the given kind, if the review has one."""
+        for section in self.sections:
+            if section.kind == kind:
+                return section
+        return None
+
+
+def parse_review(text: str) -> ParsedReview:
+    """Split a review into its outline sections and per-improvement blocks."""
+    parsed = ParsedReview(raw=text)
+    sections = _split_sections(text)
+    if not any(section.kind != "other" for section in sections):
+        return parsed
+    parsed.sections = sections
+
+    solution = parsed.section("solution")
+    blocks = _CODE_BLOCK.findall(solution.body if solution else "") or _CODE_BLOCK.findall(text)
+    if blocks:
+        parsed.improved_code = blocks[0].rstrip()
+
+    improvements = parsed.section("improvements")
+    if improvements:
+        parsed.improvements = _parse_improvements(improvements.body)
+    return parsed
+
+
+def _classify(heading: str) -> Optional[str]:
+    upper = heading.upper()
+    for kind, keywords in SECTION_KEYWORDS:
+        if any(keyword in upper for keyword in keywords):
+            return kind
+    return None
+
+
+def _clean_title(heading: str) -> str:
+    title = re.sub(r"\s*\([^)]*\)\s*$", "", heading.strip())
+    title = title.strip("*#: ").rstrip(":")
+    if title.isupper():
+        title = re.sub(r"[^\W\d_]", lambda m: m.group(0).upper(), title.lower(), count=1)
+    return title
+
+
+def _heading_rest(match) -> str:
+    """Text after a bold heading on the same line, e.g. the answer in `**KEY TAKEAWAY**: ...`."""
+    rest = (match.group("rest") or "").strip()
+    rest = re.sub(r"^[:\-–—]+\s*", "", rest)
+    return "" if re.fullmatch(r"\([^)]*\)", rest) else rest
+
+
+def _split_sections(text: str) -> List[Section]:
+    sections = []
+    kind, title, body = "other", "", []
+    in_code = False
+
+    for line in text.splitlines():
+        if line.lstrip().startswith("```"):
+            in_code = not in_code
+        match = None if in_code else _HEADING.match(line)
+        heading = match and (match.group("bold") or match.group("plain"))
+        # "**Improvement 1: Use Pythonic patterns**" belongs to the improvements block
+        if heading and kind == "improvements" and _IMPROVEMENT_HEADING.match(line):
+            heading = None
+        new_kind = _classify(heading) if heading else None
+        if new_kind:
+            if title or "".join(body).strip():
+                sections.append(Section(kind, title, "\n".join(body).strip()))
+            kind, title, body = new_kind, _clean_title(heading), []
+            rest = _heading_rest(match)
+            if rest:
+                body.append(rest)
+        else:
+            body.append(line)
+
+    if title or "".join(body).strip():
+        sections.append(Section(kind, title, "\n".join(body).strip()))
+    return sections
+
+
+def _parse_improvements(body: str) -> List[Improvement]:
+    improvements = []
+    current_title, current_lines = None, []
+
+    def flush():
+        if current_title is not None:
+            improvements.append(_build_improvement(current_title, "\n".join(current_lines).strip()))
+
+    for line in body.splitlines():
+        heading = _IMPROVEMENT_HEADING.match(line)
+        if heading:
+            flush()
+            current_title, current_lines = heading.group("title").strip("*[] "), []
+        elif current_title is not None:
+            current_lines.append(line)
+    flush()
+
+    if improvements:
+        return improvements
+
+    # Concise reviews list fixes as "- `their code` → `improved code`: why"
+    for line in body.splitlines():
+        bullet = _ARROW_BULLET.match(line)
+        if bullet:
+            improvements.append(Improvement(
+                title=bullet.group("why").strip() or bullet.group("after").strip("`"),
+                body=line.strip().lstrip("-* "),
+                your_code=bullet.group("before").strip("`"),
+                improved_code=bullet.group("after").strip("`"),
+            ))
+    return improvements
+
+
+def _build_improvement(title: str, body: str) -> Improvement:
+    improvement = Improvement(title=title, body=body)
+    your_code = _YOUR_CODE.search(body)
+    if your_code:
+        improvement.your_code = your_code.group("code")
+    improved = _IMPROVED.search(body)
+    if improved:
+        improvement.improved_code = improved.group("code")
+
+    for line in body.splitlines():
+        rating = _RATING_LINE.match(line)
+        if not rating:
+            continue
+        icon, rest = rating.group("icon"), rating.group("rest").strip()
+        if icon == "🎯":
+            improvement.recommendation = rest
+        elif icon == "📖":
+            improvement.readability = _parse_rating(rest)
+        else:
+            improvement.performance = _parse_rating(rest)
+    return improvement
+
+
+def _parse_rating(text: str) -> Rating:
+    stars = text.count("⭐") + text.count("★")
+    if not stars:
+        number = re.search(r"\b([1-5])\s*(?:/\s*5|stars?\b)", text)
+        stars = int(number.group(1)) if number else None
+    note = re.split(r"\s+[-–—]\s+", text, maxsplit=1)
+    return Rating(stars=stars, note=note[1].strip() if len(note) > 1 else text)
@@ -0,0 +1,309 @@
+"""
+Near-duplicate index for reusing starter templates and reviews across users.
+
+Task descriptions are rarely byte-identical ("merge two sorted lists" vs
+"merge 2 sorted lists efficiently"), so exact-key caching misses most
+reuse. This index keeps MinHash signatures of normalized task descriptions
+(word shingles), with LSH buckets over them, so a lookup only compares
+against a handful of candidates. Task descriptions are short, so each entry
+also keeps its shingles and candidates are scored on their exact Jaccard
+similarity; with 64 slots the MinHash estimate of a 0.8 pair is off by about
+0.05, which is enough to flip a pair across the threshold.
+
+Reviews quote the learner's own names and literals, so a review is only
+reused for the same code: entries with a submission are keyed on a digest of
+its tokens (comments and formatting ignored, identifiers and literals kept)
+and only the task side is fuzzy.
+
+The index lives in memory, is shared by every session in the process and is
+snapshotted to disk at most every `snapshot_interval` seconds when it has
+changed. Configuration:
+
+    CODEMENTOR_SIMILARITY=off                     disable reuse entirely
+    CODEMENTOR_SIMILARITY_INDEX=./similarity.json snapshot file (memory only if unset)
+    CODEMENTOR_TASK_SIMILARITY_THRESHOLD=0.8      min task similarity for reuse
+"""
+
+import atexit
+import hashlib
+import io
+import json
+import os
+import random
+import re
+import threading
+import time
+import tokenize
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import telemetry
+
+SNAPSHOT_VERSION = 3
+_PRIME = (1 << 61) - 1
+_MASK64 = (1 << 64) - 1
+_MAX_HASH = _PRIME
+
+_STOPWORDS = frozenset("""
+a an and the that to of in on for with from by using use into as is are be it its
+write generate create implement make code program python function script some which
+""".split())
+_NUMBER_WORDS = {
+    "0": "zero", "1": "one", "2": "two", "3": "three", "4": "four", "5": "five",
+    "6": "six", "7": "seven", "8": "eight", "9": "nine", "10": "ten",
+}
+
+telemetry.REGISTRY.describe("codementor_similarity_lookups_total", "counter", "Similarity-index lookups by kind and result.")
+telemetry.REGISTRY.describe("codementor_similarity_score", "histogram", "Best candidate similarity per lookup.")
+_SCORE_BUCKETS = (0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.85, 0.9, 0.95, 1.0)
+
+
+def task_shingles(text: str) -> set:
+    """Normalized content words of a task description."""
+    words = []
+    for word in re.findall(r"[a-z0-9]+", text.lower()):
+        word = _NUMBER_WORDS.get(word, word)
+        if word in _STOPWORDS:
+            continue
+        if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        words.append(word)
+    return set(words)
+
+
+def jaccard(left, right) -> float:
+    """Exact Jaccard similarity of two shingle sets."""
+    left, right = set(left), set(right)
+    if not left and not right:
+        return 1.0
+    return len(left & right) / len(left | right)
+
+
+def code_key(code: str) -> str:
+    """Digest of the code's tokens: comments and formatting ignored, names and literals kept."""
+    tokens = []
+    try:
+        for token in tokenize.generate_tokens(io.StringIO(code).readline):
+            if token.type in (tokenize.COMMENT, tokenize.NL, tokenize.NEWLINE, tokenize.ENDMARKER):
+                continue
+            if token.type == tokenize.INDENT:
+                tokens.append("INDENT")
+            elif token.type == tokenize.DEDENT:
+                tokens.append("DEDENT")
+            else:
+                tokens.append(token.string)
+    except (tokenize.TokenError, IndentationError, SyntaxError):
+        tokens = code.split()
+    return hashlib.sha256("\0".join(tokens).encode("utf-8")).hexdigest()[:32]
+
+
+@dataclass
+class Match:
+    kind: str
+    score: float
+    payload: object
+
+
+@dataclass
+class _Entry:
+    kind: str
+    scope: str
+    task_signature: List[int]
+    task_shingles: List[str]
+    code_key: Optional[str]
+    payload: object
+    created: float
+
+
+class SimilarityIndex:
+    """MinHash signatures with LSH banding, keyed by entry kind, scope and code."""
+
+    def __init__(self, num_perm: int = 64, bands: int = 16, path: Optional[str] = None,
+                 task_threshold: float = 0.8, snapshot_interval: float = 60.0):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.path = path
+        self.task_threshold = task_threshold
+        self.snapshot_interval = snapshot_interval
+
+        rng = random.Random(0x5EED)  # fixed, so snapshots stay valid across restarts
+        self._perms = [(rng.randrange(1, _PRIME), rng.randrange(0, _PRIME)) for _ in range(num_perm)]
+        # numpy is imported here rather than at module load to keep it off the
+        # session start path; it ships with Streamlit, and the pure-Python
+        # path gives identical signatures without it
+        try:
+            import numpy as np
+        except ImportError:
+            np = None
+        self._np = np
+        if np is not None:
+            self._perm_a = np.array([a for a, _ in self._perms], dtype=np.uint64)
+            self._perm_b = np.array([b for _, b in self._perms], dtype=np.uint64)
+        self._entries: List[_Entry] = []
+        self._buckets: Dict[tuple, List[int]] = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._last_snapshot = time.monotonic()
+        self.lookups = 0
+        self.hits = 0
+
+        if path and os.path.exists(path):
+            self._load(path)
+
+    # Signatures -------------------------------------------------------------
+
+    def signature(self, shingles: set) -> List[int]:
+        """MinHash signature: per permutation, min of ((a*h + b) mod 2^64) mod P over 32-bit shingle hashes."""
+        if not shingles:
+            return [_MAX_HASH] * self.num_perm
+        hashes = [int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=4).digest(), "big") for s in shingles]
+        np = self._np
+        if np is not None:
+            # uint64 arithmetic wraps mod 2^64, matching the masked pure-Python form
+            values = np.array(hashes, dtype=np.uint64)
+            return ((np.outer(values, self._perm_a) + self._perm_b) % np.uint64(_PRIME)).min(axis=0).tolist()
+        return [min(((a * h + b) & _MASK64) % _PRIME for h in hashes) for a, b in self._perms]
+
+    @staticmethod
+    def similarity(left: List[int], right: List[int]) -> float:
+        """Estimated Jaccard similarity: the fraction of agreeing MinHash slots (used for bucketing only)."""
+        return sum(1 for x, y in zip(left, right) if x == y) / len(left)
+
+    def _band_keys(self, kind: str, scope: str, code: Optional[str], signature: List[int]):
+        for band in range(self.bands):
+            yield kind, scope, code, band, hash(tuple(signature[band * self.rows:(band + 1) * self.rows]))
+
+    # Public API -------------------------------------------------------------
+
+    def add(self, kind: str, task: str, payload, code: Optional[str] = None, scope: str = ""):
+        """Store a result for a task (and optionally a submission)."""
+        shingles = task_shingles(task)
+        entry = _Entry(kind, scope, self.signature(shingles), sorted(shingles),
+                       code_key(code) if code is not None else None, payload, time.time())
+        with self._lock:
+            self._insert(entry)
+            self._dirty = True
+        self.maybe_snapshot()
+
+    def query(self, kind: str, task: str, code: Optional[str] = None, scope: str = "") -> Optional[Match]:
+        """Best stored result above the task threshold, or None.
+
+        With `code`, only entries stored for the same code (see `code_key`)
+        are candidates; the score is the exact Jaccard similarity of the tasks.
+        """
+        shingles = task_shingles(task)
+        task_signature = self.signature(shingles)
+        key = code_key(code) if code is not None else None
+
+        best, best_score = None, 0.0
+        with self._lock:
+            candidates = set()
+            for band_key in self._band_keys(kind, scope, key, task_signature):
+                candidates.update(self._buckets.get(band_key, ()))
+            for index in candidates:
+                entry = self._entries[index]
+                score = jaccard(shingles, entry.task_shingles)
+                if score >= self.task_threshold and score > best_score:
+                    best, best_score = entry, score
+            self.lookups += 1
+            if best is not None:
+                self.hits += 1
+
+        telemetry.REGISTRY.inc("codementor_similarity_lookups_total", {"kind": kind, "result": "hit" if best else "miss"})
+        telemetry.REGISTRY.observe("codementor_similarity_score", {"kind": kind}, best_score, _SCORE_BUCKETS)
+        if best is None:
+            return None
+        return Match(kind, round(best_score, 3), best.payload)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "lookups": self.lookups,
+                "hits": self.hits,
+                "hit_rate": round(self.hits / self.lookups, 3) if self.lookups else 0.0,
+            }
+
+    # Persistence ------------------------------------------------------------
+
+    def _insert(self, entry: _Entry):
+        index = len(self._entries)
+        self._entries.append(entry)
+        for key in self._band_keys(entry.kind, entry.scope, entry.code_key, entry.task_signature):
+            self._buckets.setdefault(key, []).append(index)
+
+    def maybe_snapshot(self, force: bool = False):
+        """Write the index to disk if it changed and the snapshot interval has passed."""
+        if not self.path:
+            return
+        with self._lock:
+            due = force or time.monotonic() - self._last_snapshot >= self.snapshot_interval
+            if not (self._dirty and due):
+                return
+            data = {
+                "version": SNAPSHOT_VERSION,
+                "num_perm": self.num_perm,
+                "entries": [entry.__dict__ for entry in self._entries],
+            }
+            self._dirty = False
+            self._last_snapshot = time.monotonic()
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp_path, self.path)
+
+    def _load(self, path: str):
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != SNAPSHOT_VERSION or data.get("num_perm") != self.num_perm:
+            return
+        for item in data["entries"]:
+            self._insert(_Entry(**item))
+
+
+_index = None
+_index_lock = threading.Lock()
+_last_match = threading.local()
+
+
+def get_index() -> Optional[SimilarityIndex]:
+    """The process-wide index configured from the environment (None when disabled)."""
+    global _index
+    if os.environ.get("CODEMENTOR_SIMILARITY", "on").lower() in ("off", "0", "false"):
+        return None
+    with _index_lock:
+        if _index is None:
+            _index = SimilarityIndex(
+                path=os.environ.get("CODEMENTOR_SIMILARITY_INDEX") or None,
+                task_threshold=float(os.environ.get("CODEMENTOR_TASK_SIMILARITY_THRESHOLD", "0.8")),
+            )
+            atexit.register(_index.maybe_snapshot, True)
+        return _index
+
+
+def lookup(kind: str, task: str, code: Optional[str] = None, scope: str = "") -> Optional[Match]:
+    """Query the shared index and remember the result for `last_match()` on this thread."""
+    index = get_index()
+    match = index.query(kind, task, code, scope) if index else None
+    _last_match.value = match
+    return match
+
+
+def remember(kind: str, task: str, payload, code: Optional[str] = None, scope: str = ""):
+    index = get_index()
+    if index:
+        index.add(kind, task, payload, code, scope)
+
+
+def stats() -> Optional[dict]:
+    """Entry count and hit rate of the shared index (None when disabled)."""
+    index = get_index()
+    return index.stats() if index else None
+
+
+def last_match() -> Optional[Match]:
+    """The result of this thread's most recent `lookup` (None on a miss)."""
+    return getattr(_last_match, "value", None)
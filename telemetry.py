@@ -0,0 +1,333 @@
+"""
+CodeMentor telemetry - latency, token usage and cost for every model call.
+
+Each call to the model is wrapped in `track_call`, which times it, collects
+the usage block from the response and folds the result into in-process
+counters and histograms. The aggregates can be exported two ways:
+
+- `render_prometheus()` / `start_metrics_server(port)` for a Prometheus-style
+  text endpoint
+- a rotating JSONL log with one line per call (`configure_jsonl(directory)`)
+
+Both exporters are switched on from the environment by `configure_from_env()`:
+
+    CODEMENTOR_METRICS_PORT=9464        serve /metrics on this port
+    CODEMENTOR_TELEMETRY_DIR=./telemetry write calls.jsonl (rotated) here
+"""
+
+import json
+import logging
+import logging.handlers
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+
+# USD per million tokens: (input, output, cache write, cache read)
+MODEL_PRICING = {
+    "claude-sonnet-4-20250514": (3.00, 15.00, 3.75, 0.30),
+    "claude-3-5-haiku-20241022": (0.80, 4.00, 1.00, 0.08),
+}
+
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 40.0, 80.0)
+TOKEN_BUCKETS = (50, 100, 250, 500, 1000, 2000, 4000, 8000, 16000)
+
+
+@dataclass
+class CallRecord:
+    """Everything we know about a single model call."""
+    call_type: str
+    model: str
+    feedback_mode: Optional[str] = None
+    skill_level: Optional[str] = None
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cache_creation_input_tokens: int = 0
+    cache_read_input_tokens: int = 0
+    ttft_seconds: Optional[float] = None
+    latency_seconds: float = 0.0
+    retries: int = 0
+    stop_reason: Optional[str] = None
+    error: Optional[str] = None
+    timestamp: float = field(default_factory=time.time)
+    _started: float = field(default_factory=time.perf_counter, repr=False)
+
+    def set_usage(self, usage, stop_reason: Optional[str] = None):
+        """Copy token counts from an API `usage` object."""
+        self.input_tokens = getattr(usage, "input_tokens", 0) or 0
+        self.output_tokens = getattr(usage, "output_tokens", 0) or 0
+        self.cache_creation_input_tokens = getattr(usage, "cache_creation_input_tokens", 0) or 0
+        self.cache_read_input_tokens = getattr(usage, "cache_read_input_tokens", 0) or 0
+        if stop_reason is not None:
+            self.stop_reason = stop_reason
+
+    def mark_first_token(self):
+        """Record time-to-first-token; only the first call counts."""
+        if self.ttft_seconds is None:
+            self.ttft_seconds = time.perf_counter() - self._started
+
+    @property
+    def cost_usd(self) -> float:
+        prices = MODEL_PRICING.get(self.model)
+        if prices is None:
+            return 0.0
+        input_price, output_price, cache_write_price, cache_read_price = prices
+        return (
+            self.input_tokens * input_price
+            + self.output_tokens * output_price
+            + self.cache_creation_input_tokens * cache_write_price
+            + self.cache_read_input_tokens * cache_read_price
+        ) / 1_000_000
+
+    def to_dict(self) -> dict:
+        data = asdict(self)
+        data.pop("_started")
+        data["cost_usd"] = round(self.cost_usd, 6)
+        return data
+
+
+class _Histogram:
+    __slots__ = ("buckets", "counts", "total", "count")
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.total += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    """Thread-safe counters and histograms keyed by metric name and labels."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._help = {}
+        self._types = {}
+        self._counters = {}
+        self._histograms = {}
+
+    def describe(self, name: str, metric_type: str, help_text: str):
+        self._types[name] = metric_type
+        self._help[name] = help_text
+
+    def inc(self, name: str, labels: dict, value: float = 1.0):
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0.0) + value
+
+    def observe(self, name: str, labels: dict, value: float, buckets=LATENCY_BUCKETS):
+        key = (name, _label_key(labels))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = _Histogram(buckets)
+            histogram.observe(value)
+
+    def counter_value(self, name: str, **labels) -> float:
+        """Sum of a counter across every label set matching `labels`."""
+        wanted = {k: str(v) for k, v in labels.items()}
+        with self._lock:
+            return sum(
+                value for (metric, key), value in self._counters.items()
+                if metric == name and wanted.items() <= dict(key).items()
+            )
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def render_prometheus(self) -> str:
+        """Format every metric in the Prometheus text exposition format."""
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted(
+                (key, (h.buckets, list(h.counts), h.total, h.count))
+                for key, h in self._histograms.items()
+            )
+
+        lines = []
+        described = set()
+
+        def header(name):
+            if name not in described:
+                described.add(name)
+                if name in self._help:
+                    lines.append(f"# HELP {name} {self._help[name]}")
+                lines.append(f"# TYPE {name} {self._types.get(name, 'untyped')}")
+
+        for (name, key), value in counters:
+            header(name)
+            lines.append(f"{name}{_format_labels(key)} {_format_number(value)}")
+
+        for (name, key), (buckets, counts, total, count) in histograms:
+            header(name)
+            cumulative = 0
+            for bound, bucket_count in zip(buckets, counts):
+                cumulative += bucket_count
+                lines.append(f"{name}_bucket{_format_labels(key + (('le', _format_number(bound)),))} {cumulative}")
+            lines.append(f"{name}_bucket{_format_labels(key + (('le', '+Inf'),))} {count}")
+            lines.append(f"{name}_sum{_format_labels(key)} {_format_number(total)}")
+            lines.append(f"{name}_count{_format_labels(key)} {count}")
+
+        return "\n".join(lines) + "\n"
+
+
+def _label_key(labels: dict) -> tuple:
+    return tuple(sorted((k, "" if v is None else str(v)) for k, v in labels.items()))
+
+
+def _format_labels(key: tuple) -> str:
+    if not key:
+        return ""
+    pairs = (
+        k + '="' + v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+        for k, v in key
+    )
+    return "{" + ",".join(pairs) + "}"
+
+
+def _format_number(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+REGISTRY = MetricsRegistry()
+REGISTRY.describe("codementor_llm_calls_total", "counter", "Model calls by type, model, mode, level and status.")
+REGISTRY.describe("codementor_llm_tokens_total", "counter", "Tokens consumed by model calls, split by kind.")
+REGISTRY.describe("codementor_llm_cost_usd_total", "counter", "Estimated spend on model calls in US dollars.")
+REGISTRY.describe("codementor_llm_retries_total", "counter", "Automatic retries performed by the API client.")
+REGISTRY.describe("codementor_llm_errors_total", "counter", "Model calls that raised, by exception type.")
+REGISTRY.describe("codementor_llm_latency_seconds", "histogram", "Total wall-clock latency of model calls.")
+REGISTRY.describe("codementor_llm_ttft_seconds", "histogram", "Time to first streamed token.")
+REGISTRY.describe("codementor_llm_output_tokens", "histogram", "Output tokens per model call.")
+
+_jsonl_logger = logging.getLogger("codementor.telemetry.calls")
+_jsonl_logger.propagate = False
+_metrics_server = None
+_configure_lock = threading.Lock()
+
+
+def record_call(record: CallRecord):
+    """Fold a finished call into the registry and the JSONL log."""
+    labels = {
+        "call_type": record.call_type,
+        "model": record.model,
+        "feedback_mode": record.feedback_mode,
+        "skill_level": record.skill_level,
+    }
+    status = "error" if record.error else "ok"
+    REGISTRY.inc("codementor_llm_calls_total", {**labels, "status": status})
+
+    for kind, count in (
+        ("input", record.input_tokens),
+        ("output", record.output_tokens),
+        ("cache_creation", record.cache_creation_input_tokens),
+        ("cache_read", record.cache_read_input_tokens),
+    ):
+        if count:
+            REGISTRY.inc("codementor_llm_tokens_total", {**labels, "kind": kind}, count)
+
+    cost = record.cost_usd
+    if cost:
+        REGISTRY.inc("codementor_llm_cost_usd_total", labels, cost)
+    if record.retries:
+        REGISTRY.inc("codementor_llm_retries_total", labels, record.retries)
+    if record.error:
+        REGISTRY.inc("codementor_llm_errors_total", {**labels, "error": record.error})
+
+    timing_labels = {"call_type": record.call_type, "model": record.model}
+    REGISTRY.observe("codementor_llm_latency_seconds", timing_labels, record.latency_seconds)
+    if record.ttft_seconds is not None:
+        REGISTRY.observe("codementor_llm_ttft_seconds", timing_labels, record.ttft_seconds)
+    if not record.error:
+        REGISTRY.observe("codementor_llm_output_tokens", timing_labels, record.output_tokens, TOKEN_BUCKETS)
+
+    if _jsonl_logger.handlers:
+        _jsonl_logger.info(json.dumps(record.to_dict(), separators=(",", ":")))
+
+
+@contextmanager
+def track_call(call_type: str, model: str, feedback_mode: Optional[str] = None, skill_level: Optional[str] = None):
+    """Time a model call and record it, including calls that raise.
+
+    The caller fills in usage, retries and first-token time on the yielded
+    `CallRecord`; latency and errors are filled in here.
+    """
+    record = CallRecord(call_type=call_type, model=model, feedback_mode=feedback_mode, skill_level=skill_level)
+    try:
+        yield record
+    except BaseException as exc:
+        record.error = type(exc).__name__
+        raise
+    finally:
+        record.latency_seconds = time.perf_counter() - record._started
+        record_call(record)
+
+
+def render_prometheus() -> str:
+    return REGISTRY.render_prometheus()
+
+
+def configure_jsonl(directory: str, max_bytes: int = 10 * 1024 * 1024, backup_count: int = 5):
+    """Append one JSON line per call to `directory/calls.jsonl`, rotating by size."""
+    os.makedirs(directory, exist_ok=True)
+    handler = logging.handlers.RotatingFileHandler(
+        os.path.join(directory, "calls.jsonl"),
+        maxBytes=max_bytes,
+        backupCount=backup_count,
+        encoding="utf-8",
+    )
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    for existing in list(_jsonl_logger.handlers):
+        _jsonl_logger.removeHandler(existing)
+        existing.close()
+    _jsonl_logger.addHandler(handler)
+    _jsonl_logger.setLevel(logging.INFO)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+        body = render_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_metrics_server(port: int, host: str = "0.0.0.0"):
+    """Serve `/metrics` from a daemon thread. Safe to call more than once."""
+    global _metrics_server
+    with _configure_lock:
+        if _metrics_server is None:
+            _metrics_server = ThreadingHTTPServer((host, port), _MetricsHandler)
+            threading.Thread(target=_metrics_server.serve_forever, name="codementor-metrics", daemon=True).start()
+    return _metrics_server
+
+
+def configure_from_env():
+    """Enable the exporters requested through environment variables."""
+    directory = os.environ.get("CODEMENTOR_TELEMETRY_DIR")
+    if directory:
+        configure_jsonl(directory)
+    port = os.environ.get("CODEMENTOR_METRICS_PORT")
+    if port:
+        start_metrics_server(int(port))
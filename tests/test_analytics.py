@@ -0,0 +1,99 @@
+import os
+
+import pytest
+
+import analytics
+
+np = pytest.importorskip("numpy")
+
+
+def record_rows(store, rows):
+    for task, learner, level, works, growth in rows:
+        store.record(task, learner, level, works, "concise", ["Clear naming"], growth, timestamp=1_700_000_000)
+    store.flush()
+
+
+@pytest.fixture
+def store_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(analytics, "COMPACT_SEGMENTS", 1_000)
+    return str(tmp_path / "analytics")
+
+
+def test_segments_are_remapped_and_offsets_rebased(store_dir):
+    store = analytics.AnalyticsStore(store_dir)
+    record_rows(store, [
+        ("task a", "ann", "beginner", False, ["Handle the empty list", "Add a docstring"]),
+        ("task b", "bob", "advanced", True, []),
+    ])
+    # Second segment: codes start from 0 again and in a different order
+    record_rows(store, [
+        ("task b", "cat", "intermediate", True, ["Handle the empty list"]),
+        ("task a", "ann", "advanced", True, ["Use a docstring", "Think about edge cases"]),
+    ])
+    assert len(analytics.segment_paths(store_dir)) == 2
+
+    snapshot = analytics.load(store_dir)
+    assert snapshot.rows == 4
+    assert [snapshot.tasks[code] for code in snapshot.task] == ["task a", "task b", "task b", "task a"]
+    assert snapshot.learner_count() == 3
+    assert snapshot.growth_offsets.tolist() == [0, 2, 2, 3, 5]
+    row_tags = [
+        sorted(snapshot.tags[t] for t in snapshot.growth_tags[start:end])
+        for start, end in zip(snapshot.growth_offsets[:-1], snapshot.growth_offsets[1:])
+    ]
+    assert row_tags == [["documentation", "edge cases"], [], ["edge cases"], ["documentation", "edge cases"]]
+    assert snapshot.pass_rates() == {"task a": {"attempts": 2, "pass_rate": 0.5}, "task b": {"attempts": 2, "pass_rate": 1.0}}
+    assert sorted(snapshot.top_tags("growth")["task a"]) == [("documentation", 2), ("edge cases", 2)]
+
+
+def test_compact_merges_segments_without_changing_results(store_dir):
+    store = analytics.AnalyticsStore(store_dir)
+    for i in range(5):
+        record_rows(store, [(f"task {i % 2}", f"learner {i}", analytics.LEVELS[i % 3], i % 2 == 0, ["Edge cases"])])
+    before = analytics.load(store_dir)
+
+    assert analytics.compact(store_dir) == 5
+    assert len(analytics.segment_paths(store_dir)) == 1
+    after = analytics.load(store_dir)
+    assert after.rows == before.rows
+    assert after.pass_rates() == before.pass_rates()
+    assert after.top_tags("growth") == before.top_tags("growth")
+    assert after.level_distribution() == before.level_distribution()
+    # A single segment is read from the memory maps, not copied
+    assert isinstance(after.task, np.memmap)
+
+
+def test_replaced_segments_are_not_counted_twice(store_dir):
+    store = analytics.AnalyticsStore(store_dir)
+    record_rows(store, [("task a", "ann", "beginner", True, [])])
+    record_rows(store, [("task a", "bob", "beginner", False, [])])
+    originals = analytics.segment_paths(store_dir)
+    snapshot = analytics.load(store_dir)
+    # As if a compaction were interrupted after writing the merged segment
+    analytics.write_segment(
+        store_dir, {column: getattr(snapshot, column) for column in analytics.COLUMNS},
+        {"tasks": snapshot.tasks, "learners": snapshot.learners, "tags": snapshot.tags},
+        replaces=[os.path.basename(path) for path in originals],
+    )
+    assert len(analytics.segment_paths(store_dir)) == 3
+    assert analytics.load(store_dir).rows == 2
+
+
+def test_flush_compacts_small_segments(store_dir, monkeypatch):
+    monkeypatch.setattr(analytics, "COMPACT_SEGMENTS", 3)
+    store = analytics.AnalyticsStore(store_dir)
+    for i in range(4):
+        record_rows(store, [("task a", f"learner {i}", "beginner", True, [])])
+    assert len(analytics.segment_paths(store_dir)) == 1
+    assert analytics.load(store_dir).rows == 4
+
+
+def test_fallback_assessments_are_not_recorded(store_dir, monkeypatch):
+    from assessment import FALLBACK_ASSESSMENT
+
+    store = analytics.AnalyticsStore(store_dir)
+    monkeypatch.setattr(analytics, "get_store", lambda: store)
+    analytics.record_assessment("task a", "ann", dict(FALLBACK_ASSESSMENT))
+    analytics.record_assessment("task a", "ann", {"level": "beginner", "code_works": True})
+    store.flush()
+    assert analytics.load(store_dir).rows == 1
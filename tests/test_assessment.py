@@ -0,0 +1,44 @@
+import json
+
+from assessment import PartialJSONParser
+
+DOCUMENT = json.dumps({
+    "level": "beginner",
+    "code_works": False,
+    "strengths": ["Clear names", "Uses a \"helper\" function"],
+    "growth_areas": ["Edge cases"],
+    "code_issues": [],
+    "indicators": {"uses_comprehensions": False, "max_nesting": 3},
+})
+
+
+def test_snapshot_is_none_before_the_object_starts():
+    parser = PartialJSONParser()
+    parser.feed("  ")
+    assert parser.snapshot() is None
+
+
+def test_only_finished_values_are_reported():
+    parser = PartialJSONParser()
+    parser.feed('{"level": "begin')
+    assert parser.snapshot() == {}
+    parser.feed('ner", "strengths": ["Clear na')
+    assert parser.snapshot() == {"level": "beginner", "strengths": []}
+    parser.feed('mes", "Tests"], "indicators": {"max_nesting": 1')
+    # 1 might still grow into 12
+    assert parser.snapshot() == {"level": "beginner", "strengths": ["Clear names", "Tests"], "indicators": {}}
+    parser.feed("2}")
+    assert parser.snapshot()["indicators"] == {"max_nesting": 12}
+
+
+def test_any_fragmentation_ends_with_the_full_document():
+    for size in (1, 3, 7, len(DOCUMENT)):
+        parser = PartialJSONParser()
+        previous = {}
+        for start in range(0, len(DOCUMENT), size):
+            parser.feed(DOCUMENT[start:start + size])
+            snapshot = parser.snapshot() or {}
+            # Fields only ever appear or grow
+            assert set(previous) <= set(snapshot)
+            previous = snapshot
+        assert parser.snapshot() == json.loads(DOCUMENT)
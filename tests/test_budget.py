@@ -0,0 +1,21 @@
+import budget
+
+
+def test_fit_code_leaves_small_code_alone():
+    code = "def add(a, b):\n    return a + b\n"
+    assert budget.fit_code(code, max_tokens=100) == code
+
+
+def test_fit_code_keeps_head_and_tail_within_budget():
+    lines = [f"value_{i} = compute({i})" for i in range(400)]
+    fitted = budget.fit_code("\n".join(lines), max_tokens=300)
+    kept = fitted.splitlines()
+    marker = next(line for line in kept if "lines omitted" in line)
+    omitted = int(marker.split()[2])
+
+    assert kept[0] == lines[0] and kept[-1] == lines[-1]
+    assert len(kept) - 1 + omitted == len(lines)
+    assert budget.estimate_tokens(fitted) <= 300 + budget.estimate_tokens(marker) + 1
+    # The head gets the larger share
+    head = kept[:kept.index(marker)]
+    assert len(head) > len(kept) - len(head) - 1
@@ -0,0 +1,37 @@
+import cassettes
+
+
+def request(text):
+    return {"messages": [{"role": "user", "content": text}]}
+
+
+def interaction(text):
+    return cassettes.Interaction("review", request(text), text, "end_turn", {"input_tokens": 1}, 0.01)
+
+
+def record_via_environment(monkeypatch, path, text):
+    monkeypatch.setenv("CODEMENTOR_CASSETTE", path)
+    monkeypatch.setenv("CODEMENTOR_CASSETTE_MODE", "record")
+    cassettes.reset()
+    cassettes.active_cassette().record(interaction(text))
+
+
+def test_recording_again_replaces_the_old_cassette(tmp_path, monkeypatch):
+    path = str(tmp_path / "flow.jsonl.gz")
+    record_via_environment(monkeypatch, path, "first run")
+    record_via_environment(monkeypatch, path, "second run")
+    cassettes.reset()
+    assert [item.text for item in cassettes.Cassette.load(path).interactions] == ["second run"]
+
+
+def test_activated_cassette_keeps_its_flow(tmp_path, monkeypatch):
+    path = str(tmp_path / "flow.jsonl.gz")
+    monkeypatch.setenv("CODEMENTOR_CASSETTE", path)
+    monkeypatch.setenv("CODEMENTOR_CASSETTE_MODE", "record")
+    cassettes.reset()
+    cassettes.activate(cassettes.Cassette.create(path, flow={"name": "lru"}))
+    cassettes.active_cassette().record(interaction("only call"))
+    cassettes.reset()
+    loaded = cassettes.Cassette.load(path, speed=0)
+    assert loaded.flow == {"name": "lru"}
+    assert loaded.replay("review", request("only call")).text == "only call"
@@ -0,0 +1,109 @@
+import threading
+
+import code_metrics
+from code_metrics import analyze, complexity_label, prompt_summary
+
+NESTED = '''\
+def common(first, second):
+    found = []
+    for a in first:
+        for b in second:
+            if a == b and a not in found:
+                found.append(a)
+    return found
+'''
+
+
+def test_complexity_and_loop_nesting():
+    metrics = analyze(NESTED)
+    assert metrics.parsed and metrics.functions == 1
+    # 1 + two loops + if + `and`
+    assert metrics.complexity == 5 and metrics.max_function_complexity == 5
+    assert metrics.max_loop_depth == 2
+    assert [finding.line for finding in metrics.hotspots] == [4]
+    assert [finding.line for finding in metrics.quadratic] == [5]
+    assert complexity_label(metrics.complexity) == "simple"
+
+
+def test_comprehensions_count_as_loops():
+    metrics = analyze("pairs = [(a, b) for a in range(3) for b in range(3) if a != b]\n")
+    assert metrics.max_loop_depth == 2
+    assert metrics.complexity == 4
+    assert "list comprehension" in metrics.idioms and "tuple unpacking" not in metrics.idioms
+
+
+def test_quadratic_patterns():
+    code = '''\
+text = ""
+queue = [1, 2, 3]
+for word in ["a", "b"]:
+    text += word
+    queue.pop(0)
+    queue = queue + [word]
+'''
+    messages = [finding.message for finding in analyze(code).quadratic]
+    assert len(messages) == 3
+    assert "string `text +=`" in messages[0]
+    assert "pop(0)" in messages[1]
+    assert "copies the whole list" in messages[2]
+
+
+def test_anti_patterns_and_identifiers():
+    code = '''\
+def Check(l, list):
+    for i in range(len(l)):
+        if type(l[i]) == int and l[i] == None:
+            return True
+'''
+    metrics = analyze(code)
+    assert [finding.line for finding in metrics.anti_patterns] == [2, 3, 3]
+    assert metrics.identifier_issues == [
+        "`Check` (line 1) is not snake_case",
+        "`l` (line 1) is a single letter",
+        "`list` (line 1) shadows the built-in",
+    ]
+    assert metrics.identifier_score == 1 - 3 / metrics.identifiers
+
+
+def test_idioms():
+    code = '''\
+def describe(items: list) -> str:
+    with open("log.txt") as log:
+        log.write(", ".join(f"{i}: {item}" for i, item in enumerate(items)))
+    return max(items, key=len) if any(len(item) > 3 for item in items) else ""
+'''
+    assert analyze(code).idioms == [
+        "any() over a generator", "context manager (with)", "f-strings",
+        "generator expression", "key= functions", "str.join()", "tuple unpacking", "type hints",
+    ]
+
+
+def test_syntax_errors_are_reported_not_raised():
+    metrics = analyze("def broken(:\n    pass\n")
+    assert not metrics.parsed and metrics.error.startswith("line 1")
+    assert prompt_summary(metrics).startswith("- The code does not parse")
+
+
+def test_prompt_summary_lists_findings():
+    summary = prompt_summary(analyze(NESTED))
+    assert "- Cyclomatic complexity: 5 overall, 5 in the most complex function (simple)" in summary
+    assert "- Hot spot, line 4: loop nested 2 deep (outer loop on line 3)" in summary
+    assert "- Quadratic pattern, line 5:" in summary
+
+
+def test_parse_is_safe_across_threads():
+    errors = []
+
+    def work():
+        try:
+            for _ in range(50):
+                code_metrics.parse(NESTED)
+        except Exception as exc:  # pragma: no cover - only on failure
+            errors.append(exc)
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
@@ -0,0 +1,105 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+import analytics
+import gallery
+import grade
+import mentor
+import similarity_index
+
+TASK = "merge two sorted lists"
+
+
+class FakeModel:
+    """Stands in for the model calls; fails the submissions whose code is in `failing`."""
+
+    def __init__(self, monkeypatch, failing=()):
+        self.assessed = []
+        self.failing = set(failing)
+        monkeypatch.setattr(mentor, "assess_skill_level", self.assess)
+        monkeypatch.setattr(mentor, "generate_pedagogical_review", self.review)
+
+    def assess(self, code, task):
+        self.assessed.append(code)
+        if code in self.failing:
+            raise RuntimeError("model unavailable")
+        return {"level": "beginner", "code_works": True, "strengths": ["clear"], "growth_areas": [], "code_issues": []}
+
+    def review(self, task, code, level, mode, works):
+        return f"review of {code!r}"
+
+
+@pytest.fixture(autouse=True)
+def offline(monkeypatch):
+    monkeypatch.setattr(analytics, "record_assessment", lambda *args, **kwargs: None)
+    monkeypatch.setattr(gallery, "load_bundle", lambda: None)
+    monkeypatch.setattr(similarity_index, "stats", lambda: None)
+
+
+def write_submissions(path, codes):
+    with open(path, "w") as f:
+        for submission_id, code in codes.items():
+            f.write(json.dumps({"id": submission_id, "code": code}) + "\n")
+
+
+def run(tmp_path, out="results.jsonl", restart=False):
+    args = SimpleNamespace(
+        submissions=str(tmp_path / "submissions.jsonl"), task=TASK, out=str(tmp_path / out),
+        feedback_mode="concise", concurrency=4, rpm=60_000, checkpoint=None, restart=restart, progress_every=10,
+    )
+    return asyncio.run(grade.run(args))
+
+
+def read_rows(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f]
+
+
+def test_key_ignores_trailing_whitespace_only():
+    submission = grade.Submission("a", TASK, "x = 1\ny = 2\n")
+    assert submission.key == grade.Submission("b", TASK, "x = 1   \ny = 2\n\n").key
+    assert submission.key != grade.Submission("c", TASK, "x = 1\n    y = 2\n").key
+    assert submission.key != grade.Submission("d", "reverse a list", "x = 1\ny = 2\n").key
+
+
+def test_duplicates_are_graded_once(tmp_path, monkeypatch):
+    model = FakeModel(monkeypatch)
+    write_submissions(tmp_path / "submissions.jsonl", {"ann": "x = 1\n", "bob": "x = 1  \n", "cat": "y = 2\n"})
+    assert run(tmp_path) == 0
+    assert sorted(model.assessed) == ["x = 1\n", "y = 2\n"]
+    rows = {row["id"]: row for row in read_rows(tmp_path / "results.jsonl")}
+    assert sorted(rows) == ["ann", "bob", "cat"]
+    assert rows["ann"]["duplicate_of"] is None and rows["bob"]["duplicate_of"] == "ann"
+    assert rows["ann"]["review"] == rows["bob"]["review"] and rows["cat"]["duplicate_of"] is None
+    assert {row["source"] for row in rows.values()} == {"model"}
+
+
+def test_resume_retries_failures_without_duplicating_rows(tmp_path, monkeypatch):
+    write_submissions(tmp_path / "submissions.jsonl", {"ann": "x = 1\n", "bob": "y = 2\n", "cat": "z = 3\n"})
+    FakeModel(monkeypatch, failing={"y = 2\n"})
+    assert run(tmp_path) == 1
+    assert sorted(row["id"] for row in read_rows(tmp_path / "results.jsonl")) == ["ann", "cat"]
+
+    model = FakeModel(monkeypatch)
+    assert run(tmp_path) == 0
+    assert model.assessed == ["y = 2\n"]
+    assert sorted(row["id"] for row in read_rows(tmp_path / "results.jsonl")) == ["ann", "bob", "cat"]
+
+    # --restart ignores the checkpoint and rewrites the output
+    model = FakeModel(monkeypatch)
+    assert run(tmp_path, restart=True) == 0
+    assert len(model.assessed) == 3
+    assert len(read_rows(tmp_path / "results.jsonl")) == 3
+
+
+def test_csv_output(tmp_path, monkeypatch):
+    FakeModel(monkeypatch)
+    write_submissions(tmp_path / "submissions.jsonl", {"ann": "x = 1\n"})
+    assert run(tmp_path, out="results.csv") == 0
+    with open(tmp_path / "results.csv") as f:
+        header, line = f.read().splitlines()
+    assert header == ",".join(grade.CSV_FIELDS)
+    assert line.startswith("ann,beginner,True,clear,,,")
@@ -0,0 +1,94 @@
+from review_parser import parse_review
+
+DETAILED = """1. **🎉 CONGRATULATIONS!** Your code works and reads well.
+
+2. **IMPROVED SOLUTION**
+```python
+def merge(left, right):
+    return sorted(left + right)
+```
+
+3. **LINE-BY-LINE LEARNING** (for 3-5 key improvements)
+
+**Improvement 1: Use Pythonic patterns for iteration**
+
+*Your code:* `for i in range(len(items))`
+
+*Improved:* `for item in items`
+
+*Why this is better:*
+No index bookkeeping.
+
+- 📖 Readability: ⭐⭐⭐⭐⭐ - reads like English
+- ⚡ Performance: 3/5 - about the same
+- 🎯 Recommendation: Prefer readability here.
+
+**Improvement 2: Return early**
+
+*Your code:* `result = x`
+
+*Improved:* `return x`
+
+4. **PYTHONIC PATTERNS LEARNED**
+- Direct iteration
+
+5. **NEXT CHALLENGE**
+Handle iterators instead of lists.
+"""
+
+CONCISE = """1. **QUICK ASSESSMENT**: Your loop is off by one.
+
+2. **IMPROVED SOLUTION**
+```python
+def total(xs):
+    return sum(xs)
+```
+
+3. **LINE-BY-LINE FIXES**
+- `range(1, len(xs))` → `xs`: iterate the values directly
+- `s = s + x` → `sum(xs)`: use the built-in
+
+4. **KEY TAKEAWAY**: Always test the empty list.
+"""
+
+
+def test_detailed_outline():
+    parsed = parse_review(DETAILED)
+    assert [s.kind for s in parsed.sections] == ["intro", "solution", "improvements", "patterns", "next_challenge"]
+    assert parsed.section("intro").body == "Your code works and reads well."
+    assert parsed.improved_code == "def merge(left, right):\n    return sorted(left + right)"
+
+
+def test_improvement_heading_with_section_keyword_stays_an_improvement():
+    parsed = parse_review(DETAILED)
+    assert [i.title for i in parsed.improvements] == ["Use Pythonic patterns for iteration", "Return early"]
+    first = parsed.improvements[0]
+    assert (first.your_code, first.improved_code) == ("for i in range(len(items))", "for item in items")
+    assert first.readability.stars == 5 and first.readability.note == "reads like English"
+    assert first.performance.stars == 3
+    assert first.recommendation == "Prefer readability here."
+
+
+def test_text_after_heading_is_kept():
+    parsed = parse_review(CONCISE)
+    assert parsed.section("intro").body == "Your loop is off by one."
+    assert parsed.section("takeaway").body == "Always test the empty list."
+
+
+def test_concise_arrow_bullets():
+    parsed = parse_review(CONCISE)
+    assert [(i.your_code, i.improved_code) for i in parsed.improvements] == [
+        ("range(1, len(xs))", "xs"),
+        ("s = s + x", "sum(xs)"),
+    ]
+
+
+def test_congratulations_with_inline_emphasis():
+    parsed = parse_review("**🎉 CONGRATULATIONS!** Your code works, *nicely* done.\n\n**KEY TAKEAWAY**\nTest edge cases.")
+    assert parsed.section("intro").body == "Your code works, *nicely* done."
+    assert parsed.section("takeaway").body == "Test edge cases."
+
+
+def test_unstructured_review_has_no_sections():
+    parsed = parse_review("Looks good to me.")
+    assert parsed.sections == [] and parsed.raw == "Looks good to me."
@@ -0,0 +1,53 @@
+import json
+
+from similarity_index import SimilarityIndex, code_key, jaccard, task_shingles
+
+
+def test_task_shingles_normalize_numbers_stopwords_and_plurals():
+    assert task_shingles("Write a function to merge 2 sorted lists") == {"merge", "two", "sorted", "list"}
+
+
+def test_code_key_ignores_comments_and_formatting_but_not_names():
+    code = "def total(xs):\n    return sum(xs)\n"
+    assert code_key(code) == code_key("def total(xs):  # add up\n\n    return sum( xs )\n")
+    assert code_key(code) != code_key("def total(values):\n    return sum(values)\n")
+    assert code_key(code) != code_key("def total(xs):\n    return sum(xs) + 1\n")
+
+
+def test_signatures_estimate_jaccard():
+    index = SimilarityIndex()
+    left = task_shingles("merge two sorted lists")
+    assert index.signature(left) == index.signature(set(left))
+    assert index.similarity(index.signature(left), index.signature(left)) == 1.0
+
+
+def test_paraphrased_task_at_the_threshold_is_reused():
+    # True Jaccard is exactly 0.8; the 64-slot MinHash estimate for this pair is 0.766
+    assert jaccard(task_shingles("merge 2 sorted lists efficiently"), task_shingles("merge two sorted lists")) == 0.8
+    index = SimilarityIndex(task_threshold=0.8)
+    index.add("starter", "merge two sorted lists", "starter code")
+    match = index.query("starter", "merge 2 sorted lists efficiently")
+    assert match is not None and match.score == 0.8 and match.payload == "starter code"
+    assert index.query("starter", "reverse a linked list") is None
+    assert index.stats() == {"entries": 1, "lookups": 2, "hits": 1, "hit_rate": 0.5}
+
+
+def test_reviews_are_only_reused_for_the_same_code():
+    index = SimilarityIndex()
+    code = "def merge(a, b):\n    return sorted(a + b)\n"
+    index.add("review", "merge two sorted lists", "review", code=code, scope="beginner")
+    assert index.query("review", "merge 2 sorted lists", code=code + "# done\n", scope="beginner").payload == "review"
+    assert index.query("review", "merge 2 sorted lists", code=code.replace("a + b", "b + a"), scope="beginner") is None
+    assert index.query("review", "merge 2 sorted lists", code=code, scope="advanced") is None
+    assert index.query("starter", "merge 2 sorted lists") is None
+
+
+def test_snapshot_round_trip(tmp_path):
+    path = str(tmp_path / "similarity.json")
+    index = SimilarityIndex(path=path)
+    index.add("starter", "merge two sorted lists", {"code": "pass"})
+    index.maybe_snapshot(force=True)
+    with open(path) as f:
+        assert json.load(f)["entries"][0]["task_shingles"] == ["list", "merge", "sorted", "two"]
+    restored = SimilarityIndex(path=path)
+    assert restored.query("starter", "merge 2 sorted lists").payload == {"code": "pass"}